@@ -0,0 +1,75 @@
+"""Run an import benchmark against in-process stand-ins.
+
+Usage: ``python -m benchmarks --scenario handler --products 2000 --output report.json``.
+Exits with 1 if ``--baseline`` is given and the run regressed beyond ``--tolerance``.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from benchmarks.scenarios import Bench, Report, ScenarioOptions, check_regression
+
+
+def parse_options(argv: list[str]) -> tuple[ScenarioOptions, argparse.Namespace]:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m benchmarks")
+
+    for name, field in ScenarioOptions.model_fields.items():
+        flag: str = f"--{name.replace('_', '-')}"
+
+        if field.annotation is bool:
+            parser.add_argument(flag, action=argparse.BooleanOptionalAction, default=field.default)
+        elif name == "images":
+            parser.add_argument(flag, nargs=2, type=int, metavar=("MIN", "MAX"), default=field.default)
+        else:
+            parser.add_argument(flag, default=field.default)
+
+    parser.add_argument("--output", type=Path, help="write JSON report to file")
+    parser.add_argument("--baseline", type=Path, help="JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed regression, 0.1 is 10%%")
+
+    arguments: argparse.Namespace = parser.parse_args(argv)
+    options: ScenarioOptions = ScenarioOptions.model_validate(
+        {name: getattr(arguments, name) for name in ScenarioOptions.model_fields},
+    )
+
+    return options, arguments
+
+
+def render(report: Report) -> str:
+    requests: str = ", ".join(f"{path} {count}" for path, count in sorted(report.mb_requests.items()))
+
+    return (
+        f"scenario     {report.options.scenario}\n"
+        f"products     {report.products} ({report.failed} failed) in {report.seconds:.2f} s\n"
+        f"throughput   {report.throughput:.1f} products/s\n"
+        f"latency      p50 {report.latency_p50_ms:.1f} ms, p99 {report.latency_p99_ms:.1f} ms\n"
+        f"mb requests  {sum(report.mb_requests.values())}: {requests}\n"
+        f"cdn requests {report.cdn_requests}\n"
+        f"peak rss     {report.peak_rss_mb:.1f} MiB\n"
+    )
+
+
+def main(argv: list[str]) -> int:
+    options, arguments = parse_options(argv)
+    report: Report = asyncio.run(Bench(options).run())
+    sys.stdout.write(render(report))
+
+    if arguments.output:
+        arguments.output.write_text(report.model_dump_json(indent=2), encoding="utf-8")
+
+    if arguments.baseline:
+        baseline: Report = Report.model_validate_json(arguments.baseline.read_text(encoding="utf-8"))
+        regressions: list[str] = check_regression(report, baseline, arguments.tolerance)
+
+        for regression in regressions:
+            sys.stderr.write(f"regression: {regression}\n")
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
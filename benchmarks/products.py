@@ -0,0 +1,72 @@
+import random
+from collections.abc import Iterator
+from typing import Final
+
+from faker import Faker
+
+
+class ProductFactory:
+    """Synthetic parsed products with realistic shape.
+
+    Brands, product types, characteristic names and values come from bounded pools, so entities repeat
+    across products the way they do in a real catalogue. Generation is reproducible by ``seed``.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        seed: int = 0,
+        *,
+        brands: int = 200,
+        product_types: int = 50,
+        characteristics: tuple[int, int] = (8, 25),
+        values_per_characteristic: int = 20,
+        images: tuple[int, int] = (3, 10),
+        image_host: str = "cdn.stand-in",
+    ) -> None:
+        self.characteristics: Final[tuple[int, int]] = characteristics
+        self.images: Final[tuple[int, int]] = images
+        self.image_host: Final[str] = image_host
+        self._random: random.Random = random.Random(seed)
+        self._faker: Faker = Faker("ru_RU")
+        self._faker.seed_instance(seed)
+        self._brands: list[str] = list(dict.fromkeys(self._faker.company() for _ in range(brands)))
+        self._product_types: list[str] = list(
+            dict.fromkeys(self._faker.word().capitalize() for _ in range(product_types)),
+        )
+        self._characteristic_names: list[str] = list(
+            dict.fromkeys(self._faker.word().capitalize() for _ in range(characteristics[1] * 4)),
+        )
+        self._values: dict[str, list[str]] = {
+            name: list(dict.fromkeys(self._faker.word() for _ in range(values_per_characteristic)))
+            for name in self._characteristic_names
+        }
+        self._skus: Iterator[int] = iter(range(100_000_000, 1_000_000_000))
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def __call__(self) -> dict:
+        """Make a product payload as the parser publishes it."""
+        sku: int = next(self._skus)
+        characteristic_names: list[str] = self._random.sample(
+            self._characteristic_names,
+            min(self._random.randint(*self.characteristics), len(self._characteristic_names)),
+        )
+
+        return {
+            "sku": str(sku),
+            "name": self._faker.sentence(nb_words=4).rstrip("."),
+            "brand": self._random.choice(self._brands),
+            "description": self._faker.paragraph(nb_sentences=5),
+            "characteristics": [
+                {"name": "Тип", "value": self._random.choice(self._product_types)},
+                *[{"name": name, "value": self._random.choice(self._values[name])} for name in characteristic_names],
+            ],
+            "images": [
+                f"https://{self.image_host}/{sku}/{index}.jpg" for index in range(self._random.randint(*self.images))
+            ],
+            "url": f"https://www.ozon.ru/product/{sku}/",
+        }
+
+    def make_many(self, count: int) -> list[dict]:
+        return [self() for _ in range(count)]
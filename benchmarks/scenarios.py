@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from typing import Final, Literal
+
+from httpx import AsyncClient, MockTransport
+from pydantic import BaseModel
+
+from benchmarks.products import ProductFactory
+from benchmarks.stand_in.image_cdn import ImageCdnStandIn
+from benchmarks.stand_in.markets_bridge import MarketsBridgeStandIn
+from ozon_importer.handlers.parsed_loading import ParsedLoadingHandler
+from ozon_importer.repositories.adaptive_limiter import AdaptiveLimiter, AdaptiveLimits
+from ozon_importer.repositories.download_scheduler import DownloadScheduler
+from ozon_importer.repositories.entity_cache import EntityCache
+from ozon_importer.repositories.http_fetcher import HttpFetcher
+from ozon_importer.repositories.httpx_client import HttpxClient
+from ozon_importer.repositories.markets_bridge_client.client import MarketsBridgeClient
+from ozon_importer.services.image_pipeline import ByteBudget, ImagePipeline
+from ozon_importer.services.product_batcher import ProductBatcher
+from ozon_importer.services.product_importer import ProductImporter
+from ozon_importer.types import Product
+
+
+Scenario = Literal["importer", "batch", "handler"]
+
+MARKETS_BRIDGE_HOST: Final[str] = "http://markets-bridge.stand-in/"
+MARKETPLACE_ID: Final[int] = 1
+
+
+class ScenarioOptions(BaseModel):
+    scenario: Scenario = "handler"
+    products: int = 1000
+    seed: int = 0
+    concurrency: int = 16
+    batch_size: int = 32
+    batch_timeout: float = 0.05
+    upsert_concurrency: int = 16
+    bulk: bool = False
+    images: tuple[int, int] = (3, 10)
+    image_size: int = 100_000
+    image_fetch_concurrency: int = 8
+    image_download_concurrency: int = 32
+    adaptive_limit: bool = True
+    mb_concurrency_max: int = 50
+    mb_latency_target: float = 2.0
+    mb_latency: float = 0.005
+    mb_jitter: float = 0.005
+    mb_error_rate: float = 0.0
+    cdn_latency: float = 0.02
+    cdn_jitter: float = 0.02
+    cdn_error_rate: float = 0.0
+
+
+class Report(BaseModel):
+    options: ScenarioOptions
+    products: int
+    failed: int
+    seconds: float
+    throughput: float
+    latency_p50_ms: float
+    latency_p99_ms: float
+    mb_requests: dict[str, int]
+    cdn_requests: int
+    peak_rss_mb: float
+
+
+class Bench:
+    """Import stack wired like the container, talking to in-process stand-ins."""
+
+    def __init__(self, options: ScenarioOptions) -> None:
+        self.options: Final[ScenarioOptions] = options
+        self.markets_bridge: Final[MarketsBridgeStandIn] = MarketsBridgeStandIn(
+            latency=options.mb_latency,
+            jitter=options.mb_jitter,
+            error_rate=options.mb_error_rate,
+            seed=options.seed,
+        )
+        self.image_cdn: Final[ImageCdnStandIn] = ImageCdnStandIn(
+            options.image_size,
+            latency=options.cdn_latency,
+            jitter=options.cdn_jitter,
+            error_rate=options.cdn_error_rate,
+            seed=options.seed,
+        )
+        self.limiter: Final[AdaptiveLimiter | None] = (
+            AdaptiveLimiter(AdaptiveLimits(16, 2, options.mb_concurrency_max, options.mb_latency_target))
+            if options.adaptive_limit
+            else None
+        )
+        self.client: Final[MarketsBridgeClient] = MarketsBridgeClient(
+            HttpxClient(AsyncClient(transport=MockTransport(self.markets_bridge))),  # type: ignore[arg-type]
+            MARKETS_BRIDGE_HOST,
+            "login",
+            "password",
+            entity_cache=EntityCache(maxsize=100_000, ttl=3600.0),
+            limiter=self.limiter,
+        )
+        self.importer: Final[ProductImporter] = ProductImporter(
+            self.client,
+            ImagePipeline(
+                self.client,
+                HttpFetcher(
+                    HttpxClient(AsyncClient(transport=MockTransport(self.image_cdn))),  # type: ignore[arg-type]
+                    scheduler=DownloadScheduler(
+                        options.image_download_concurrency,
+                        max_per_host=options.image_fetch_concurrency,
+                    ),
+                ),
+                budget=ByteBudget(64 * 1024 * 1024),
+                concurrency=options.image_fetch_concurrency,
+            ),
+            MARKETPLACE_ID,
+            concurrency=options.upsert_concurrency,
+            bulk=options.bulk,
+        )
+        self.handler: Final[ParsedLoadingHandler] = ParsedLoadingHandler(
+            ProductBatcher(
+                self.importer,
+                max_size=options.batch_size,
+                max_delay=options.batch_timeout,
+                max_in_flight=options.concurrency,
+            ),
+            backpressure=self.limiter,
+        )
+        self.logger: Final[logging.Logger] = logging.getLogger("benchmarks")
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def run(self) -> Report:
+        payloads: list[bytes] = [
+            json.dumps(payload, ensure_ascii=False).encode()
+            for payload in ProductFactory(self.options.seed, images=self.options.images).make_many(
+                self.options.products,
+            )
+        ]
+        send: Callable[[list[bytes]], Awaitable[list[tuple[float, bool]]]] = {
+            "importer": self._send_one_by_one,
+            "batch": self._send_in_batches,
+            "handler": self._handle_messages,
+        }[self.options.scenario]
+
+        started_at: float = time.perf_counter()
+        results: list[tuple[float, bool]] = await send(payloads)
+        seconds: float = time.perf_counter() - started_at
+        latencies: list[float] = sorted(latency for latency, _ in results)
+
+        return Report(
+            options=self.options,
+            products=len(results),
+            failed=sum(not succeeded for _, succeeded in results),
+            seconds=seconds,
+            throughput=len(results) / seconds if seconds else 0.0,
+            latency_p50_ms=_percentile(latencies, 50) * 1000,
+            latency_p99_ms=_percentile(latencies, 99) * 1000,
+            mb_requests=dict(self.markets_bridge.requests),
+            cdn_requests=sum(self.image_cdn.requests.values()),
+            peak_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        )
+
+    async def _send_one_by_one(self, payloads: list[bytes]) -> list[tuple[float, bool]]:
+        async def send(payload: bytes) -> None:
+            await self.importer.send(Product.model_validate_json(payload), self.logger)
+
+        return await self._run_workers(payloads, send)
+
+    async def _send_in_batches(self, payloads: list[bytes]) -> list[tuple[float, bool]]:
+        results: list[tuple[float, bool]] = []
+        batches: list[list[bytes]] = [
+            payloads[start : start + self.options.batch_size]
+            for start in range(0, len(payloads), self.options.batch_size)
+        ]
+
+        async def send(batch: list[bytes]) -> None:
+            started_at: float = time.perf_counter()
+            errors: list[Exception | None] = await self.importer.send_many(
+                [Product.model_validate_json(payload) for payload in batch],
+                self.logger,
+            )
+            latency: float = time.perf_counter() - started_at
+            results.extend((latency, error is None) for error in errors)
+
+        await self._run_workers(batches, send, max(self.options.concurrency // self.options.batch_size, 1))
+
+        return results
+
+    async def _handle_messages(self, payloads: list[bytes]) -> list[tuple[float, bool]]:
+        async def handle(payload: bytes) -> None:
+            await self.handler(Product.model_validate_json(payload), self.logger)  # type: ignore[arg-type]
+
+        return await self._run_workers(payloads, handle, self.options.concurrency * self.options.batch_size)
+
+    async def _run_workers[T](
+        self,
+        items: list[T],
+        process: Callable[[T], Awaitable[None]],
+        workers: int | None = None,
+    ) -> list[tuple[float, bool]]:
+        """Process items by concurrent workers, like a consumer with prefetch of ``concurrency`` messages.
+
+        Returns:
+            latency and success of every item.
+        """
+        queue: asyncio.Queue[T] = asyncio.Queue()
+        results: list[tuple[float, bool]] = []
+
+        for item in items:
+            queue.put_nowait(item)
+
+        async def work() -> None:
+            while not queue.empty():
+                item: T = queue.get_nowait()
+                started_at: float = time.perf_counter()
+
+                try:
+                    await process(item)
+                except Exception:  # noqa: BLE001
+                    results.append((time.perf_counter() - started_at, False))
+                else:
+                    results.append((time.perf_counter() - started_at, True))
+
+        async with asyncio.TaskGroup() as task_group:
+            for _ in range(workers or self.options.concurrency):
+                task_group.create_task(work())
+
+        return results
+
+
+def check_regression(report: Report, baseline: Report, tolerance: float) -> list[str]:
+    """Compare report with baseline of the same scenario.
+
+    Returns:
+        descriptions of regressions beyond tolerance, empty if there are none.
+    """
+    regressions: list[str] = []
+
+    if report.throughput < baseline.throughput * (1 - tolerance):
+        regressions.append(f"throughput {report.throughput:.1f}/s < baseline {baseline.throughput:.1f}/s")
+
+    if report.latency_p99_ms > baseline.latency_p99_ms * (1 + tolerance):
+        regressions.append(f"p99 {report.latency_p99_ms:.1f} ms > baseline {baseline.latency_p99_ms:.1f} ms")
+
+    if report.failed > baseline.failed:
+        regressions.append(f"failed {report.failed} > baseline {baseline.failed}")
+
+    return regressions
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    if len(sorted_values) < 2:  # noqa: PLR2004
+        return sorted_values[0] if sorted_values else 0.0
+
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[percent - 1]
@@ -0,0 +1,62 @@
+import asyncio
+import hashlib
+import random
+from collections import Counter
+from http import HTTPStatus
+from typing import Final
+
+from httpx import Request, Response
+
+
+JPEG_HEADER: Final[bytes] = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+
+class ImageCdnStandIn:
+    """In-process image CDN stand-in, a handler for ``httpx.MockTransport``.
+
+    Every url is answered with ``image_size`` bytes of JPEG-looking content unique for the url.
+    Answers take ``latency`` plus up to ``jitter`` seconds and fail with 500 at ``error_rate``.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        image_size: int = 100_000,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.image_size: Final[int] = image_size
+        self.latency: Final[float] = latency
+        self.jitter: Final[float] = jitter
+        self.error_rate: Final[float] = error_rate
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.bytes_sent: int = 0
+        self._random: random.Random = random.Random(seed)
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def __call__(self, request: Request) -> Response:
+        self.requests[request.url.host] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors[request.url.host] += 1
+
+            return Response(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        body: bytes = self._render(str(request.url))
+        self.bytes_sent += len(body)
+
+        return Response(HTTPStatus.OK, content=body, headers={"Content-Type": "image/jpeg"})
+
+    def _render(self, url: str) -> bytes:
+        seed: bytes = hashlib.sha256(url.encode()).digest()
+        filler_size: int = max(self.image_size - len(JPEG_HEADER), 0)
+
+        return JPEG_HEADER + (seed * (filler_size // len(seed) + 1))[:filler_size]
@@ -0,0 +1,205 @@
+import asyncio
+import base64
+import itertools
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from http import HTTPStatus
+from typing import Any, Final
+
+from httpx import Request, Response
+
+
+ENTITY_KEYS: Final[dict[str, tuple[str, ...]]] = {
+    "products": ("external_id", "marketplace_id"),
+    "categories": ("name", "marketplace_id"),
+    "brands": ("name", "marketplace_id"),
+    "characteristics": ("name", "product_type_name", "marketplace_id"),
+    "characteristic_values": ("value", "characteristic_name", "marketplace_id"),
+}
+
+
+class MarketsBridgeStandIn:
+    """In-process Markets Bridge stand-in, a handler for ``httpx.MockTransport``.
+
+    Entities are upserted by their natural keys, bulk endpoints are served under ``<entity>/bulk/``.
+    A product referring to an entity which wasn't upserted is answered with 404, clearing ``entities``
+    stands for a Markets Bridge that lost them.
+    Entities of marketplace are listed by ``GET <entity>/?marketplace_id=`` in pages of ``page_size``.
+    Every request is answered after ``latency`` plus up to ``jitter`` seconds, provider endpoints fail
+    with 500 at ``error_rate``.
+    Tokens are unsigned JWTs with ``exp`` claim, expired tokens are answered with 401.
+
+    Example:
+        ```python
+        stand_in = MarketsBridgeStandIn()
+        session = AsyncClient(transport=MockTransport(stand_in))
+        ```
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        access_token_lifetime: float = 300.0,
+        refresh_token_lifetime: float = 86400.0,
+        page_size: int = 100,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.access_token_lifetime: Final[float] = access_token_lifetime
+        self.refresh_token_lifetime: Final[float] = refresh_token_lifetime
+        self.page_size: Final[int] = page_size
+        self.latency: Final[float] = latency
+        self.jitter: Final[float] = jitter
+        self.error_rate: Final[float] = error_rate
+        self.entities: defaultdict[str, dict[tuple, int]] = defaultdict(dict)
+        self.images: list[tuple[int, int]] = []
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._random: random.Random = random.Random(seed)
+        self._ids: itertools.count = itertools.count(1)
+        self._tokens: itertools.count = itertools.count(1)
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def __call__(self, request: Request) -> Response:
+        path: str = request.url.path
+        self.requests[path] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        if path.startswith("/api/token/"):
+            return self._token(request)
+
+        authorization: str = request.headers.get("Authorization", "")
+
+        if not authorization.startswith("Bearer ") or not self._is_alive(authorization.removeprefix("Bearer ")):
+            return Response(HTTPStatus.UNAUTHORIZED)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors[path] += 1
+
+            return Response(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        return self._provider(request)
+
+    def _token(self, request: Request) -> Response:
+        if request.url.path == "/api/token/refresh/":
+            if not self._is_alive(json.loads(request.content)["refresh"]):
+                return Response(HTTPStatus.UNAUTHORIZED)
+
+            return Response(HTTPStatus.OK, json={"access": self._issue_token(self.access_token_lifetime)})
+
+        return Response(
+            HTTPStatus.OK,
+            json={
+                "access": self._issue_token(self.access_token_lifetime),
+                "refresh": self._issue_token(self.refresh_token_lifetime),
+            },
+        )
+
+    def _provider(self, request: Request) -> Response:
+        resource, *rest = request.url.path.removeprefix("/api/v1/provider/").strip("/").split("/")
+
+        if resource == "product_images" and request.method == "POST":
+            self.images.append((next(self._ids), len(request.content)))
+
+            return Response(HTTPStatus.CREATED, json={"id": self.images[-1][0]})
+
+        if resource in ENTITY_KEYS and request.method == "GET" and not rest:
+            return self._list(request, resource)
+
+        if resource not in ENTITY_KEYS or request.method != "POST":
+            return Response(HTTPStatus.NOT_FOUND)
+
+        payload: Any = json.loads(request.content)
+
+        if rest == ["bulk"]:
+            results: list[tuple[int, bool]] = [self._upsert(resource, entity) for entity in payload]
+
+            return Response(
+                HTTPStatus.OK,
+                json=[{"id": entity_id, "is_new": is_new} for entity_id, is_new in results],
+            )
+
+        if resource == "products" and not self._knows_references(payload):
+            return Response(HTTPStatus.NOT_FOUND)
+
+        entity_id, is_new = self._upsert(resource, payload)
+
+        return Response(HTTPStatus.CREATED if is_new else HTTPStatus.OK, json={"id": entity_id, **payload})
+
+    def _list(self, request: Request, resource: str) -> Response:
+        marketplace_id: int = int(request.url.params["marketplace_id"])
+        offset: int = int(request.url.params.get("offset", 0))
+        names: tuple[str, ...] = ENTITY_KEYS[resource]
+        entities: list[dict] = [
+            {"id": entity_id, **dict(zip(names, key, strict=True))}
+            for key, entity_id in self.entities[resource].items()
+            if key[-1] == marketplace_id
+        ]
+        next_offset: int = offset + self.page_size
+
+        return Response(
+            HTTPStatus.OK,
+            json={
+                "count": len(entities),
+                "next": (
+                    str(request.url.copy_merge_params({"offset": next_offset})) if next_offset < len(entities) else None
+                ),
+                "results": entities[offset:next_offset],
+            },
+        )
+
+    def _upsert(self, resource: str, entity: dict) -> tuple[int, bool]:
+        key: tuple = tuple(entity[name] for name in ENTITY_KEYS[resource])
+
+        if (entity_id := self.entities[resource].get(key)) is not None:
+            return entity_id, False
+
+        entity_id = next(self._ids)
+        self.entities[resource][key] = entity_id
+
+        return entity_id, True
+
+    def _knows_references(self, product: dict) -> bool:
+        """Tell whether the category, brand and characteristics of a product were upserted."""
+        marketplace_id: int = product["marketplace_id"]
+        category_name: str = product["category_name"]
+        references: list[tuple[str, tuple]] = [
+            ("categories", (category_name, marketplace_id)),
+            ("brands", (product["brand_name"], marketplace_id)),
+        ]
+
+        for characteristic in product["characteristics"]:
+            references.append(("characteristics", (characteristic["name"], category_name, marketplace_id)))
+            references.append(
+                ("characteristic_values", (characteristic["value"], characteristic["name"], marketplace_id)),
+            )
+
+        return all(key in self.entities[resource] for resource, key in references)
+
+    def _issue_token(self, lifetime: float) -> str:
+        claims: dict = {"jti": next(self._tokens), "exp": time.time() + lifetime}
+        segments: list[bytes] = [
+            json.dumps({"alg": "none", "typ": "JWT"}).encode(),
+            json.dumps(claims).encode(),
+            b"",
+        ]
+
+        return ".".join(base64.urlsafe_b64encode(segment).rstrip(b"=").decode() for segment in segments)
+
+    @staticmethod
+    def _is_alive(token: str) -> bool:
+        try:
+            payload: str = token.split(".")[1]
+            claims: Any = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except (IndexError, ValueError):
+            return False
+
+        return claims.get("exp", 0) > time.time()
@@ -0,0 +1,88 @@
+"""Import products from a JSON lines dump, optionally gzip-compressed, without the broker.
+
+Images are fetched and uploaded inline instead of going through the image loading queue.
+Run again with the same ``--results`` file to resume, lines sent before are skipped.
+
+Usage: ``python -m ozon_importer.bulk_import products.jsonl.gz --results results.jsonl --concurrency 16``.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from ozon_importer.container import Container
+from ozon_importer.metrics.profiler import Profiler
+from ozon_importer.services.bulk_importer import BulkImporter
+from ozon_importer.services.product_importer import ProductImporter
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m ozon_importer.bulk_import")
+    parser.add_argument("dump", type=Path, help="JSON lines file with a product per line, may be gzip-compressed")
+    parser.add_argument("--results", type=Path, help="outcome of every line, defaults to <dump>.results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=8, help="batches sent at once")
+    parser.add_argument("--batch-size", type=int, default=50, help="products per batch")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="seconds between progress reports")
+    parser.add_argument("--debug", action="store_true", help="log every request")
+
+    return parser.parse_args()
+
+
+async def report_progress(importer: BulkImporter, interval: float, logger: logging.Logger) -> None:
+    started_at: float = time.monotonic()
+    previous_done: int = 0
+
+    while True:
+        await asyncio.sleep(interval)
+        done: int = importer.sent + importer.failed
+        logger.info(
+            "line %d (%.1f%%), sent %d, failed %d, %.1f products/s now, %.1f products/s overall",
+            importer.lines,
+            importer.progress * 100,
+            importer.sent,
+            importer.failed,
+            (done - previous_done) / interval,
+            done / (time.monotonic() - started_at),
+        )
+        previous_done = done
+
+
+async def bulk_import(arguments: argparse.Namespace) -> None:
+    logging.basicConfig(level=logging.DEBUG if arguments.debug else logging.INFO)
+    logger: logging.Logger = logging.getLogger("ozon_importer.bulk_import")
+    results_path: Path = arguments.results or arguments.dump.with_name(f"{arguments.dump.name}.results.jsonl")
+    started_at: float = time.monotonic()
+    await Container.aopen()
+
+    try:
+        product_importer: ProductImporter = Container.bulk_product_importer()  # type: ignore[operator]
+        profiler: Profiler = Container.profiler()  # type: ignore[operator]
+        profiler.attach()
+        importer: BulkImporter = BulkImporter(product_importer, arguments.concurrency, arguments.batch_size)
+        reporter: asyncio.Task = asyncio.create_task(report_progress(importer, arguments.progress_interval, logger))
+
+        try:
+            await importer.run(arguments.dump, results_path, logger)
+        finally:
+            reporter.cancel()
+            await profiler.detach()
+    finally:
+        await Container.aclose()
+
+    seconds: float = time.monotonic() - started_at
+    logger.info(
+        "imported %s in %.1f s: sent %d, failed %d, %d sent before, %.1f products/s, results in %s",
+        arguments.dump,
+        seconds,
+        importer.sent,
+        importer.failed,
+        importer.resumed,
+        (importer.sent + importer.failed) / seconds,
+        results_path,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(bulk_import(parse_arguments()))
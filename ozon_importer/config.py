@@ -1,10 +1,35 @@
-from pydantic import AmqpDsn, HttpUrl
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Final
+
+from pydantic import AmqpDsn, HttpUrl, field_validator
 from pydantic_settings import BaseSettings
 
+from ozon_importer.queues import get_dead_letter_queue
+
+
+DATA_DIR: Final[Path] = Path("/data")
+
 
 class Settings(BaseSettings):
     amqp_dsn: AmqpDsn
     parsed_loading_queue_prefix: str = "parsed_loading."
+    parsed_loading_batch_size: int = 1
+    parsed_loading_batch_timeout_ms: int = 50
+    parsed_loading_prefetch_count: int | None = None
+    parsed_loading_max_in_flight: int = 16
+    parsed_loading_max_attempts: int = 3
+    image_loading_queue_prefix: str = "image_loading."
+    image_loading_max_in_flight: int = 8
+    image_loading_max_attempts: int = 5
+    image_loading_retry_delay: float = 30.0
+    image_loading_max_age: float | None = 86400.0
+    log_sample_rate: float = 0.1
+
+    workers: int = 1
+    worker_index: int = 0
+    worker_shutdown_timeout: float = 60.0
+    worker_restart_delay: float = 5.0
 
     ozon_id: int
     ozon_name: str = "ozon"
@@ -12,13 +37,150 @@ class Settings(BaseSettings):
     markets_bridge_host: HttpUrl
     markets_bridge_login: str
     markets_bridge_password: str
+    mb_token_refresh_leeway: float = 30.0
+    mb_concurrency_initial: int = 16
+    mb_concurrency_min: int = 2
+    mb_concurrency_max: int = 50
+    mb_latency_target: float = 2.0
+
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 60.0
+    http_write_timeout: float = 60.0
+    http_pool_timeout: float = 10.0
+
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 10.0
+    retry_budget_ratio: float = 0.2
+    retry_budget_min_per_second: float = 5.0
+    circuit_failure_threshold: int = 20
+    circuit_reset_timeout: float = 30.0
+
+    mb_max_connections: int = 50
+    mb_max_keepalive_connections: int = 20
+    mb_http2: bool = False
+
+    image_max_connections: int = 100
+    image_max_keepalive_connections: int = 20
+    image_max_connections_per_host: int = 8
+    image_download_concurrency: int = 32
+    image_max_size: int | None = 32 * 1024 * 1024
+
+    entity_cache_size: int = 100_000
+    entity_cache_ttl: float = 3600.0
+    entity_id_store_path: Path = DATA_DIR / "entity_ids.sqlite3"
+    product_snapshot_store_path: Path = DATA_DIR / "product_snapshots.sqlite3"
+    import_checkpoint_store_path: Path = DATA_DIR / "import_checkpoints.sqlite3"
+
+    product_upsert_concurrency: int = 16
+
+    image_fetch_concurrency: int = 8
+    image_max_in_flight_bytes: int = 64 * 1024 * 1024
+    image_cache_dir: Path = DATA_DIR / "images"
+    image_cache_max_bytes: int = 0
+    image_cache_max_age: float | None = 86400.0
+    image_transcode: bool = False
+    image_max_dimension: int = 2048
+    image_target_format: str = "JPEG"
+    image_quality: int = 85
+    image_transcode_workers: int | None = None
+
+    mb_bulk_requests: bool = False
+    mb_bulk_size: int = 500
+
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int | None = None
+
+    profiling: bool = False
+    profiling_path: Path = DATA_DIR / "profiles" / "profile.txt"
+    profiling_interval: float = 60.0
+    profiling_sample_interval: float = 0.005
+    profiling_slow_callback_duration: float = 0.1
+    profiling_tracemalloc_frames: int = 0
+
+    @field_validator("mb_http2")
+    @classmethod
+    def check_http2_support(cls, http2: bool) -> bool:
+        if http2 and find_spec("h2") is None:
+            msg = "HTTP/2 requires the h2 package, install the 'http2' extra"
+            raise ValueError(msg)
+
+        return http2
+
+    @property
+    def metrics_enabled(self) -> bool:
+        return self.metrics_port is not None
+
+    @property
+    def worker_metrics_port(self) -> int | None:
+        if self.metrics_port is None:
+            return None
+
+        return self.metrics_port + self.worker_index
+
+    @property
+    def worker_profiling_path(self) -> Path:
+        if self.workers == 1:
+            return self.profiling_path
 
-    http_timeout: float = 100000.0
+        return self.profiling_path.with_stem(f"{self.profiling_path.stem}.{self.worker_index}")
+
+    @property
+    def worker_image_cache_dir(self) -> Path:
+        """Image cache of this worker, workers can't share one as each of them accounts and evicts its files."""
+        if self.workers == 1:
+            return self.image_cache_dir
+
+        return self.image_cache_dir / str(self.worker_index)
+
+    @property
+    def worker_image_cache_max_bytes(self) -> int:
+        """Part of ``image_cache_max_bytes`` of this worker, so caches of all workers keep the limit together."""
+        return self.image_cache_max_bytes // self.workers
 
     @property
     def parsed_loading_queue(self) -> str:
         return f"{self.parsed_loading_queue_prefix}{self.ozon_name}"
 
+    @property
+    def parsed_loading_shard_queues(self) -> list[str]:
+        return [f"{self.parsed_loading_queue}.{index}" for index in range(self.workers)]
+
+    @property
+    def parsed_loading_worker_queue(self) -> str:
+        """Queue consumed by this worker, its shard queue if there are several workers."""
+        if self.workers == 1:
+            return self.parsed_loading_queue
+
+        return self.parsed_loading_shard_queues[self.worker_index]
+
+    @property
+    def parsed_loading_dead_letter_queue(self) -> str:
+        return get_dead_letter_queue(self.parsed_loading_worker_queue)
+
+    @property
+    def image_loading_queue(self) -> str:
+        return f"{self.image_loading_queue_prefix}{self.ozon_name}"
+
+    @property
+    def image_loading_retry_queue(self) -> str:
+        return f"{self.image_loading_queue}.retry"
+
+    @property
+    def image_loading_dead_letter_queue(self) -> str:
+        return get_dead_letter_queue(self.image_loading_queue)
+
+    @property
+    def parsed_loading_batch_timeout(self) -> float:
+        return self.parsed_loading_batch_timeout_ms / 1000
+
+    @property
+    def parsed_loading_max_consumers(self) -> int:
+        if self.parsed_loading_prefetch_count is not None:
+            return self.parsed_loading_prefetch_count
+
+        return self.parsed_loading_max_in_flight * self.parsed_loading_batch_size
+
     @property
     def mb_products_url(self) -> str:
         return f"{self.markets_bridge_host}api/v1/provider/products/"
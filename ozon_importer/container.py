@@ -2,39 +2,282 @@ from collections.abc import Sequence
 
 from bakery import Bakery, Cake
 from faststream.rabbit import RabbitBroker, RabbitQueue, RabbitRoute, RabbitRouter
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits, Timeout
 
 from ozon_importer.config import Settings
+from ozon_importer.handlers.decoders import ModelDecoder, parse_with_stable_message_id
+from ozon_importer.handlers.image_loading import ImageLoadingHandler
 from ozon_importer.handlers.parsed_loading import ParsedLoadingHandler
+from ozon_importer.handlers.types import ImageTask
+from ozon_importer.interfaces import IMetrics
+from ozon_importer.metrics.profiler import Profiler, ProfilingMetrics
+from ozon_importer.metrics.registry import create_metrics
+from ozon_importer.metrics.server import MetricsServer
+from ozon_importer.queues import make_queue
+from ozon_importer.repositories.adaptive_limiter import AdaptiveLimiter, AdaptiveLimits
+from ozon_importer.repositories.download_scheduler import DownloadScheduler
+from ozon_importer.repositories.entity_cache import EntityCache
+from ozon_importer.repositories.entity_id_store import SqliteEntityIdStore
 from ozon_importer.repositories.http_fetcher import HttpFetcher
 from ozon_importer.repositories.httpx_client import HttpxClient
+from ozon_importer.repositories.image_cache import CachingImageFetcher, DiskImageCache
+from ozon_importer.repositories.image_task_publisher import ImageTaskPublisher
+from ozon_importer.repositories.import_checkpoint_store import SqliteImportCheckpointStore
 from ozon_importer.repositories.markets_bridge_client.client import MarketsBridgeClient
+from ozon_importer.repositories.product_snapshot_store import SqliteProductSnapshotStore
+from ozon_importer.repositories.retry_policy import RetryBudget, RetryPolicy
+from ozon_importer.services.entity_warmer import EntityWarmer
+from ozon_importer.services.image_pipeline import ByteBudget, ImagePipeline
+from ozon_importer.services.image_transcoder import ImageTranscoder
+from ozon_importer.services.product_batcher import ProductBatcher
 from ozon_importer.services.product_importer import ProductImporter
+from ozon_importer.types import Product
 
 
 class Container(Bakery):
     settings: Settings = Cake(Settings)  # type: ignore[assignment]
 
-    broker: RabbitBroker = Cake(RabbitBroker, settings.amqp_dsn_str)
-    _httpx_client: HttpxClient = Cake(
+    broker: RabbitBroker = Cake(
+        RabbitBroker,
+        settings.amqp_dsn_str,
+        max_consumers=settings.parsed_loading_max_consumers,
+    )
+    _entity_cache: EntityCache = Cake(
+        EntityCache,
+        maxsize=settings.entity_cache_size,
+        ttl=settings.entity_cache_ttl,
+    )
+    _image_cache: DiskImageCache = Cake(
+        DiskImageCache,
+        settings.worker_image_cache_dir,
+        max_bytes=settings.worker_image_cache_max_bytes,
+        max_age=settings.image_cache_max_age,
+    )
+    _download_scheduler: DownloadScheduler = Cake(
+        DownloadScheduler,
+        settings.image_download_concurrency,
+        max_per_host=settings.image_max_connections_per_host,
+    )
+    _markets_bridge_limiter: AdaptiveLimiter = Cake(
+        AdaptiveLimiter,
+        Cake(
+            AdaptiveLimits,
+            initial_limit=settings.mb_concurrency_initial,
+            min_limit=settings.mb_concurrency_min,
+            max_limit=settings.mb_concurrency_max,
+            latency_target=settings.mb_latency_target,
+        ),
+    )
+    _retry_budget: RetryBudget = Cake(
+        RetryBudget,
+        ratio=settings.retry_budget_ratio,
+        min_per_second=settings.retry_budget_min_per_second,
+    )
+    profiler: Profiler = Cake(
+        Profiler,
+        settings.worker_profiling_path,
+        enabled=settings.profiling,
+        interval=settings.profiling_interval,
+        sample_interval=settings.profiling_sample_interval,
+        slow_callback_duration=settings.profiling_slow_callback_duration,
+        tracemalloc_frames=settings.profiling_tracemalloc_frames,
+    )
+    _metrics_registry: IMetrics = Cake(
+        create_metrics,
+        settings.metrics_enabled,
+        sources=(_entity_cache, _image_cache, _markets_bridge_limiter, _retry_budget, _download_scheduler),
+    )
+    metrics: IMetrics = Cake(ProfilingMetrics, _metrics_registry, profiler)
+    _retry_policy: RetryPolicy = Cake(
+        RetryPolicy,
+        max_attempts=settings.retry_max_attempts,
+        base_delay=settings.retry_base_delay,
+        max_delay=settings.retry_max_delay,
+        budget=_retry_budget,
+        failure_threshold=settings.circuit_failure_threshold,
+        reset_timeout=settings.circuit_reset_timeout,
+        metrics=metrics,
+    )
+    metrics_server: MetricsServer = Cake(
+        MetricsServer,
+        _metrics_registry,
+        settings.metrics_host,
+        settings.worker_metrics_port,
+    )
+    _http_timeout: Timeout = Cake(
+        Timeout,
+        connect=settings.http_connect_timeout,
+        read=settings.http_read_timeout,
+        write=settings.http_write_timeout,
+        pool=settings.http_pool_timeout,
+    )
+    _markets_bridge_httpx_client: HttpxClient = Cake(
         HttpxClient,
         session=Cake(
             AsyncClient,
-            timeout=settings.http_timeout,
+            timeout=_http_timeout,
+            limits=Cake(
+                Limits,
+                max_connections=settings.mb_max_connections,
+                max_keepalive_connections=settings.mb_max_keepalive_connections,
+            ),
+            http2=settings.mb_http2,
         ),
+        metrics=metrics,
     )
+    _image_httpx_client: HttpxClient = Cake(
+        HttpxClient,
+        session=Cake(
+            AsyncClient,
+            timeout=_http_timeout,
+            limits=Cake(
+                Limits,
+                max_connections=settings.image_max_connections,
+                max_keepalive_connections=settings.image_max_keepalive_connections,
+            ),
+        ),
+        metrics=metrics,
+    )
+    _entity_id_store: SqliteEntityIdStore = Cake(Cake(SqliteEntityIdStore, settings.entity_id_store_path))
     _markets_bridge_client: MarketsBridgeClient = Cake(
         MarketsBridgeClient,
-        http_client=_httpx_client,
+        http_client=_markets_bridge_httpx_client,
         markets_bridge_host=settings.markets_bridge_host,
         markets_bridge_login=settings.markets_bridge_login,
         markets_bridge_password=settings.markets_bridge_password,
+        entity_cache=_entity_cache,
+        entity_id_store=_entity_id_store,
+        bulk_size=settings.mb_bulk_size,
+        token_refresh_leeway=settings.mb_token_refresh_leeway,
+        limiter=_markets_bridge_limiter,
+        retry_policy=_retry_policy,
+        metrics=metrics,
+    )
+    entity_warmer: EntityWarmer = Cake(EntityWarmer, _markets_bridge_client, settings.ozon_id)
+    _http_fetcher: HttpFetcher = Cake(
+        HttpFetcher,
+        _image_httpx_client,
+        scheduler=_download_scheduler,
+        max_size=settings.image_max_size,
+        retry_policy=_retry_policy,
+    )
+    _image_fetcher: CachingImageFetcher = Cake(CachingImageFetcher, _http_fetcher, _image_cache)
+    _image_transcoder: ImageTranscoder = Cake(
+        Cake(
+            ImageTranscoder,
+            settings.image_transcode,
+            settings.image_max_dimension,
+            target_format=settings.image_target_format,
+            quality=settings.image_quality,
+            workers=settings.image_transcode_workers,
+            metrics=metrics,
+        ),
+    )
+    _image_pipeline: ImagePipeline = Cake(
+        ImagePipeline,
+        _markets_bridge_client,
+        _image_fetcher,
+        budget=Cake(ByteBudget, settings.image_max_in_flight_bytes),
+        concurrency=settings.image_fetch_concurrency,
+        transcoder=_image_transcoder,
+        metrics=metrics,
+    )
+    _image_task_publisher: ImageTaskPublisher = Cake(
+        ImageTaskPublisher,
+        broker,
+        settings.image_loading_queue,
+        settings.image_loading_retry_queue,
+    )
+    _product_snapshot_store: SqliteProductSnapshotStore = Cake(
+        Cake(SqliteProductSnapshotStore, settings.product_snapshot_store_path),
+    )
+    _import_checkpoint_store: SqliteImportCheckpointStore = Cake(
+        Cake(SqliteImportCheckpointStore, settings.import_checkpoint_store_path),
+    )
+    _product_importer: ProductImporter = Cake(
+        ProductImporter,
+        _markets_bridge_client,
+        _image_task_publisher,
+        settings.ozon_id,
+        concurrency=settings.product_upsert_concurrency,
+        bulk=settings.mb_bulk_requests,
+        snapshot_store=_product_snapshot_store,
+        checkpoint_store=_import_checkpoint_store,
+        metrics=metrics,
+    )
+    bulk_product_importer: ProductImporter = Cake(
+        ProductImporter,
+        _markets_bridge_client,
+        _image_pipeline,
+        settings.ozon_id,
+        concurrency=settings.product_upsert_concurrency,
+        bulk=settings.mb_bulk_requests,
+        snapshot_store=_product_snapshot_store,
+        checkpoint_store=_import_checkpoint_store,
+        metrics=metrics,
+    )
+    _product_batcher: ProductBatcher = Cake(
+        ProductBatcher,
+        _product_importer,
+        max_size=settings.parsed_loading_batch_size,
+        max_delay=settings.parsed_loading_batch_timeout,
+        max_in_flight=settings.parsed_loading_max_in_flight,
+    )
+    _parsed_loading_handler: ParsedLoadingHandler = Cake(
+        ParsedLoadingHandler,
+        _product_batcher,
+        backpressure=_markets_bridge_limiter,
+        metrics=metrics,
+        log_sample_rate=settings.log_sample_rate,
+    )
+    _parsed_loading_queue: RabbitQueue = Cake(
+        make_queue,
+        settings.parsed_loading_worker_queue,
+        settings.parsed_loading_dead_letter_queue,
+    )
+    _parsed_loading_dead_letter_queue: RabbitQueue = Cake(make_queue, settings.parsed_loading_dead_letter_queue)
+    _parsed_loading_route: RabbitRoute = Cake(
+        RabbitRoute,
+        _parsed_loading_handler,
+        _parsed_loading_queue,
+        parser=parse_with_stable_message_id,
+        decoder=Cake(ModelDecoder, Product),
+        retry=settings.parsed_loading_max_attempts,
     )
-    _http_fetcher: HttpFetcher = Cake(HttpFetcher, _httpx_client)
-    _product_importer: ProductImporter = Cake(ProductImporter, _markets_bridge_client, _http_fetcher, settings.ozon_id)
-    _parsed_loading_handler: ParsedLoadingHandler = Cake(ParsedLoadingHandler, _product_importer)
-    _parsed_loading_queue: RabbitQueue = Cake(RabbitQueue, settings.parsed_loading_queue, durable=True)
-    _parsed_loading_route: RabbitRoute = Cake(RabbitRoute, _parsed_loading_handler, _parsed_loading_queue)
 
-    _routes: Sequence[RabbitRoute] = (_parsed_loading_route,)
+    _image_loading_handler: ImageLoadingHandler = Cake(
+        ImageLoadingHandler,
+        _image_pipeline,
+        _image_task_publisher,
+        max_attempts=settings.image_loading_max_attempts,
+        retry_delay=settings.image_loading_retry_delay,
+        max_age=settings.image_loading_max_age,
+        max_in_flight=settings.image_loading_max_in_flight,
+        backpressure=_markets_bridge_limiter,
+        metrics=metrics,
+        log_sample_rate=settings.log_sample_rate,
+    )
+    _image_loading_queue: RabbitQueue = Cake(
+        make_queue,
+        settings.image_loading_queue,
+        settings.image_loading_dead_letter_queue,
+    )
+    _image_loading_retry_queue: RabbitQueue = Cake(
+        make_queue,
+        settings.image_loading_retry_queue,
+        settings.image_loading_queue,
+    )
+    _image_loading_dead_letter_queue: RabbitQueue = Cake(make_queue, settings.image_loading_dead_letter_queue)
+    _image_loading_route: RabbitRoute = Cake(
+        RabbitRoute,
+        _image_loading_handler,
+        _image_loading_queue,
+        decoder=Cake(ModelDecoder, ImageTask),
+    )
+
+    _routes: Sequence[RabbitRoute] = (_parsed_loading_route, _image_loading_route)
     router: RabbitRouter = Cake(RabbitRouter, handlers=_routes)
+    unconsumed_queues: Sequence[RabbitQueue] = Cake(
+        list,
+        [_parsed_loading_dead_letter_queue, _image_loading_retry_queue, _image_loading_dead_letter_queue],
+    )
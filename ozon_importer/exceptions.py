@@ -1,3 +1,28 @@
 class ProductTypeNotFoundError(Exception):
     def __init__(self, product_name: str) -> None:
         super().__init__(f"Product type not found at '{product_name}'")
+
+
+class BulkResponseMismatchError(Exception):
+    def __init__(self, url: str, sent: int, received: int) -> None:
+        super().__init__(f"Bulk endpoint '{url}' answered with {received} results for {sent} entities")
+
+
+class ImageTranscodingUnavailableError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Image transcoding requires Pillow, install the 'transcode' extra")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, backend: str, retry_in: float) -> None:
+        super().__init__(f"Circuit of '{backend}' is open, next trial in {retry_in:.1f}s")
+
+
+class ImageTooLargeError(Exception):
+    def __init__(self, url: str, max_size: int) -> None:
+        super().__init__(f"Image '{url}' is larger than {max_size} bytes")
+
+
+class StaleProductEntitiesError(Exception):
+    def __init__(self, product_name: str, status: int) -> None:
+        super().__init__(f"Markets Bridge answered {status} for '{product_name}', its entities are sent again")
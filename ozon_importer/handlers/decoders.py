@@ -0,0 +1,41 @@
+import hashlib
+from collections.abc import Awaitable, Callable
+from typing import Any, Final
+
+from aio_pika import IncomingMessage
+from faststream.broker.message import StreamMessage
+from faststream.rabbit.annotations import RabbitMessage
+from pydantic import BaseModel
+
+
+class ModelDecoder:
+    """Message decoder validating the body into a model straight from bytes.
+
+    Skips decoding JSON into Python objects before validation, pydantic parses the bytes itself.
+    """
+
+    def __init__(self, model: type[BaseModel]) -> None:
+        self.model: Final[type[BaseModel]] = model
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def __call__(self, message: StreamMessage[Any], original_decoder: Callable[..., Any]) -> BaseModel:  # noqa: ARG002
+        return self.model.model_validate_json(message.body)
+
+
+async def parse_with_stable_message_id(
+    message: IncomingMessage,
+    original_parser: Callable[[IncomingMessage], Awaitable[RabbitMessage]],
+) -> RabbitMessage:
+    """Message parser giving a message without ``message_id`` the hash of its body as the id.
+
+    Redeliveries of a route with ``retry`` are counted by message id, a random id of every delivery
+    would redeliver a failing message forever.
+    """
+    parsed: RabbitMessage = await original_parser(message)
+
+    if message.message_id is None:
+        parsed.message_id = hashlib.sha256(message.body).hexdigest()
+
+    return parsed
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from typing import Final
+
+from faststream import Logger
+from faststream.exceptions import RejectMessage
+from httpx import HTTPError, InvalidURL
+
+from ozon_importer.exceptions import CircuitOpenError
+from ozon_importer.handlers.interfaces import IBackpressure, IImageSender, IImageTaskPublisher
+from ozon_importer.handlers.types import ImageTask
+from ozon_importer.interfaces import IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
+from ozon_importer.repositories.http_errors import is_transient_error
+from ozon_importer.sampled_logger import SampledLogger
+
+
+class ImageLoadingHandler:
+    """Loads one product image per message.
+
+    A failed image is published again after ``retry_delay`` with the next attempt number until
+    ``max_attempts`` is reached, then its message is rejected to the dead letter queue. Transient failures,
+    an open circuit, a transport error or an overload, don't count as attempts, but an image queued more
+    than ``max_age`` seconds ago is rejected on any failure. Debug records made while loading are sampled
+    at ``log_sample_rate``, every message ends with one summary record.
+
+    Failures of the image pipeline come in an exception group of its task group, other errors are bugs
+    and are not retried.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        image_sender: IImageSender,
+        image_task_publisher: IImageTaskPublisher,
+        max_attempts: int = 1,
+        retry_delay: float = 0.0,
+        max_age: float | None = None,
+        max_in_flight: int = 1,
+        backpressure: IBackpressure | None = None,
+        metrics: IMetrics = NULL_METRICS,
+        log_sample_rate: float = 1.0,
+    ) -> None:
+        self.image_sender: Final[IImageSender] = image_sender
+        self.log_sample_rate: Final[float] = log_sample_rate
+        self.image_task_publisher: Final[IImageTaskPublisher] = image_task_publisher
+        self.max_attempts: Final[int] = max_attempts
+        self.retry_delay: Final[float] = retry_delay
+        self.max_age: Final[float | None] = max_age
+        self.backpressure: Final[IBackpressure | None] = backpressure
+        self.metrics: Final[IMetrics] = metrics
+        self._in_flight: Final[asyncio.Semaphore] = asyncio.Semaphore(max_in_flight)
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def __call__(
+        self,
+        task: ImageTask,
+        logger: Logger,
+    ) -> None:
+        logger.debug("%s received %s for product %s, attempt %d", self, task.url, task.product_id, task.attempt + 1)
+        message_logger: SampledLogger = SampledLogger(logger, self.log_sample_rate)
+        received_at: float = time.perf_counter()
+        created_at: float = task.created_at or time.time()
+
+        if self.backpressure is not None:
+            await self.backpressure.wait_until_available()
+
+        try:
+            with self.metrics.timer("ozon_importer_stage_seconds", stage="image_loading"):
+                async with self._in_flight:
+                    await self.image_sender.send(task.product_id, [task.url], message_logger)
+        except (ExceptionGroup, HTTPError, InvalidURL, CircuitOpenError) as error:
+            next_attempt: int = task.attempt if is_transient_error(error) else task.attempt + 1
+            expired: bool = self.max_age is not None and time.time() - created_at >= self.max_age
+
+            if next_attempt >= self.max_attempts or expired:
+                self.metrics.increment("ozon_importer_messages_total", queue="image_loading", outcome="rejected")
+                logger.error(  # noqa: TRY400
+                    "%s gives up %s for product %s in %.1f ms: %r",
+                    self,
+                    task.url,
+                    task.product_id,
+                    (time.perf_counter() - received_at) * 1000,
+                    error,
+                )
+                raise RejectMessage from error
+
+            logger.warning(
+                "%s failed %s for product %s, attempt %d, in %.1f ms: %r",
+                self,
+                task.url,
+                task.product_id,
+                task.attempt + 1,
+                (time.perf_counter() - received_at) * 1000,
+                error,
+            )
+            await self.image_task_publisher.publish(
+                task.model_copy(update={"attempt": next_attempt, "created_at": created_at}),
+                self.retry_delay,
+            )
+            self.metrics.increment("ozon_importer_messages_total", queue="image_loading", outcome="retried")
+        else:
+            self.metrics.increment("ozon_importer_messages_total", queue="image_loading", outcome="handled")
+            logger.info(
+                "%s handled %s for product %s in %.1f ms, %d debug records",
+                self,
+                task.url,
+                task.product_id,
+                (time.perf_counter() - received_at) * 1000,
+                message_logger.records,
+            )
@@ -1,8 +1,7 @@
 from collections.abc import Sequence
 from typing import Protocol
 
-from pydantic import AnyHttpUrl
-
+from ozon_importer.handlers.types import ImageTask
 from ozon_importer.interfaces import ILogger
 
 
@@ -17,9 +16,21 @@ class IProduct(Protocol):
     brand: str
     description: str
     characteristics: Sequence[ICharacteristic]
-    images: Sequence[AnyHttpUrl]
-    url: AnyHttpUrl
+    images: Sequence[str]
+    url: str
 
 
 class IProductSender(Protocol):
     async def send(self, product: IProduct, logger: ILogger | None = None) -> None: ...
+
+
+class IImageSender(Protocol):
+    async def send(self, product_id: int, urls: Sequence[str], logger: ILogger | None = None) -> None: ...
+
+
+class IBackpressure(Protocol):
+    async def wait_until_available(self) -> None: ...
+
+
+class IImageTaskPublisher(Protocol):
+    async def publish(self, task: ImageTask, delay: float = 0.0) -> None: ...
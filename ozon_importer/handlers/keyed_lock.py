@@ -0,0 +1,36 @@
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class KeyedLock:
+    """Mutual exclusion per key.
+
+    Holders of one key are served in order of arrival, a lock lives only while its key is held or awaited.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._holders: Counter[str] = Counter()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+
+        lock: asyncio.Lock = self._locks[key]
+        self._holders[key] += 1
+
+        try:
+            async with lock:
+                yield
+        finally:
+            self._holders[key] -= 1
+
+            if not self._holders[key]:
+                del self._holders[key]
+                del self._locks[key]
@@ -1,14 +1,35 @@
+import time
 from typing import Final
 
 from faststream import Logger
 
-from ozon_importer.handlers.interfaces import IProductSender
-from ozon_importer.handlers.types import Product
+from ozon_importer.handlers.interfaces import IBackpressure, IProductSender
+from ozon_importer.handlers.keyed_lock import KeyedLock
+from ozon_importer.interfaces import IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
+from ozon_importer.sampled_logger import SampledLogger
+from ozon_importer.types import Product
 
 
 class ParsedLoadingHandler:
-    def __init__(self, product_sender: IProductSender) -> None:
+    """Sends parsed products, updates of one SKU are sent one after another in order of arrival.
+
+    Debug records made while sending a product are sampled at ``log_sample_rate``,
+    every message ends with one summary record.
+    """
+
+    def __init__(
+        self,
+        product_sender: IProductSender,
+        backpressure: IBackpressure | None = None,
+        metrics: IMetrics = NULL_METRICS,
+        log_sample_rate: float = 1.0,
+    ) -> None:
         self.product_sender: Final[IProductSender] = product_sender
+        self.log_sample_rate: Final[float] = log_sample_rate
+        self.backpressure: Final[IBackpressure | None] = backpressure
+        self.metrics: Final[IMetrics] = metrics
+        self._sku_locks: Final[KeyedLock] = KeyedLock()
 
     def __str__(self) -> str:
         return f"[{self.__class__.__name__}]"
@@ -18,5 +39,30 @@ class ParsedLoadingHandler:
         product: Product,
         logger: Logger,
     ) -> None:
-        logger.debug(f"{self} received '{product.name}'")
-        await self.product_sender.send(product, logger)  # type: ignore[arg-type]
+        logger.debug("%s received '%s'", self, product.name)
+        message_logger: SampledLogger = SampledLogger(logger, self.log_sample_rate)
+        received_at: float = time.perf_counter()
+        sent_at: float = received_at
+        outcome: str = "failed"
+
+        try:
+            async with self._sku_locks.hold(product.sku):
+                if self.backpressure is not None:
+                    await self.backpressure.wait_until_available()
+
+                with self.metrics.timer("ozon_importer_stage_seconds", stage="parsed_loading"):
+                    sent_at = time.perf_counter()
+                    await self.product_sender.send(product, message_logger)  # type: ignore[arg-type]
+
+            outcome = "handled"
+        finally:
+            self.metrics.increment("ozon_importer_messages_total", queue="parsed_loading", outcome=outcome)
+            logger.info(
+                "%s %s sku=%s in %.1f ms, waited %.1f ms, %d debug records",
+                self,
+                outcome,
+                product.sku,
+                (time.perf_counter() - received_at) * 1000,
+                (sent_at - received_at) * 1000,
+                message_logger.records,
+            )
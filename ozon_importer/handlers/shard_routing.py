@@ -0,0 +1,45 @@
+from collections.abc import Sequence
+from typing import Final
+
+from faststream import Logger
+from faststream.rabbit import RabbitBroker
+from faststream.rabbit.annotations import RabbitMessage
+
+from ozon_importer.handlers.keyed_lock import KeyedLock
+from ozon_importer.handlers.types import ShardKey
+from ozon_importer.sharding import get_shard
+
+
+class ShardRouter:
+    """Republishes parsed products to shard queues of workers by SKU.
+
+    Products with one SKU always go to one worker and are republished in order of arrival,
+    so their updates stay ordered.
+    """
+
+    def __init__(self, broker: RabbitBroker, queues: Sequence[str]) -> None:
+        self.broker: Final[RabbitBroker] = broker
+        self.queues: Final[Sequence[str]] = queues
+        self._sku_locks: Final[KeyedLock] = KeyedLock()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def __call__(
+        self,
+        key: ShardKey,
+        logger: Logger,
+        message: RabbitMessage,
+    ) -> None:
+        queue: str = self.queues[get_shard(key.sku, len(self.queues))]
+        logger.debug("%s routes sku=%s to %s", self, key.sku, queue)
+
+        async with self._sku_locks.hold(key.sku):
+            await self.broker.publish(
+                message.body,
+                queue=queue,
+                persist=True,
+                content_type=message.content_type,
+                headers=message.headers,
+                message_id=message.message_id,
+            )
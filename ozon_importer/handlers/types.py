@@ -1,16 +1,16 @@
-from pydantic import AnyHttpUrl, BaseModel
+from pydantic import BaseModel
 
 
-class Characteristic(BaseModel):
-    name: str
-    value: str
+class ImageTask(BaseModel):
+    """Image of a product to load, ``created_at`` is when it was queued first."""
 
+    product_id: int
+    url: str
+    attempt: int = 0
+    created_at: float | None = None
+
+
+class ShardKey(BaseModel):
+    """Part of a parsed product message needed to route it, other fields are ignored."""
 
-class Product(BaseModel):
     sku: str
-    name: str
-    brand: str
-    description: str
-    characteristics: list[Characteristic]
-    images: list[AnyHttpUrl]
-    url: AnyHttpUrl
@@ -0,0 +1,46 @@
+from typing import Final
+
+
+IMAGE_EXTENSIONS: Final[dict[str, str]] = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "GIF": "gif",
+    "WEBP": "webp",
+    "AVIF": "avif",
+    "BMP": "bmp",
+    "TIFF": "tiff",
+}
+IMAGE_CONTENT_TYPES: Final[dict[str, str]] = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+    "AVIF": "image/avif",
+    "BMP": "image/bmp",
+    "TIFF": "image/tiff",
+}
+MAGIC_BYTES: Final[tuple[tuple[str, tuple[tuple[int, bytes], ...]], ...]] = (
+    ("JPEG", ((0, b"\xff\xd8\xff"),)),
+    ("PNG", ((0, b"\x89PNG\r\n\x1a\n"),)),
+    ("GIF", ((0, b"GIF87a"),)),
+    ("GIF", ((0, b"GIF89a"),)),
+    ("WEBP", ((0, b"RIFF"), (8, b"WEBP"))),
+    ("AVIF", ((4, b"ftypavif"),)),
+    ("AVIF", ((4, b"ftypavis"),)),
+    ("BMP", ((0, b"BM"),)),
+    ("TIFF", ((0, b"II*\x00"),)),
+    ("TIFF", ((0, b"MM\x00*"),)),
+)
+
+
+def sniff_image_format(body: bytes) -> str | None:
+    """Detect image format by magic bytes, regardless of url or ``Content-Type``.
+
+    Returns:
+        Pillow name of the format or None if body is not a known image.
+    """
+    for image_format, signatures in MAGIC_BYTES:
+        if all(body.startswith(magic, offset) for offset, magic in signatures):
+            return image_format
+
+    return None
@@ -1,5 +1,27 @@
+from collections.abc import Mapping
+from contextlib import AbstractContextManager
 from typing import Any, Protocol
 
 
 class ILogger(Protocol):
     def debug(self, msg: str, *args: Any, **kwargs: Any) -> None: ...
+
+
+class IByteBudget(Protocol):
+    async def acquire(self, size: int) -> None: ...
+
+    def resize(self, old_size: int, new_size: int) -> None: ...
+
+    def release(self, size: int) -> None: ...
+
+
+class IMetrics(Protocol):
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None: ...
+
+    def observe(self, name: str, value: float, **labels: str) -> None: ...
+
+    def timer(self, name: str, **labels: str) -> AbstractContextManager: ...
+
+
+class IMetricsSource(Protocol):
+    def export_metrics(self) -> Mapping[str, float]: ...
@@ -4,6 +4,8 @@ from faststream import FastStream
 from faststream.rabbit import RabbitBroker
 
 from ozon_importer.container import Container
+from ozon_importer.metrics.profiler import Profiler
+from ozon_importer.metrics.server import MetricsServer
 
 
 async def bake_container() -> None:
@@ -14,9 +16,40 @@ asyncio.run(bake_container())
 
 broker: RabbitBroker = Container.broker()  # type: ignore[operator]
 broker.include_router(Container.router())  # type: ignore[operator]
+profiler: Profiler = Container.profiler()  # type: ignore[operator]
+metrics_server: MetricsServer = Container.metrics_server()  # type: ignore[operator]
 app = FastStream(broker)
 
 
+@app.on_startup
+async def declare_unconsumed_queues() -> None:
+    """Declare queues nobody consumes before consumers start, messages dead-lettered to a missing queue are lost."""
+    await broker.connect()
+
+    for queue in Container.unconsumed_queues():  # type: ignore[operator]
+        await broker.declare_queue(queue)
+
+
+@app.on_startup
+async def start_metrics_server() -> None:
+    await metrics_server.start()
+
+
+@app.after_startup
+async def start_profiler() -> None:
+    profiler.attach()
+
+
+@app.on_shutdown
+async def stop_profiler() -> None:
+    await profiler.detach()
+
+
+@app.on_shutdown
+async def stop_metrics_server() -> None:
+    await metrics_server.stop()
+
+
 @app.after_shutdown
 async def on_shutdown() -> None:
     await Container.aclose()
@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import signal
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar, Token
+from datetime import UTC, datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Final
+
+from ozon_importer.interfaces import IMetrics
+
+
+STAGE_METRIC: Final[str] = "ozon_importer_stage_seconds"
+IDLE_FUNCTIONS: Final[frozenset[str]] = frozenset(("select", "poll", "epoll", "control"))
+REPORT_TOP: Final[int] = 20
+HANDLE_RUN_CODE: Final[CodeType] = asyncio.Handle._run.__code__  # noqa: SLF001
+
+_stage: ContextVar[str | None] = ContextVar("profiler_stage", default=None)
+
+
+class ProfileWindow:
+    """Samples and timings collected since the last report."""
+
+    def __init__(self) -> None:
+        self.started_at: Final[float] = time.monotonic()
+        self.lags: list[float] = []
+        self.samples: int = 0
+        self.idle_samples: int = 0
+        self.stage_calls: defaultdict[str | None, int] = defaultdict(int)
+        self.stage_wall: defaultdict[str | None, float] = defaultdict(float)
+        self.stage_samples: defaultdict[str | None, int] = defaultdict(int)
+        self.package_samples: Counter[str] = Counter()
+        self.function_samples: Counter[str] = Counter()
+        self.slow_callbacks: list[tuple[float, str]] = []
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+
+class Profiler:
+    """Samples the event loop of the running app and appends a report to a file every ``interval`` seconds.
+
+    While profiling is active:
+
+    * a monitor task measures the event loop lag, how late its ``lag_interval`` sleeps wake up;
+    * a thread samples the stack of the loop thread every ``sample_interval`` seconds, a sample is CPU time
+      of the innermost stage of the running task and of the running function, or idle time if the loop
+      waits for IO;
+    * a callback seen running by samples for longer than ``slow_callback_duration`` is reported as slow;
+    * stages timed through ``ProfilingMetrics`` are counted with their wall time;
+    * with ``tracemalloc_frames`` memory allocations are traced, every report lists the largest growths.
+
+    Profiling starts on ``attach`` if ``enabled`` and is switched on and off by ``SIGUSR2``.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: Path,
+        *,
+        enabled: bool = False,
+        interval: float = 60.0,
+        sample_interval: float = 0.005,
+        lag_interval: float = 0.1,
+        slow_callback_duration: float = 0.1,
+        tracemalloc_frames: int = 0,
+    ) -> None:
+        self.path: Final[Path] = path
+        self.enabled: Final[bool] = enabled
+        self.interval: Final[float] = interval
+        self.sample_interval: Final[float] = sample_interval
+        self.lag_interval: Final[float] = lag_interval
+        self.slow_callback_duration: Final[float] = slow_callback_duration
+        self.tracemalloc_frames: Final[int] = tracemalloc_frames
+        self.active: bool = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._monitor: asyncio.Task | None = None
+        self._sampler: threading.Thread | None = None
+        self._sampler_stopped: threading.Event = threading.Event()
+        self._samples_lock: threading.Lock = threading.Lock()
+        self._stops: set[asyncio.Task] = set()
+        self._window: ProfileWindow = ProfileWindow()
+        self._snapshot: tracemalloc.Snapshot | None = None
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def attach(self) -> None:
+        """Install the ``SIGUSR2`` switch on the running loop and start profiling if enabled."""
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_signal_handler(signal.SIGUSR2, self.toggle)
+
+        if self.enabled:
+            self.start()
+
+    async def detach(self) -> None:
+        if self._loop is not None:
+            self._loop.remove_signal_handler(signal.SIGUSR2)
+
+        await self.stop()
+
+    def toggle(self) -> None:
+        if not self.active:
+            self.start()
+
+            return
+
+        task: asyncio.Task = asyncio.create_task(self.stop())
+        self._stops.add(task)
+        task.add_done_callback(self._stops.discard)
+
+    def start(self) -> None:
+        if self.active:
+            return
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self.active = True
+        self._window = ProfileWindow()
+
+        if self.tracemalloc_frames:
+            tracemalloc.start(self.tracemalloc_frames)
+            self._snapshot = tracemalloc.take_snapshot()
+
+        self._sampler_stopped.clear()
+        self._sampler = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), loop),
+            name="profiler-sampler",
+            daemon=True,
+        )
+        self._sampler.start()
+        self._monitor = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop profiling and write the report of the last window."""
+        if not self.active:
+            return
+
+        self.active = False
+
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+        self._sampler_stopped.set()
+
+        if self._sampler is not None:
+            await asyncio.to_thread(self._sampler.join)
+            self._sampler = None
+
+        await self._dump()
+
+        if self.tracemalloc_frames:
+            tracemalloc.stop()
+            self._snapshot = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Count the wall time of a stage and make it the stage of samples taken inside."""
+        token: Token[str | None] = _stage.set(name)
+        started_at: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            _stage.reset(token)
+            self._window.stage_calls[name] += 1
+            self._window.stage_wall[name] += time.perf_counter() - started_at
+
+    async def _watch(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        dump_at: float = loop.time() + self.interval
+
+        while True:
+            expected_at: float = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self._window.lags.append(loop.time() - expected_at)
+
+            if loop.time() >= dump_at:
+                await self._dump()
+                dump_at = loop.time() + self.interval
+
+    def _sample(self, thread_id: int, loop: asyncio.AbstractEventLoop) -> None:
+        """Take samples of the loop thread in the sampler thread.
+
+        The frame of the running callback is held between samples, so the next callback can't get its identity.
+        """
+        callback_frame: FrameType | None = None
+        callback_started_at: float = 0.0
+        callback: str = ""
+
+        while not self._sampler_stopped.wait(self.sample_interval):
+            frame: FrameType | None = sys._current_frames().get(thread_id)  # noqa: SLF001
+            now: float = time.perf_counter()
+
+            if frame is None:
+                continue
+
+            with self._samples_lock:
+                window: ProfileWindow = self._window
+                window.samples += 1
+                running_frame: FrameType | None = _find_callback_frame(frame)
+
+                if running_frame is not callback_frame:
+                    if callback_frame is not None and now - callback_started_at >= self.slow_callback_duration:
+                        window.slow_callbacks.append((now - callback_started_at, callback))
+
+                    callback_frame, callback_started_at = running_frame, now
+
+                if frame.f_code.co_name in IDLE_FUNCTIONS and frame.f_globals.get("__name__") == "selectors":
+                    window.idle_samples += 1
+                    continue
+
+                task: asyncio.Task | None = asyncio.current_task(loop)
+                window.stage_samples[task.get_context().get(_stage) if task else None] += 1
+                module: str = frame.f_globals.get("__name__", "?")
+                function: str = f"{module}:{frame.f_code.co_name}:{frame.f_lineno}"
+                window.package_samples[module.partition(".")[0]] += 1
+                window.function_samples[function] += 1
+                callback = (
+                    f"{task.get_name() + ' ' + task.get_coro().__qualname__ if task else 'callback'} at {function}"
+                )
+
+    async def _dump(self) -> None:
+        with self._samples_lock:
+            window: ProfileWindow = self._window
+            self._window = ProfileWindow()
+
+        try:
+            await asyncio.to_thread(self._write, window)
+        except OSError as error:
+            logging.getLogger(__name__).warning("%s can't write report to %s: %s", self, self.path, error)
+
+    def _write(self, window: ProfileWindow) -> None:
+        """Render the report of a window and append it to the file, in a worker thread."""
+        report: str = "".join(f"{line}\n" for line in self._render_lines(window))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.path.open("a", encoding="utf-8") as profile:
+            profile.write(report)
+
+    def _render_lines(self, window: ProfileWindow) -> Iterator[str]:
+        seconds: float = time.monotonic() - window.started_at
+        busy_samples: int = window.samples - window.idle_samples
+        yield f"=== {datetime.now(UTC).isoformat(timespec='seconds')} profile of {seconds:.1f} s"
+
+        if window.lags:
+            lags: list[float] = sorted(window.lags)
+            yield (
+                f"loop lag: mean {statistics.fmean(lags) * 1000:.1f} ms, "
+                f"p99 {lags[int(len(lags) * 0.99)] * 1000:.1f} ms, max {lags[-1] * 1000:.1f} ms"
+            )
+
+        yield f"samples: {window.samples}, idle {self._share(window.idle_samples, window.samples)}"
+        yield f"slow callbacks over {self.slow_callback_duration * 1000:.0f} ms: {len(window.slow_callbacks)}"
+
+        for duration, callback in sorted(window.slow_callbacks, reverse=True)[:REPORT_TOP]:
+            yield f"  {duration * 1000:8.1f} ms  {callback}"
+
+        yield "stages: calls, wall s, mean wall ms, sampled cpu s, share of busy samples"
+
+        for name in sorted(window.stage_calls.keys() | window.stage_samples.keys(), key=str):
+            calls: int = window.stage_calls.get(name, 0)
+            wall: float = window.stage_wall.get(name, 0.0)
+            samples: int = window.stage_samples.get(name, 0)
+            yield (
+                f"  {name or '-':24} {calls:8d} {wall:10.2f} {wall / calls * 1000 if calls else 0:10.1f} "
+                f"{samples * self.sample_interval:10.2f} {self._share(samples, busy_samples):>7}"
+            )
+
+        yield "busy samples by package:"
+
+        for package, samples in window.package_samples.most_common(REPORT_TOP):
+            yield f"  {package:24} {self._share(samples, busy_samples):>7}"
+
+        yield "busy samples by function:"
+
+        for function, samples in window.function_samples.most_common(REPORT_TOP):
+            yield f"  {self._share(samples, busy_samples):>7}  {function}"
+
+        if self._snapshot is not None and tracemalloc.is_tracing():
+            snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+            yield f"memory growth, traced {tracemalloc.get_traced_memory()[0] / 1024 / 1024:.1f} MiB:"
+
+            for difference in snapshot.compare_to(self._snapshot, "lineno")[:REPORT_TOP]:
+                yield f"  {difference}"
+
+            self._snapshot = snapshot
+
+        yield ""
+
+    @staticmethod
+    def _share(part: int, whole: int) -> str:
+        return f"{part / whole:.1%}" if whole else "-"
+
+
+def _find_callback_frame(frame: FrameType | None) -> FrameType | None:
+    """Find the frame of the event loop callback running in a stack."""
+    while frame is not None:
+        if frame.f_code is HANDLE_RUN_CODE:
+            return frame
+
+        frame = frame.f_back
+
+    return None
+
+
+class ProfilingMetrics:
+    """Metrics passing every record on, stage timers are also stages of the profiler while it is active."""
+
+    def __init__(self, metrics: IMetrics, profiler: Profiler) -> None:
+        self.metrics: Final[IMetrics] = metrics
+        self.profiler: Final[Profiler] = profiler
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        self.metrics.increment(name, amount, **labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self.metrics.observe(name, value, **labels)
+
+    def timer(self, name: str, **labels: str) -> AbstractContextManager:
+        timer: AbstractContextManager = self.metrics.timer(name, **labels)
+
+        if not self.profiler.active or name != STAGE_METRIC or "stage" not in labels:
+            return timer
+
+        return self._time_stage(timer, labels["stage"])
+
+    @contextmanager
+    def _time_stage(self, timer: AbstractContextManager, stage: str) -> Iterator[None]:
+        with timer, self.profiler.stage(stage):
+            yield
@@ -0,0 +1,168 @@
+import time
+from bisect import bisect_left
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import AbstractContextManager, nullcontext
+from types import TracebackType
+from typing import Final
+
+from ozon_importer.interfaces import IMetrics, IMetricsSource
+
+
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+HELP: Final[dict[str, str]] = {
+    "ozon_importer_stage_seconds": "Duration of a processing stage.",
+    "ozon_importer_mb_request_seconds": "Duration of a Markets Bridge request by endpoint.",
+    "ozon_importer_messages_total": "Handled messages by queue and outcome.",
+    "ozon_importer_products_total": "Imported products by outcome.",
+    "ozon_importer_resumed_products_total": "Products resumed from a checkpoint by the last finished step.",
+    "ozon_importer_retries_total": "Retries of HTTP calls by backend.",
+    "ozon_importer_circuit_opens_total": "Circuit breaker openings by backend.",
+    "ozon_importer_mb_coalesced_requests_total": "Markets Bridge entity sends joined to an equal request in flight.",
+    "ozon_importer_mb_unauthorized_total": "Markets Bridge answers with 401.",
+    "ozon_importer_mb_token_updates_total": "Markets Bridge token updates by kind.",
+    "ozon_importer_downloaded_bytes_total": "Downloaded image bytes.",
+    "ozon_importer_uploaded_bytes_total": "Uploaded image bytes.",
+    "ozon_importer_skipped_images_total": "Images skipped without uploading by reason.",
+}
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+class NullMetrics:
+    """Metrics that record nothing, used when instrumentation is disabled."""
+
+    _NULL_TIMER: Final[AbstractContextManager] = nullcontext()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        pass
+
+    def timer(self, name: str, **labels: str) -> AbstractContextManager:  # noqa: ARG002
+        return self._NULL_TIMER
+
+
+NULL_METRICS: Final[NullMetrics] = NullMetrics()
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets: Final[Sequence[float]] = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Timer:
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram: Final[Histogram] = histogram
+        self._started_at: float = 0.0
+
+    def __enter__(self) -> None:
+        self._started_at = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.histogram.observe(time.perf_counter() - self._started_at)
+
+
+class MetricsRegistry:
+    """In-process counters and histograms rendered in Prometheus text format.
+
+    Sources are asked for their current values on every render, e.g. cache hit counters.
+    """
+
+    def __init__(self, sources: Sequence[IMetricsSource] = ()) -> None:
+        self.sources: Final[Sequence[IMetricsSource]] = sources
+        self._counters: dict[str, dict[LabelSet, float]] = {}
+        self._histograms: dict[str, dict[LabelSet, Histogram]] = {}
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        series: dict[LabelSet, float] = self._counters.setdefault(name, {})
+        label_set: LabelSet = tuple(sorted(labels.items()))
+        series[label_set] = series.get(label_set, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self._get_histogram(name, labels).observe(value)
+
+    def timer(self, name: str, **labels: str) -> AbstractContextManager:
+        return Timer(self._get_histogram(name, labels))
+
+    def render(self) -> str:
+        return "".join(f"{line}\n" for line in self._render_lines())
+
+    def _get_histogram(self, name: str, labels: Mapping[str, str]) -> Histogram:
+        series: dict[LabelSet, Histogram] = self._histograms.setdefault(name, {})
+        label_set: LabelSet = tuple(sorted(labels.items()))
+
+        if label_set not in series:
+            series[label_set] = Histogram()
+
+        return series[label_set]
+
+    def _render_lines(self) -> Iterator[str]:
+        for name, counter_series in sorted(self._counters.items()):
+            yield from _render_header(name, "counter")
+
+            for label_set, value in counter_series.items():
+                yield f"{name}{_render_labels(label_set)} {value}"
+
+        for name, histogram_series in sorted(self._histograms.items()):
+            yield from _render_header(name, "histogram")
+
+            for label_set, histogram in histogram_series.items():
+                cumulative_count: int = 0
+
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts, strict=True):
+                    cumulative_count += count
+                    yield f"{name}_bucket{_render_labels((*label_set, ('le', str(bound))))} {cumulative_count}"
+
+                yield f"{name}_sum{_render_labels(label_set)} {histogram.sum}"
+                yield f"{name}_count{_render_labels(label_set)} {histogram.count}"
+
+        for source in self.sources:
+            for name, value in source.export_metrics().items():
+                yield f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}"
+                yield f"{name} {value}"
+
+
+def create_metrics(enabled: bool, sources: Sequence[IMetricsSource] = ()) -> IMetrics:
+    """Build metrics registry or the no-op metrics if instrumentation is disabled."""
+    if not enabled:
+        return NULL_METRICS
+
+    return MetricsRegistry(sources)
+
+
+def _render_header(name: str, metric_type: str) -> Iterator[str]:
+    if name in HELP:
+        yield f"# HELP {name} {HELP[name]}"
+
+    yield f"# TYPE {name} {metric_type}"
+
+
+def _render_labels(label_set: LabelSet) -> str:
+    if not label_set:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in label_set) + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,64 @@
+import asyncio
+from http import HTTPStatus
+from typing import Final
+
+from ozon_importer.interfaces import IMetrics
+from ozon_importer.metrics.registry import MetricsRegistry
+
+
+class MetricsServer:
+    """Minimal HTTP server exposing ``GET /metrics`` in Prometheus text format.
+
+    The server is started and stopped by hooks of the app, so it serves in the event loop of the app.
+    Nothing is served when metrics are disabled.
+    """
+
+    CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, metrics: IMetrics, host: str, port: int | None) -> None:
+        self.metrics: Final[IMetrics] = metrics
+        self.host: Final[str] = host
+        self.port: Final[int | None] = port
+        self._server: asyncio.Server | None = None
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def start(self) -> None:
+        if self._server is None and isinstance(self.metrics, MetricsRegistry) and self.port is not None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line: bytes = await reader.readline()
+
+            while (await reader.readline()).strip():
+                pass
+
+            method, path, *_ = request_line.decode("latin-1").split() or ("", "")
+
+            if method == "GET" and path.split("?")[0] == "/metrics":
+                self._write(writer, HTTPStatus.OK, self.metrics.render().encode())  # type: ignore[attr-defined]
+            else:
+                self._write(writer, HTTPStatus.NOT_FOUND, b"")
+
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _write(self, writer: asyncio.StreamWriter, status: HTTPStatus, body: bytes) -> None:
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {self.CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode(),
+        )
+        writer.write(body)
@@ -0,0 +1,21 @@
+from faststream.rabbit import RabbitQueue
+
+
+def get_dead_letter_queue(queue: str) -> str:
+    return f"{queue}.dead"
+
+
+def make_queue(name: str, dead_letter_queue: str | None = None) -> RabbitQueue:
+    """Durable queue, its rejected and expired messages go to ``dead_letter_queue`` if given.
+
+    RabbitMQ refuses to declare an existing queue with other arguments, every declaration of a queue
+    has to be made here.
+    """
+    if dead_letter_queue is None:
+        return RabbitQueue(name, durable=True)
+
+    return RabbitQueue(
+        name,
+        durable=True,
+        arguments={"x-dead-letter-exchange": "", "x-dead-letter-routing-key": dead_letter_queue},
+    )
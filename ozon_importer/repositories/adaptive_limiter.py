@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import deque
+from typing import Final, NamedTuple
+
+
+class AdaptiveLimits(NamedTuple):
+    """Tuning of an adaptive limiter."""
+
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    latency_target: float
+    decrease_ratio: float = 0.5
+
+
+class AdaptiveLimiter:
+    """AIMD limit of concurrent requests to one backend.
+
+    Every fast successful request adds ``1 / limit`` to the limit, so it grows by about one per round of
+    requests. A request slower than ``latency_target``, an overload answer or a transport error multiplies
+    the limit by ``decrease_ratio``, at most once per ``latency_target`` so a burst of failures of requests
+    sent together counts once. ``pause`` stops new requests until ``Retry-After`` passes.
+    """
+
+    def __init__(self, limits: AdaptiveLimits) -> None:
+        self.min_limit: Final[int] = max(limits.min_limit, 1)
+        self.max_limit: Final[int] = max(limits.max_limit, self.min_limit)
+        self.latency_target: Final[float] = limits.latency_target
+        self.decrease_ratio: Final[float] = limits.decrease_ratio
+        self.limit: float = min(max(limits.initial_limit, self.min_limit), self.max_limit)
+        self.in_flight: int = 0
+        self.decreases: int = 0
+        self._paused_until: float = 0.0
+        self._last_decrease_at: float = float("-inf")
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._available: asyncio.Event = asyncio.Event()
+        self._available.set()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    @property
+    def saturated(self) -> bool:
+        return bool(self._waiters) or self.in_flight >= int(self.limit) or self._paused_until > time.monotonic()
+
+    async def acquire(self) -> None:
+        if not self.saturated:
+            self.in_flight += 1
+            self._update_availability()
+
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._update_availability()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._wake_up()
+            raise
+
+    def release(self, latency: float, *, overloaded: bool) -> None:
+        self.in_flight -= 1
+
+        if overloaded or latency > self.latency_target:
+            self._decrease()
+        else:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+
+        self._wake_up()
+
+    def pause(self, seconds: float) -> None:
+        """Hold new requests back for ``seconds``, e.g. for ``Retry-After`` of an answer."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._decrease()
+        self._update_availability()
+        asyncio.get_running_loop().call_later(seconds, self._wake_up)
+
+    async def wait_until_available(self) -> None:
+        """Wait while the limiter is saturated, so callers don't start new work it would only queue."""
+        while self.saturated:
+            self._available.clear()
+            await self._available.wait()
+
+    def export_metrics(self) -> dict[str, float]:
+        return {
+            "ozon_importer_mb_concurrency_limit": int(self.limit),
+            "ozon_importer_mb_in_flight_requests": self.in_flight,
+            "ozon_importer_mb_concurrency_decreases_total": self.decreases,
+        }
+
+    def _decrease(self) -> None:
+        now: float = time.monotonic()
+
+        if now - self._last_decrease_at < self.latency_target:
+            return
+
+        self._last_decrease_at = now
+        self.limit = max(self.limit * self.decrease_ratio, self.min_limit)
+        self.decreases += 1
+
+    def _wake_up(self) -> None:
+        if self._paused_until <= time.monotonic():
+            while self._waiters and self.in_flight < int(self.limit):
+                future: asyncio.Future[None] = self._waiters.popleft()
+
+                if future.cancelled():
+                    continue
+
+                self.in_flight += 1
+                future.set_result(None)
+
+        self._update_availability()
+
+    def _update_availability(self) -> None:
+        if self.saturated:
+            self._available.clear()
+        else:
+            self._available.set()
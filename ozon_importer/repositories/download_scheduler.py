@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Final
+
+
+class DownloadScheduler:
+    """Limit of concurrent downloads, global and per host, with hosts served in turn.
+
+    A freed slot goes to the next host in round robin that has queued downloads and is under its own limit,
+    so a product with many images on one host doesn't hold back images of other hosts. The limit of a host
+    is AIMD: every success adds ``1 / limit`` up to ``max_per_host``, an overload answer halves it, so every
+    host is loaded as much as it tolerates.
+    """
+
+    def __init__(self, max_concurrency: int, max_per_host: int | None = None) -> None:
+        self.max_concurrency: Final[int] = max(max_concurrency, 1)
+        self.max_per_host: Final[int | None] = max_per_host
+        self.in_flight: int = 0
+        self.host_limit_decreases: int = 0
+        self._host_in_flight: dict[str, int] = {}
+        self._host_limits: dict[str, float] = {}
+        self._waiters: dict[str, deque[asyncio.Future[None]]] = {}
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def export_metrics(self) -> dict[str, float]:
+        return {
+            "ozon_importer_image_downloads_in_flight": self.in_flight,
+            "ozon_importer_image_downloads_queued": sum(len(waiters) for waiters in self._waiters.values()),
+            "ozon_importer_image_host_limit_decreases_total": self.host_limit_decreases,
+        }
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        await self._acquire(host)
+
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def record(self, host: str, *, overloaded: bool) -> None:
+        """Adjust the host limit by an answer of the host."""
+        if self.max_per_host is None:
+            return
+
+        limit: float = self._host_limits.get(host, self.max_per_host)
+
+        if overloaded:
+            self._host_limits[host] = max(limit / 2, 1.0)
+            self.host_limit_decreases += 1
+        else:
+            self._host_limits[host] = min(limit + 1 / limit, self.max_per_host)
+
+        self._wake_up()
+
+    async def _acquire(self, host: str) -> None:
+        if host not in self._waiters and self._has_room(host):
+            self._start(host)
+
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(host, deque()).append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(host)
+            raise
+
+    def _release(self, host: str) -> None:
+        self.in_flight -= 1
+        self._host_in_flight[host] -= 1
+
+        if not self._host_in_flight[host]:
+            del self._host_in_flight[host]
+
+        self._wake_up()
+
+    def _has_room(self, host: str) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+
+        if self.max_per_host is None:
+            return True
+
+        return self._host_in_flight.get(host, 0) < int(self._host_limits.get(host, self.max_per_host))
+
+    def _start(self, host: str) -> None:
+        self.in_flight += 1
+        self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+
+    def _wake_up(self) -> None:
+        """Start one queued download per host in turn while there are free slots."""
+        started: bool = True
+
+        while started and self.in_flight < self.max_concurrency:
+            started = False
+
+            for host in list(self._waiters):
+                waiters: deque[asyncio.Future[None]] = self._waiters[host]
+
+                while waiters and waiters[0].cancelled():
+                    waiters.popleft()
+
+                if waiters and self._has_room(host):
+                    self._start(host)
+                    waiters.popleft().set_result(None)
+                    started = True
+                    del self._waiters[host]
+
+                    if waiters:
+                        self._waiters[host] = waiters
+                elif not waiters:
+                    del self._waiters[host]
@@ -0,0 +1,81 @@
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from typing import Any, Final
+
+
+EntityKey = tuple[str, str, int]
+
+
+class EntityCache:
+    """Bounded LRU cache of Markets Bridge entity ids with TTL eviction."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize: Final[int] = maxsize
+        self.ttl: Final[float] = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, tuple[int, float]] = OrderedDict()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(entity_type: str, entity: Mapping[str, Any]) -> EntityKey:
+        """Build cache key from entity payload.
+
+        Returns:
+            entity_type, canonical payload without marketplace_id, marketplace_id.
+        """
+        natural_key: dict = {name: value for name, value in entity.items() if name != "marketplace_id"}
+
+        return (
+            entity_type,
+            json.dumps(natural_key, sort_keys=True, ensure_ascii=False),
+            entity["marketplace_id"],
+        )
+
+    def get(self, key: Hashable) -> int | None:
+        entry: tuple[int, float] | None = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+
+            return None
+
+        entity_id, expires_at = entry
+
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entity_id
+
+    def set(self, key: Hashable, entity_id: int) -> None:
+        self._entries[key] = (entity_id, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def export_metrics(self) -> dict[str, float]:
+        return {
+            "ozon_importer_entity_cache_hits_total": self.hits,
+            "ozon_importer_entity_cache_misses_total": self.misses,
+            "ozon_importer_entity_cache_entries": len(self._entries),
+        }
@@ -0,0 +1,71 @@
+import sqlite3
+from collections.abc import Mapping, Sequence
+from typing import Final
+
+from ozon_importer.repositories.entity_cache import EntityKey
+from ozon_importer.repositories.sqlite_store import SqliteStore
+
+
+class SqliteEntityIdStore(SqliteStore):
+    """Entity id store in a local SQLite database."""
+
+    _SELECT_CHUNK_SIZE: Final[int] = 300
+
+    async def get_many(self, keys: Sequence[EntityKey]) -> dict[EntityKey, int]:
+        return await self._run(self._select, keys)
+
+    async def set_many(self, entity_ids: Mapping[EntityKey, int]) -> None:
+        if entity_ids:
+            await self._run(self._upsert, entity_ids)
+
+    async def delete_many(self, keys: Sequence[EntityKey]) -> None:
+        if keys:
+            await self._run(self._delete, keys)
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entity_ids (
+                entity_type TEXT NOT NULL,
+                natural_key TEXT NOT NULL,
+                marketplace_id INTEGER NOT NULL,
+                entity_id INTEGER NOT NULL,
+                PRIMARY KEY (entity_type, natural_key, marketplace_id)
+            ) WITHOUT ROWID
+            """,
+        )
+
+    def _select(self, keys: Sequence[EntityKey]) -> dict[EntityKey, int]:
+        found_ids: dict[EntityKey, int] = {}
+
+        for start in range(0, len(keys), self._SELECT_CHUNK_SIZE):
+            chunk: Sequence[EntityKey] = keys[start : start + self._SELECT_CHUNK_SIZE]
+            conditions: str = " OR ".join(["(entity_type = ? AND natural_key = ? AND marketplace_id = ?)"] * len(chunk))
+            rows: list[tuple[str, str, int, int]] = (
+                self._get_connection()
+                .execute(
+                    f"SELECT entity_type, natural_key, marketplace_id, entity_id FROM entity_ids WHERE {conditions}",  # noqa: S608
+                    [value for key in chunk for value in key],
+                )
+                .fetchall()
+            )
+
+            for entity_type, natural_key, marketplace_id, entity_id in rows:
+                found_ids[(entity_type, natural_key, marketplace_id)] = entity_id
+
+        return found_ids
+
+    def _upsert(self, entity_ids: Mapping[EntityKey, int]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO entity_ids (entity_type, natural_key, marketplace_id, entity_id) "
+                "VALUES (?, ?, ?, ?)",
+                [(*key, entity_id) for key, entity_id in entity_ids.items()],
+            )
+
+    def _delete(self, keys: Sequence[EntityKey]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM entity_ids WHERE entity_type = ? AND natural_key = ? AND marketplace_id = ?",
+                keys,
+            )
@@ -0,0 +1,69 @@
+import time
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
+from httpx import HTTPStatusError, Response, TransportError, UnsupportedProtocol
+
+from ozon_importer.exceptions import CircuitOpenError
+
+
+RETRYABLE_CLIENT_STATUSES: frozenset[int] = frozenset((HTTPStatus.REQUEST_TIMEOUT, HTTPStatus.TOO_MANY_REQUESTS))
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Tell whether retrying a request can't help, used by the retry policy."""
+    if isinstance(error, UnsupportedProtocol):
+        return True
+
+    if not isinstance(error, HTTPStatusError):
+        return False
+
+    status: HTTPStatus = HTTPStatus(error.response.status_code)
+
+    return status.is_client_error and status not in RETRYABLE_CLIENT_STATUSES
+
+
+def is_overload_response(response: Response) -> bool:
+    return (
+        response.status_code == HTTPStatus.TOO_MANY_REQUESTS or response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Tell whether a call failed for a while only: on an open circuit, a transport error or an overload.
+
+    An exception group is transient if all its exceptions are. A url without a supported scheme fails
+    with a transport error too, but it never succeeds.
+    """
+    if isinstance(error, BaseExceptionGroup):
+        return all(is_transient_error(inner) for inner in error.exceptions)
+
+    if isinstance(error, HTTPStatusError):
+        return is_overload_response(error.response)
+
+    if isinstance(error, UnsupportedProtocol):
+        return False
+
+    return isinstance(error, CircuitOpenError | TransportError)
+
+
+def get_retry_after(response: Response) -> float | None:
+    """Read ``Retry-After`` header given in seconds or as HTTP date.
+
+    Returns:
+        seconds to wait or None if there is no readable header.
+    """
+    value: str | None = response.headers.get("Retry-After")
+
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -1,21 +1,150 @@
-from backoff import expo, on_exception
-from httpx import AsyncClient, HTTPError, Response
+from contextlib import AbstractAsyncContextManager, nullcontext
+from functools import partial
+from http import HTTPStatus
+from typing import NamedTuple
 
-from ozon_importer.interfaces import ILogger
+from httpx import URL, AsyncClient, Response
+
+from ozon_importer.exceptions import ImageTooLargeError
+from ozon_importer.interfaces import IByteBudget, ILogger, IMetrics
+from ozon_importer.repositories.download_scheduler import DownloadScheduler
+from ozon_importer.repositories.http_errors import is_overload_response
+from ozon_importer.repositories.retry_policy import RetryPolicy
+
+
+class Validators(NamedTuple):
+    """``ETag`` and ``Last-Modified`` of a cached answer, they make a download conditional."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class Download(NamedTuple):
+    """Downloaded content with validators of the answer, content of a ``not_modified`` download is empty."""
+
+    content: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
 
 
 class HttpFetcher:
-    def __init__(self, http_client: AsyncClient) -> None:
+    """Downloads url contents in slots of the download scheduler under the retry policy.
+
+    Every host has its own circuit breaker. A body longer than ``max_size`` is aborted as soon as its
+    ``Content-Length`` or its read part exceeds the limit. Downloads are recorded to metrics of the retry policy.
+    """
+
+    def __init__(
+        self,
+        http_client: AsyncClient,
+        scheduler: DownloadScheduler | None = None,
+        max_size: int | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
         self.http_client: AsyncClient = http_client
+        self.scheduler: DownloadScheduler | None = scheduler
+        self.max_size: int | None = max_size
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.metrics: IMetrics = self.retry_policy.metrics
 
     def __str__(self) -> str:
         return f"[{self.__class__.__name__}]"
 
-    @on_exception(expo, HTTPError, max_tries=3)
-    async def fetch(self, url: str, logger: ILogger | None = None) -> bytes:
+    async def fetch(self, url: str, logger: ILogger | None = None, budget: IByteBudget | None = None) -> bytes:
+        """Fetch url content.
+
+        With a budget ``Content-Length`` bytes are acquired before reading the body and stay acquired after
+        return, the caller releases ``len(content)`` when it's done with the content.
+        """
+        return (await self.download(url, logger, budget)).content
+
+    async def download(
+        self,
+        url: str,
+        logger: ILogger | None = None,
+        budget: IByteBudget | None = None,
+        validators: Validators | None = None,
+    ) -> Download:
+        """Fetch url content, conditionally if validators of a cached content are given.
+
+        Raises:
+            ImageTooLargeError: if the content is longer than ``max_size``.
+
+        Returns:
+            content with its validators or a ``not_modified`` download.
+        """
         if logger:
-            logger.debug(f"{self}: fetches {url=}")
+            logger.debug("%s: fetches url=%r", self, url)
+
+        host: str = URL(url).host
+        headers: dict[str, str] = {}
+
+        if validators is not None and validators.etag:
+            headers["If-None-Match"] = validators.etag
+
+        if validators is not None and validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+
+        return await self.retry_policy.call(host, partial(self._download_once, url, host, headers, budget))
+
+    async def _download_once(
+        self,
+        url: str,
+        host: str,
+        headers: dict[str, str],
+        budget: IByteBudget | None = None,
+    ) -> Download:
+        async with self._get_slot(host):
+            with self.metrics.timer("ozon_importer_stage_seconds", stage="image_fetch"):
+                async with self.http_client.stream("GET", url, headers=headers) as response:
+                    if self.scheduler is not None:
+                        self.scheduler.record(host, overloaded=is_overload_response(response))
+
+                    if response.status_code == HTTPStatus.NOT_MODIFIED:
+                        return Download(b"", not_modified=True)
+
+                    response.raise_for_status()
+                    expected_size: int = int(response.headers.get("Content-Length", 0))
+                    self._check_size(url, expected_size)
+
+                    if budget is not None:
+                        await budget.acquire(expected_size)
+
+                    try:
+                        content: bytes = await self._read(url, response)
+                    except BaseException:
+                        if budget is not None:
+                            budget.release(expected_size)
+                        raise
+
+        if budget is not None:
+            budget.resize(expected_size, len(content))
+
+        self.metrics.increment("ozon_importer_downloaded_bytes_total", len(content))
+
+        return Download(content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    async def _read(self, url: str, response: Response) -> bytes:
+        if self.max_size is None:
+            return await response.aread()
+
+        chunks: list[bytes] = []
+        size: int = 0
+
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            self._check_size(url, size)
+            chunks.append(chunk)
+
+        return b"".join(chunks)
+
+    def _check_size(self, url: str, size: int) -> None:
+        if self.max_size is not None and size > self.max_size:
+            raise ImageTooLargeError(url, self.max_size)
 
-        response: Response = await self.http_client.get(url)
+    def _get_slot(self, host: str) -> AbstractAsyncContextManager:
+        if self.scheduler is None:
+            return nullcontext()
 
-        return response.content
+        return self.scheduler.slot(host)
@@ -1,17 +1,21 @@
 from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
 from functools import partial
 from typing import Any, Literal, get_args
 
-from backoff import expo, on_exception
-from httpx import AsyncClient, ConnectError, ConnectTimeout, Response
+from httpx import AsyncClient, Response
+
+from ozon_importer.interfaces import IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
 
 
 ProxyMethod = Literal["get", "options", "head", "post", "put", "patch", "delete"]
 
 
 class HttpxClient:
-    def __init__(self, session: AsyncClient) -> None:
+    def __init__(self, session: AsyncClient, metrics: IMetrics = NULL_METRICS) -> None:
         self.session: AsyncClient = session
+        self.metrics: IMetrics = metrics
 
     def __str__(self) -> str:
         return f"[{self.__class__.__name__}]"
@@ -24,7 +28,9 @@ class HttpxClient:
 
         return partial(self._request, method=method)
 
-    @on_exception(expo, (ConnectError, ConnectTimeout), max_tries=3)
+    def stream(self, method: str, url: str, **kwargs: Any) -> AbstractAsyncContextManager[Response]:
+        return self.session.stream(method, url, **kwargs)
+
     async def _request(self, url: str, *, method: Callable, **kwargs: Any) -> Response:
         resp: Response = await method(url, **kwargs)
         resp.read()
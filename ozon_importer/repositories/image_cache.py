@@ -0,0 +1,295 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from ozon_importer.interfaces import IByteBudget, ILogger
+from ozon_importer.repositories.http_fetcher import Download, HttpFetcher, Validators
+
+
+class CachedUrl(NamedTuple):
+    content_hash: str
+    etag: str | None = None
+    last_modified: str | None = None
+    validated_at: float = 0.0
+
+
+class DiskImageCache:
+    """Content addressed on-disk image store with LRU eviction.
+
+    Bodies are stored once per sha256 of their content, urls refer to bodies through an append-only index
+    which also keeps ``ETag`` and ``Last-Modified`` of their answers. A url validated more than ``max_age``
+    seconds ago is stale and is revalidated by a conditional request. A cache with ``max_bytes=0`` stores nothing.
+    Malformed index lines, e.g. one cut off by a crash, are skipped and counted.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_age: float | None = None) -> None:
+        self.directory: Final[Path] = directory
+        self.max_bytes: Final[int] = max_bytes
+        self.max_age: Final[float | None] = max_age
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bytes_saved: int = 0
+        self.revalidations: int = 0
+        self.malformed_index_lines: int = 0
+        self._urls: dict[str, CachedUrl] = {}
+        self._blobs: OrderedDict[str, int] = OrderedDict()
+
+        if self.enabled:
+            self._load()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def _index_path(self) -> Path:
+        return self.directory / "urls.tsv"
+
+    def export_metrics(self) -> dict[str, float]:
+        return {
+            "ozon_importer_image_cache_hits_total": self.hits,
+            "ozon_importer_image_cache_misses_total": self.misses,
+            "ozon_importer_image_cache_saved_bytes_total": self.bytes_saved,
+            "ozon_importer_image_cache_revalidations_total": self.revalidations,
+            "ozon_importer_image_cache_malformed_index_lines_total": self.malformed_index_lines,
+            "ozon_importer_image_cache_bytes": self.size,
+        }
+
+    def size_of(self, url: str) -> int | None:
+        entry: CachedUrl | None = self.get_entry(url)
+
+        return None if entry is None else self._blobs[entry.content_hash]
+
+    def get_entry(self, url: str) -> CachedUrl | None:
+        entry: CachedUrl | None = self._urls.get(url)
+
+        return entry if entry is not None and entry.content_hash in self._blobs else None
+
+    def is_stale(self, entry: CachedUrl) -> bool:
+        return self.max_age is not None and entry.validated_at + self.max_age <= time.time()
+
+    async def mark_validated(self, url: str) -> None:
+        """Record that the server answered the cached content of url is still valid."""
+        if (entry := self._urls.get(url)) is None:
+            return
+
+        self._urls[url] = entry = entry._replace(validated_at=time.time())
+        self.revalidations += 1
+        await asyncio.to_thread(self._append_index, url, entry)
+
+    async def get(self, url: str) -> bytes | None:
+        entry: CachedUrl | None = self.get_entry(url)
+
+        if entry is None:
+            self.misses += 1
+
+            return None
+
+        content_hash: str = entry.content_hash
+
+        try:
+            content: bytes = await asyncio.to_thread(self._read_blob, content_hash)
+        except FileNotFoundError:
+            self._forget_blob(content_hash)
+            self.misses += 1
+
+            return None
+
+        self._blobs.move_to_end(content_hash)
+        self.hits += 1
+        self.bytes_saved += len(content)
+
+        return content
+
+    async def put(self, url: str, content: bytes, etag: str | None = None, last_modified: str | None = None) -> None:
+        if not self.enabled or len(content) > self.max_bytes:
+            return
+
+        content_hash: str = hashlib.sha256(content).hexdigest()
+
+        if content_hash not in self._blobs:
+            await asyncio.to_thread(self._write_blob, content_hash, content)
+
+        if content_hash not in self._blobs:
+            self._blobs[content_hash] = len(content)
+            self.size += len(content)
+        else:
+            self._blobs.move_to_end(content_hash)
+
+        entry: CachedUrl = CachedUrl(content_hash, etag, last_modified, time.time())
+        self._urls[url] = entry
+        await asyncio.to_thread(self._append_index, url, entry)
+
+        await self._evict()
+
+    async def _evict(self) -> None:
+        evicted: list[str] = []
+
+        while self.size > self.max_bytes:
+            content_hash, size = self._blobs.popitem(last=False)
+            self.size -= size
+            evicted.append(content_hash)
+
+        if evicted:
+            await asyncio.to_thread(self._remove_blobs, evicted)
+
+    def _forget_blob(self, content_hash: str) -> None:
+        self.size -= self._blobs.pop(content_hash, 0)
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.directory / content_hash[:2] / content_hash
+
+    def _read_blob(self, content_hash: str) -> bytes:
+        path: Path = self._blob_path(content_hash)
+        content: bytes = path.read_bytes()
+        os.utime(path)
+
+        return content
+
+    def _write_blob(self, content_hash: str, content: bytes) -> None:
+        path: Path = self._blob_path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path: Path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        temporary_path.write_bytes(content)
+        temporary_path.replace(path)
+
+    def _remove_blobs(self, content_hashes: list[str]) -> None:
+        for content_hash in content_hashes:
+            self._blob_path(content_hash).unlink(missing_ok=True)
+
+    def _append_index(self, url: str, entry: CachedUrl) -> None:
+        with self._index_path.open("a", encoding="utf-8") as index:
+            index.write(_format_index_line(url, entry))
+
+    def _load(self) -> None:
+        """Restore blobs in order of last access and url index, compacting the index."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        blobs: list[tuple[float, str, int]] = [
+            (stat.st_mtime, path.name, stat.st_size)
+            for path in self.directory.glob("??/*")
+            if path.suffix != ".tmp" and (stat := path.stat())
+        ]
+
+        for _, content_hash, size in sorted(blobs):
+            self._blobs[content_hash] = size
+            self.size += size
+
+        if self._index_path.exists():
+            loaded_at: float = time.time()
+
+            with self._index_path.open(encoding="utf-8") as index:
+                for line in index:
+                    try:
+                        url, entry = _parse_index_line(line, loaded_at)
+                    except ValueError:
+                        self.malformed_index_lines += 1
+                        continue
+
+                    if entry.content_hash in self._blobs:
+                        self._urls[url] = entry
+
+        self._index_path.write_text(
+            "".join(_format_index_line(url, entry) for url, entry in self._urls.items()),
+            encoding="utf-8",
+        )
+
+
+def _format_index_line(url: str, entry: CachedUrl) -> str:
+    return f"{url}\t{entry.content_hash}\t{entry.etag or ''}\t{entry.last_modified or ''}\t{entry.validated_at}\n"
+
+
+def _parse_index_line(line: str, loaded_at: float) -> tuple[str, CachedUrl]:
+    """Parse an index line, lines without validators are written by older versions.
+
+    Raises:
+        ValueError: if the line is malformed.
+    """
+    fields: list[str] = line.rstrip("\n").split("\t")
+
+    if len(fields) not in (2, 5) or not all(fields[:2]):
+        msg = f"Malformed image cache index line {line!r}"
+        raise ValueError(msg)
+
+    url, content_hash, *validators = fields
+
+    if not validators:
+        return url, CachedUrl(content_hash, validated_at=loaded_at)
+
+    etag, last_modified, validated_at = validators
+
+    return url, CachedUrl(content_hash, etag or None, last_modified or None, float(validated_at))
+
+
+class CachingImageFetcher:
+    """Image fetcher serving repeated urls from the disk image cache.
+
+    A stale url is revalidated with ``If-None-Match`` and ``If-Modified-Since``, its body is read from the
+    cache if the server answers 304.
+    """
+
+    def __init__(self, image_fetcher: HttpFetcher, cache: DiskImageCache) -> None:
+        self.image_fetcher: Final[HttpFetcher] = image_fetcher
+        self.cache: Final[DiskImageCache] = cache
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def fetch(self, url: str, logger: ILogger | None = None, budget: IByteBudget | None = None) -> bytes:
+        if not self.cache.enabled:
+            return await self.image_fetcher.fetch(url, logger, budget)
+
+        if (entry := self.cache.get_entry(url)) is not None and self.cache.is_stale(entry):
+            download: Download = await self.image_fetcher.download(
+                url,
+                logger,
+                budget,
+                Validators(entry.etag, entry.last_modified),
+            )
+
+            if not download.not_modified:
+                await self._put(url, download, logger)
+
+                return download.content
+
+            try:
+                await self.cache.mark_validated(url)
+            except OSError as error:
+                if logger:
+                    logger.debug("%s: can't mark url=%r validated: %s", self, url, error)
+
+        cached_size: int | None = self.cache.size_of(url)
+
+        if budget and cached_size is not None:
+            await budget.acquire(cached_size)
+
+        content: bytes | None = await self.cache.get(url)
+
+        if content is not None:
+            if logger:
+                logger.debug("%s: takes url=%r from cache", self, url)
+
+            return content
+
+        if budget and cached_size is not None:
+            budget.release(cached_size)
+
+        download = await self.image_fetcher.download(url, logger, budget)
+        await self._put(url, download, logger)
+
+        return download.content
+
+    async def _put(self, url: str, download: Download, logger: ILogger | None = None) -> None:
+        try:
+            await self.cache.put(url, download.content, download.etag, download.last_modified)
+        except OSError as error:
+            if logger:
+                logger.debug("%s: can't cache url=%r: %s", self, url, error)
@@ -0,0 +1,39 @@
+import time
+from collections.abc import Sequence
+from typing import Final
+
+from faststream.rabbit import RabbitBroker
+
+from ozon_importer.handlers.types import ImageTask
+from ozon_importer.interfaces import ILogger
+
+
+class ImageTaskPublisher:
+    """Sends product images to the image loading queue, one message per image.
+
+    A delayed task is published to ``retry_queue``, it expires there after the delay and is dead-lettered
+    to the image loading queue.
+    """
+
+    def __init__(self, broker: RabbitBroker, queue: str, retry_queue: str | None = None) -> None:
+        self.broker: Final[RabbitBroker] = broker
+        self.queue: Final[str] = queue
+        self.retry_queue: Final[str | None] = retry_queue
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def send(self, product_id: int, urls: Sequence[str], logger: ILogger | None = None) -> None:
+        if logger:
+            logger.debug("%s queues %d images for product %s", self, len(urls), product_id)
+
+        created_at: float = time.time()
+
+        for url in urls:
+            await self.publish(ImageTask(product_id=product_id, url=url, created_at=created_at))
+
+    async def publish(self, task: ImageTask, delay: float = 0.0) -> None:
+        if delay and self.retry_queue is not None:
+            await self.broker.publish(task, queue=self.retry_queue, persist=True, expiration=delay)
+        else:
+            await self.broker.publish(task, queue=self.queue, persist=True)
@@ -0,0 +1,69 @@
+import sqlite3
+from collections.abc import Mapping, Sequence
+from typing import Final
+
+from ozon_importer.repositories.sqlite_store import SqliteStore
+from ozon_importer.services.types import ImportCheckpoint
+
+
+class SqliteImportCheckpointStore(SqliteStore):
+    """Store of unfinished product import checkpoints in a local SQLite database."""
+
+    _SELECT_CHUNK_SIZE: Final[int] = 500
+
+    async def get_many(self, marketplace_id: int, skus: Sequence[str]) -> dict[str, ImportCheckpoint]:
+        return await self._run(self._select, marketplace_id, skus)
+
+    async def set_many(self, marketplace_id: int, checkpoints: Mapping[str, ImportCheckpoint]) -> None:
+        if checkpoints:
+            await self._run(self._upsert, marketplace_id, checkpoints)
+
+    async def delete_many(self, marketplace_id: int, skus: Sequence[str]) -> None:
+        if skus:
+            await self._run(self._delete, marketplace_id, skus)
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS import_checkpoints (
+                marketplace_id INTEGER NOT NULL,
+                sku TEXT NOT NULL,
+                checkpoint TEXT NOT NULL,
+                PRIMARY KEY (marketplace_id, sku)
+            ) WITHOUT ROWID
+            """,
+        )
+
+    def _select(self, marketplace_id: int, skus: Sequence[str]) -> dict[str, ImportCheckpoint]:
+        checkpoints: dict[str, ImportCheckpoint] = {}
+
+        for start in range(0, len(skus), self._SELECT_CHUNK_SIZE):
+            chunk: Sequence[str] = skus[start : start + self._SELECT_CHUNK_SIZE]
+            rows: list[tuple[str, str]] = (
+                self._get_connection()
+                .execute(
+                    "SELECT sku, checkpoint FROM import_checkpoints "  # noqa: S608
+                    f"WHERE marketplace_id = ? AND sku IN ({', '.join('?' * len(chunk))})",
+                    [marketplace_id, *chunk],
+                )
+                .fetchall()
+            )
+
+            for sku, checkpoint in rows:
+                checkpoints[sku] = ImportCheckpoint.model_validate_json(checkpoint)
+
+        return checkpoints
+
+    def _upsert(self, marketplace_id: int, checkpoints: Mapping[str, ImportCheckpoint]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO import_checkpoints (marketplace_id, sku, checkpoint) VALUES (?, ?, ?)",
+                [(marketplace_id, sku, checkpoint.model_dump_json()) for sku, checkpoint in checkpoints.items()],
+            )
+
+    def _delete(self, marketplace_id: int, skus: Sequence[str]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM import_checkpoints WHERE marketplace_id = ? AND sku = ?",
+                [(marketplace_id, sku) for sku in skus],
+            )
@@ -0,0 +1,22 @@
+from collections.abc import Mapping, Sequence
+from typing import Protocol
+
+from ozon_importer.repositories.entity_cache import EntityKey
+
+
+class IConcurrencyLimiter(Protocol):
+    async def acquire(self) -> None: ...
+
+    def release(self, latency: float, *, overloaded: bool) -> None: ...
+
+    def pause(self, seconds: float) -> None: ...
+
+
+class IEntityIdStore(Protocol):
+    """Persistent map of (entity type, natural key, marketplace_id) to Markets Bridge id."""
+
+    async def get_many(self, keys: Sequence[EntityKey]) -> dict[EntityKey, int]: ...
+
+    async def set_many(self, entity_ids: Mapping[EntityKey, int]) -> None: ...
+
+    async def delete_many(self, keys: Sequence[EntityKey]) -> None: ...
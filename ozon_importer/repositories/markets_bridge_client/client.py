@@ -1,12 +1,23 @@
+import asyncio
+import base64
+import json
+import time
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
+from functools import partial
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Final
 
 from async_property import async_property
-from backoff import expo, on_exception
 from httpx import AsyncClient, HTTPError, HTTPStatusError, Response
 
-from ozon_importer.interfaces import ILogger
+from ozon_importer.exceptions import BulkResponseMismatchError, StaleProductEntitiesError
+from ozon_importer.image_formats import IMAGE_CONTENT_TYPES, IMAGE_EXTENSIONS, sniff_image_format
+from ozon_importer.interfaces import ILogger, IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
+from ozon_importer.repositories.entity_cache import EntityCache, EntityKey
+from ozon_importer.repositories.http_errors import get_retry_after, is_overload_response
+from ozon_importer.repositories.interfaces import IConcurrencyLimiter, IEntityIdStore
 from ozon_importer.repositories.markets_bridge_client.types import (
     Brand,
     Category,
@@ -15,23 +26,57 @@ from ozon_importer.repositories.markets_bridge_client.types import (
     Image,
     Product,
 )
+from ozon_importer.repositories.retry_policy import RetryPolicy
+
+
+STALE_ENTITY_STATUSES: frozenset[int] = frozenset((HTTPStatus.NOT_FOUND, HTTPStatus.CONFLICT))
+ENTITY_PATHS: Final[dict[str, str]] = {
+    "category": "api/v1/provider/categories/",
+    "brand": "api/v1/provider/brands/",
+    "characteristic": "api/v1/provider/characteristics/",
+    "characteristic_value": "api/v1/provider/characteristic_values/",
+}
+BACKEND: Final[str] = "markets_bridge"
+ENTITY_KEY_FIELDS: Final[dict[str, tuple[str, ...]]] = {
+    "category": ("name",),
+    "brand": ("name",),
+    "characteristic": ("name", "product_type_name"),
+    "characteristic_value": ("value", "characteristic_name"),
+}
 
 
 class MarketsBridgeClient:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         http_client: AsyncClient,
         markets_bridge_host: str,
         markets_bridge_login: str,
         markets_bridge_password: str,
+        *,
+        entity_cache: EntityCache | None = None,
+        entity_id_store: IEntityIdStore | None = None,
+        bulk_size: int = 500,
+        token_refresh_leeway: float = 0.0,
+        limiter: IConcurrencyLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        metrics: IMetrics = NULL_METRICS,
     ) -> None:
         self.http_client: AsyncClient = http_client
         self.markets_bridge_host: str = markets_bridge_host
+        self.entity_cache: EntityCache | None = entity_cache
+        self.entity_id_store: IEntityIdStore | None = entity_id_store
+        self.bulk_size: int = bulk_size
+        self.limiter: IConcurrencyLimiter | None = limiter
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy(metrics=metrics)
+        self.metrics: IMetrics = metrics
+        self._entity_requests: dict[tuple[str, str], asyncio.Task[tuple[int, bool]]] = {}
         self.accessor: Accessor = Accessor(
             http_client=http_client,
             markets_bridge_host=markets_bridge_host,
             login=markets_bridge_login,
             password=markets_bridge_password,
+            refresh_leeway=token_refresh_leeway,
+            metrics=metrics,
         )
 
     def __str__(self) -> str:
@@ -40,15 +85,29 @@ class MarketsBridgeClient:
     async def send_product(self, product: Product, logger: ILogger | None = None) -> tuple[int, bool]:
         """Send product.
 
+        Raises:
+            StaleProductEntitiesError: if Markets Bridge doesn't know entities the product refers to, their
+                cached ids are forgotten.
+
         Returns:
             product_id, is_new.
         """
-        product_id, is_new = await self._send_entity(
-            product,
-            f"{self.markets_bridge_host}api/v1/provider/products/",
-            logger=logger,
-        )
-        logger.debug(f"{self} sends '{product['name']}' product, {product_id=}, {is_new=}")
+        try:
+            product_id, is_new = await self._send_entity(
+                product,
+                f"{self.markets_bridge_host}api/v1/provider/products/",
+                logger=logger,
+            )
+        except HTTPStatusError as error:
+            if error.response.status_code in STALE_ENTITY_STATUSES:
+                await self._invalidate_product_entities(product)
+
+                raise StaleProductEntitiesError(product["name"], error.response.status_code) from error
+
+            raise
+
+        if logger:
+            logger.debug("%s sends '%s' product, product_id=%s, is_new=%s", self, product["name"], product_id, is_new)
 
         return product_id, is_new
 
@@ -62,12 +121,20 @@ class MarketsBridgeClient:
         Returns:
             category_id, is_new.
         """
-        category_id, is_new = await self._send_entity(
+        category_id, is_new = await self._send_cached_entity(
+            "category",
             category,
             f"{self.markets_bridge_host}api/v1/provider/categories/",
             logger=logger,
         )
-        logger.debug(f"{self} sends '{category['name']}' characteristic, {category_id=}, {is_new=}")
+        if logger:
+            logger.debug(
+                "%s sends '%s' category, category_id=%s, is_new=%s",
+                self,
+                category["name"],
+                category_id,
+                is_new,
+            )
 
         return category_id, is_new
 
@@ -81,12 +148,20 @@ class MarketsBridgeClient:
         Returns:
             characteristic_id, is_new.
         """
-        characteristic_id, is_new = await self._send_entity(
+        characteristic_id, is_new = await self._send_cached_entity(
+            "characteristic",
             characteristic,
             f"{self.markets_bridge_host}api/v1/provider/characteristics/",
             logger=logger,
         )
-        logger.debug(f"{self} sends '{characteristic['name']}' characteristic, {characteristic_id=}, {is_new=}")
+        if logger:
+            logger.debug(
+                "%s sends '%s' characteristic, characteristic_id=%s, is_new=%s",
+                self,
+                characteristic["name"],
+                characteristic_id,
+                is_new,
+            )
 
         return characteristic_id, is_new
 
@@ -100,15 +175,20 @@ class MarketsBridgeClient:
         Returns:
             characteristic_value_id, is_new.
         """
-        characteristic_value_id, is_new = await self._send_entity(
+        characteristic_value_id, is_new = await self._send_cached_entity(
+            "characteristic_value",
             characteristic_value,
             f"{self.markets_bridge_host}api/v1/provider/characteristic_values/",
             logger=logger,
         )
-        logger.debug(
-            f"{self} sends '{characteristic_value['value']}' "
-            f"characteristic value, {characteristic_value_id=}, {is_new=}",
-        )
+        if logger:
+            logger.debug(
+                "%s sends '%s' characteristic value, characteristic_value_id=%s, is_new=%s",
+                self,
+                characteristic_value["value"],
+                characteristic_value_id,
+                is_new,
+            )
 
         return characteristic_value_id, is_new
 
@@ -118,17 +198,59 @@ class MarketsBridgeClient:
         Returns:
             brand_id, is_new.
         """
-        brand_id, is_new = await self._send_entity(
+        brand_id, is_new = await self._send_cached_entity(
+            "brand",
             brand,
             f"{self.markets_bridge_host}api/v1/provider/brands/",
             logger=logger,
         )
         if logger:
-            logger.debug(f"{self} sends '{brand['name']}' brand, {brand_id=}, {is_new=}")
+            logger.debug("%s sends '%s' brand, brand_id=%s, is_new=%s", self, brand["name"], brand_id, is_new)
 
         return brand_id, is_new
 
-    @on_exception(expo, HTTPError, max_tries=3)
+    async def send_characteristics_bulk(
+        self,
+        characteristics: Sequence[Characteristic],
+        logger: ILogger | None = None,
+    ) -> list[tuple[int, bool]]:
+        """Send characteristics in bulk.
+
+        Returns:
+            characteristic_id, is_new for every characteristic.
+        """
+        results: list[tuple[int, bool]] = await self._send_cached_entities(
+            "characteristic",
+            characteristics,
+            f"{self.markets_bridge_host}api/v1/provider/characteristics/",
+            logger=logger,
+        )
+        if logger:
+            logger.debug("%s sends %d characteristics in bulk", self, len(characteristics))
+
+        return results
+
+    async def send_characteristic_values_bulk(
+        self,
+        characteristic_values: Sequence[CharacteristicValue],
+        logger: ILogger | None = None,
+    ) -> list[tuple[int, bool]]:
+        """Send characteristic values in bulk.
+
+        Returns:
+            characteristic_value_id, is_new for every characteristic value.
+        """
+        results: list[tuple[int, bool]] = await self._send_cached_entities(
+            "characteristic_value",
+            characteristic_values,
+            f"{self.markets_bridge_host}api/v1/provider/characteristic_values/",
+            logger=logger,
+        )
+        if logger:
+            logger.debug("%s sends %d characteristic values in bulk", self, len(characteristic_values))
+
+        return results
+
     async def send_image(self, image: Image, logger: ILogger | None = None) -> int:
         """Send image.
 
@@ -136,20 +258,142 @@ class MarketsBridgeClient:
             image_id.
         """
         if logger:
-            logger.debug(f"{self}: sends image for {image['product_id']}")
+            logger.debug("%s: sends image for %s", self, image["product_id"])
 
-        headers: dict = await self._get_authorization_headers()
-        response: Response = await self.http_client.post(
+        image_format: str = sniff_image_format(image["body"]) or "JPEG"
+        file_name: str = f"{uuid.uuid4().hex}.{IMAGE_EXTENSIONS[image_format]}"
+        response: Response = await self._request(
+            "post",
             f"{self.markets_bridge_host}api/v1/provider/product_images/",
+            logger,
             data={"product": image["product_id"]},
-            files={"image": (f"{uuid.uuid4().hex}.jpg", image["body"])},
-            headers=headers,
+            files={"image": (file_name, image["body"], IMAGE_CONTENT_TYPES[image_format])},
         )
 
-        if response.status_code == HTTPStatus.UNAUTHORIZED:
-            await self.accessor.update_access_token()
+        return response.json()["id"]
+
+    async def _send_entity(self, entity: dict, url: str, logger: ILogger | None = None) -> tuple[int, bool]:
+        """Send entity, concurrent sends of an equal entity to the same url share one request.
+
+        The shared request is not cancelled with any of its callers.
+
+        Returns:
+            entity_id, is_new; is_new is False for callers that joined a request in flight.
+        """
+        key: tuple[str, str] = (url, json.dumps(entity, sort_keys=True, ensure_ascii=False))
+
+        if (request := self._entity_requests.get(key)) is not None:
+            self.metrics.increment("ozon_importer_mb_coalesced_requests_total", endpoint=self._get_endpoint(url))
+            entity_id, _ = await asyncio.shield(request)
+
+            return entity_id, False
+
+        request = asyncio.create_task(self._post_entity(entity, url, logger))
+        self._entity_requests[key] = request
+        request.add_done_callback(lambda _: self._entity_requests.pop(key, None))
+
+        return await asyncio.shield(request)
+
+    async def _post_entity(self, entity: dict, url: str, logger: ILogger | None = None) -> tuple[int, bool]:
+        response: Response = await self._post_json(url, entity, logger)
+
+        return response.json()["id"], response.status_code == HTTPStatus.CREATED
+
+    async def _send_entities(
+        self,
+        entities: Sequence[dict],
+        url: str,
+        logger: ILogger | None = None,
+    ) -> list[tuple[int, bool]]:
+        """Send entities to bulk endpoint.
+
+        The endpoint answers with a list of ``{"id": ..., "is_new": ...}`` in the order of sent entities.
+
+        Returns:
+            entity_id, is_new for every entity.
+        """
+        response: Response = await self._post_json(f"{url}bulk/", entities, logger)
+        results: list[tuple[int, bool]] = [(result["id"], result["is_new"]) for result in response.json()]
+
+        if len(results) != len(entities):
+            raise BulkResponseMismatchError(url, len(entities), len(results))
 
-            return self.send_image(image, logger)
+        return results
+
+    async def iter_entities(
+        self,
+        entity_type: str,
+        marketplace_id: int,
+        logger: ILogger | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """Iterate over pages of known entities of marketplace.
+
+        Both plain lists and paginated ``{"results": [...], "next": ...}`` answers are supported.
+        """
+        url: str | None = f"{self.markets_bridge_host}{ENTITY_PATHS[entity_type]}"
+        params: dict | None = {"marketplace_id": marketplace_id}
+
+        while url:
+            response: Response = await self._request("get", url, logger, params=params)
+            page: Any = response.json()
+
+            if isinstance(page, list):
+                yield page
+
+                return
+
+            yield page["results"]
+            url, params = page.get("next"), None
+
+    async def remember_entities(self, entity_type: str, entities: Sequence[dict], marketplace_id: int) -> None:
+        """Store ids of entities known by Markets Bridge, so they are never sent again."""
+        await self._remember_entity_ids(
+            {
+                EntityCache.make_key(
+                    entity_type,
+                    {
+                        **{field: entity[field] for field in ENTITY_KEY_FIELDS[entity_type]},
+                        "marketplace_id": marketplace_id,
+                    },
+                ): entity["id"]
+                for entity in entities
+            },
+        )
+
+    async def _post_json(self, url: str, payload: Any, logger: ILogger | None = None) -> Response:
+        return await self._request("post", url, logger, json=payload)
+
+    async def _request(self, method: str, url: str, logger: ILogger | None = None, **kwargs: Any) -> Response:
+        """Send request under the retry policy.
+
+        Raises:
+            HTTPStatusError: if the last attempt was answered with an error.
+            CircuitOpenError: if Markets Bridge is failing.
+        """
+        return await self.retry_policy.call(BACKEND, partial(self._request_once, method, url, logger, **kwargs))
+
+    async def _request_once(self, method: str, url: str, logger: ILogger | None = None, **kwargs: Any) -> Response:
+        """Send request once, refreshing the access token and sending it again at most once on 401."""
+        send: Callable[..., Awaitable[Response]] = getattr(self.http_client, method)
+        access_token: str = await self.accessor.access_token
+
+        with self.metrics.timer("ozon_importer_mb_request_seconds", endpoint=self._get_endpoint(url)):
+            response: Response = await self._send_limited(
+                send,
+                url,
+                headers=self._get_authorization_headers(access_token),
+                **kwargs,
+            )
+
+            if response.status_code == HTTPStatus.UNAUTHORIZED:
+                self.metrics.increment("ozon_importer_mb_unauthorized_total")
+                await self.accessor.update_access_token(access_token)
+                response = await self._send_limited(
+                    send,
+                    url,
+                    headers=self._get_authorization_headers(await self.accessor.access_token),
+                    **kwargs,
+                )
 
         try:
             response.raise_for_status()
@@ -158,58 +402,218 @@ class MarketsBridgeClient:
                 logger.debug("Internal server error")
             raise
 
-        return response.json()["id"]
+        return response
 
-    @on_exception(expo, HTTPError, max_tries=3)
-    async def _send_entity(self, entity: dict, url: str, logger: ILogger | None = None) -> tuple[int, bool]:
-        """Send entity.
+    async def _send_cached_entity(
+        self,
+        entity_type: str,
+        entity: dict,
+        url: str,
+        logger: ILogger | None = None,
+    ) -> tuple[int, bool]:
+        """Send entity unless its id is already known.
 
         Returns:
             entity_id, is_new.
         """
-        headers: dict = await self._get_authorization_headers()
-        response: Response = await self.http_client.post(url, json=entity, headers=headers)
+        key: EntityKey = EntityCache.make_key(entity_type, entity)
+
+        if (entity_id := (await self._lookup_entity_ids([key])).get(key)) is not None:
+            return entity_id, False
+
+        entity_id, is_new = await self._send_entity(entity, url, logger)
+        await self._remember_entity_ids({key: entity_id})
+
+        return entity_id, is_new
+
+    async def _send_cached_entities(
+        self,
+        entity_type: str,
+        entities: Sequence[dict],
+        url: str,
+        logger: ILogger | None = None,
+    ) -> list[tuple[int, bool]]:
+        """Send not known entities in bulk, one request per ``bulk_size`` unique entities.
+
+        Returns:
+            entity_id, is_new for every entity in the same order.
+        """
+        keys: list[EntityKey] = [EntityCache.make_key(entity_type, entity) for entity in entities]
+        known_ids: dict[EntityKey, int] = await self._lookup_entity_ids(list(dict.fromkeys(keys)))
+        results: list[tuple[int, bool]] = [(0, False)] * len(entities)
+        pending: dict[EntityKey, list[int]] = {}
+
+        for index, key in enumerate(keys):
+            if key in known_ids:
+                results[index] = (known_ids[key], False)
+            else:
+                pending.setdefault(key, []).append(index)
+
+        pending_keys: list[EntityKey] = list(pending)
+
+        for start in range(0, len(pending_keys), self.bulk_size):
+            chunk: list[EntityKey] = pending_keys[start : start + self.bulk_size]
+            sent: list[tuple[int, bool]] = await self._send_entities(
+                [entities[pending[key][0]] for key in chunk],
+                url,
+                logger,
+            )
+            await self._remember_entity_ids({key: entity_id for key, (entity_id, _) in zip(chunk, sent, strict=True)})
 
-        if response.status_code == HTTPStatus.UNAUTHORIZED:
-            await self.accessor.update_access_token()
+            for key, (entity_id, is_new) in zip(chunk, sent, strict=True):
+                first_index, *duplicate_indexes = pending[key]
+                results[first_index] = (entity_id, is_new)
 
-            return await self._send_entity(entity, url, logger)
+                for index in duplicate_indexes:
+                    results[index] = (entity_id, False)
+
+        return results
+
+    async def _lookup_entity_ids(self, keys: Sequence[EntityKey]) -> dict[EntityKey, int]:
+        """Look entity ids up in the cache, then in the persistent store.
+
+        Returns:
+            ids of found entities.
+        """
+        found_ids: dict[EntityKey, int] = {}
+        missing_keys: list[EntityKey] = []
+
+        for key in keys:
+            if self.entity_cache is not None and (entity_id := self.entity_cache.get(key)) is not None:
+                found_ids[key] = entity_id
+            else:
+                missing_keys.append(key)
+
+        if missing_keys and self.entity_id_store is not None:
+            stored_ids: dict[EntityKey, int] = await self.entity_id_store.get_many(missing_keys)
+
+            if self.entity_cache is not None:
+                for key, entity_id in stored_ids.items():
+                    self.entity_cache.set(key, entity_id)
+
+            found_ids.update(stored_ids)
+
+        return found_ids
+
+    async def _remember_entity_ids(self, entity_ids: Mapping[EntityKey, int]) -> None:
+        if self.entity_cache is not None:
+            for key, entity_id in entity_ids.items():
+                self.entity_cache.set(key, entity_id)
+
+        if self.entity_id_store is not None:
+            await self.entity_id_store.set_many(entity_ids)
+
+    async def _invalidate_product_entities(self, product: Product) -> None:
+        """Forget ids of entities the product refers to."""
+        marketplace_id: int = product["marketplace_id"]
+        category_name: str = product["category_name"]
+        entities: list[tuple[str, dict]] = [
+            ("category", {"name": category_name, "marketplace_id": marketplace_id}),
+            ("brand", {"name": product["brand_name"], "marketplace_id": marketplace_id}),
+        ]
+
+        for characteristic in product["characteristics"]:
+            entities.append(
+                (
+                    "characteristic",
+                    {
+                        "name": characteristic["name"],
+                        "product_type_name": category_name,
+                        "marketplace_id": marketplace_id,
+                    },
+                ),
+            )
+            entities.append(
+                (
+                    "characteristic_value",
+                    {
+                        "value": characteristic["value"],
+                        "characteristic_name": characteristic["name"],
+                        "marketplace_id": marketplace_id,
+                    },
+                ),
+            )
+
+        keys: list[EntityKey] = [EntityCache.make_key(entity_type, entity) for entity_type, entity in entities]
+
+        if self.entity_cache is not None:
+            for key in keys:
+                self.entity_cache.invalidate(key)
+
+        if self.entity_id_store is not None:
+            await self.entity_id_store.delete_many(keys)
+
+    async def _send_limited(self, send: Callable[..., Awaitable[Response]], url: str, **kwargs: Any) -> Response:
+        """Send request within the concurrency limit, reporting its latency and overload to the limiter."""
+        if self.limiter is None:
+            return await send(url, **kwargs)
+
+        await self.limiter.acquire()
+        started_at: float = time.perf_counter()
 
         try:
-            response.raise_for_status()
-        except HTTPStatusError:
-            if HTTPStatus(response.status_code).is_server_error and logger:
-                logger.debug("Internal server error")
+            response: Response = await send(url, **kwargs)
+        except BaseException as error:
+            self.limiter.release(time.perf_counter() - started_at, overloaded=isinstance(error, HTTPError))
             raise
 
-        return response.json()["id"], response.status_code == HTTPStatus.CREATED
+        overloaded: bool = is_overload_response(response)
+        self.limiter.release(time.perf_counter() - started_at, overloaded=overloaded)
 
-    async def _get_authorization_headers(self) -> dict:
-        access_token: str = await self.accessor.access_token
+        if overloaded and (retry_after := get_retry_after(response)) is not None:
+            self.limiter.pause(retry_after)
+
+        return response
 
+    def _get_endpoint(self, url: str) -> str:
+        """Get metrics label of url, e.g. ``brands`` or ``characteristics/bulk``."""
+        path: str = url.removeprefix(str(self.markets_bridge_host)).split("?")[0]
+
+        return path.removeprefix("api/v1/provider/").strip("/")
+
+    @staticmethod
+    def _get_authorization_headers(access_token: str) -> dict:
         return {"Authorization": f"Bearer {access_token}"}
 
 
 class Accessor:
-    def __init__(
+    """JWT holder for Markets Bridge.
+
+    Tokens are updated single-flight: concurrent callers wait for one update and share its result.
+    The access token is refreshed ``refresh_leeway`` seconds before its ``exp`` claim, so requests
+    don't have to hit 401 at every expiry.
+    """
+
+    def __init__(  # noqa: PLR0913
         self,
         *,
         http_client: AsyncClient,
         markets_bridge_host: str,
         login: str,
         password: str,
+        refresh_leeway: float = 0.0,
+        metrics: IMetrics = NULL_METRICS,
     ) -> None:
         self.http_client: AsyncClient = http_client
         self.markets_bridge_host: str = markets_bridge_host
         self.login: str = login
         self.password: str = password
+        self.refresh_leeway: float = refresh_leeway
+        self.metrics: IMetrics = metrics
         self._refresh_token: str | None = None
         self._access_token: str | None = None
+        self._lock: asyncio.Lock = asyncio.Lock()
 
     @async_property
     async def access_token(self) -> str:
-        if not self._access_token:
-            await self.update_jwt()
+        access_token: str | None = self._access_token
+
+        if not access_token:
+            async with self._lock:
+                if not self._access_token:
+                    await self.update_jwt()
+        elif self._expires_soon(access_token):
+            await self.update_access_token(access_token)
 
         return self._access_token
 
@@ -219,24 +623,57 @@ class Accessor:
             "password": self.password,
         }
 
+        self.metrics.increment("ozon_importer_mb_token_updates_total", kind="login")
         response: Response = await self.http_client.post(f"{self.markets_bridge_host}api/token/", json=login_data)
         response.raise_for_status()
         token_data: Any = response.json()
         self._access_token = token_data["access"]
         self._refresh_token = token_data["refresh"]
 
-    async def update_access_token(self) -> None:
-        body: dict = {"refresh": self._refresh_token}
+    async def update_access_token(self, stale_access_token: str | None = None) -> None:
+        """Refresh access token unless it was already replaced since ``stale_access_token`` was taken."""
+        async with self._lock:
+            if stale_access_token is not None and self._access_token != stale_access_token:
+                return
 
-        response: Response = await self.http_client.post(f"{self.markets_bridge_host}api/token/refresh/", json=body)
+            if not self._refresh_token or self._expires_soon(self._refresh_token):
+                await self.update_jwt()
 
-        if response.status_code == HTTPStatus.UNAUTHORIZED:
-            await self.update_jwt()
-            await self.update_access_token()
+                return
 
-            return
+            self.metrics.increment("ozon_importer_mb_token_updates_total", kind="refresh")
+            body: dict = {"refresh": self._refresh_token}
+            response: Response = await self.http_client.post(
+                f"{self.markets_bridge_host}api/token/refresh/",
+                json=body,
+            )
 
-        response.raise_for_status()
+            if response.status_code == HTTPStatus.UNAUTHORIZED:
+                await self.update_jwt()
 
-        token_data: Any = response.json()
-        self._access_token = token_data["access"]
+                return
+
+            response.raise_for_status()
+
+            token_data: Any = response.json()
+            self._access_token = token_data["access"]
+
+    def _expires_soon(self, token: str) -> bool:
+        expires_at: float | None = get_token_expiration(token)
+
+        return expires_at is not None and expires_at - self.refresh_leeway <= time.time()
+
+
+def get_token_expiration(token: str) -> float | None:
+    """Read ``exp`` claim of JWT without verifying its signature.
+
+    Returns:
+        expiration timestamp or None if token has no readable ``exp`` claim.
+    """
+    try:
+        payload: str = token.split(".")[1]
+        claims: Any = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
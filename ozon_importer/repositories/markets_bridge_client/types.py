@@ -29,6 +29,7 @@ class Brand(TypedDict):
 
 class Characteristic(TypedDict):
     name: str
+    product_type_name: str
     marketplace_id: int
 
 
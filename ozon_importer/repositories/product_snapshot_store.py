@@ -0,0 +1,58 @@
+import sqlite3
+from collections.abc import Mapping, Sequence
+from typing import Final
+
+from ozon_importer.repositories.sqlite_store import SqliteStore
+from ozon_importer.services.types import ProductSnapshot
+
+
+class SqliteProductSnapshotStore(SqliteStore):
+    """Store of last sent product snapshots in a local SQLite database."""
+
+    _SELECT_CHUNK_SIZE: Final[int] = 500
+
+    async def get_many(self, marketplace_id: int, skus: Sequence[str]) -> dict[str, ProductSnapshot]:
+        return await self._run(self._select, marketplace_id, skus)
+
+    async def set_many(self, marketplace_id: int, snapshots: Mapping[str, ProductSnapshot]) -> None:
+        if snapshots:
+            await self._run(self._upsert, marketplace_id, snapshots)
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS product_snapshots (
+                marketplace_id INTEGER NOT NULL,
+                sku TEXT NOT NULL,
+                snapshot TEXT NOT NULL,
+                PRIMARY KEY (marketplace_id, sku)
+            ) WITHOUT ROWID
+            """,
+        )
+
+    def _select(self, marketplace_id: int, skus: Sequence[str]) -> dict[str, ProductSnapshot]:
+        snapshots: dict[str, ProductSnapshot] = {}
+
+        for start in range(0, len(skus), self._SELECT_CHUNK_SIZE):
+            chunk: Sequence[str] = skus[start : start + self._SELECT_CHUNK_SIZE]
+            rows: list[tuple[str, str]] = (
+                self._get_connection()
+                .execute(
+                    "SELECT sku, snapshot FROM product_snapshots "  # noqa: S608
+                    f"WHERE marketplace_id = ? AND sku IN ({', '.join('?' * len(chunk))})",
+                    [marketplace_id, *chunk],
+                )
+                .fetchall()
+            )
+
+            for sku, snapshot in rows:
+                snapshots[sku] = ProductSnapshot.model_validate_json(snapshot)
+
+        return snapshots
+
+    def _upsert(self, marketplace_id: int, snapshots: Mapping[str, ProductSnapshot]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO product_snapshots (marketplace_id, sku, snapshot) VALUES (?, ?, ?)",
+                [(marketplace_id, sku, snapshot.model_dump_json()) for sku, snapshot in snapshots.items()],
+            )
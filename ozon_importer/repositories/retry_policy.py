@@ -0,0 +1,232 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Final, TypeVar
+
+from httpx import HTTPStatusError, TransportError
+
+from ozon_importer.exceptions import CircuitOpenError
+from ozon_importer.interfaces import IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
+from ozon_importer.repositories.http_errors import get_retry_after, is_overload_response, is_permanent_error
+
+
+T = TypeVar("T")
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a part of requests.
+
+    Every first attempt deposits ``ratio`` of a token, every retry withdraws a whole one. ``min_per_second``
+    tokens are added with time, so rare requests can still be retried. A retry storm during an outage is
+    bounded by ``ratio`` of normal load.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 5.0, max_tokens: float = 100.0) -> None:
+        self.ratio: Final[float] = ratio
+        self.min_per_second: Final[float] = min_per_second
+        self.max_tokens: Final[float] = max_tokens
+        self.tokens: float = max_tokens
+        self.exhausted: int = 0
+        self._updated_at: float = time.monotonic()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def export_metrics(self) -> dict[str, float]:
+        return {
+            "ozon_importer_retry_budget_tokens": self.tokens,
+            "ozon_importer_retry_budget_exhausted_total": self.exhausted,
+        }
+
+    def deposit(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry.
+
+        Returns:
+            whether the retry is allowed.
+        """
+        self._refill()
+
+        if self.tokens < 1.0:
+            self.exhausted += 1
+
+            return False
+
+        self.tokens -= 1.0
+
+        return True
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self.tokens = min(self.tokens + (now - self._updated_at) * self.min_per_second, self.max_tokens)
+        self._updated_at = now
+
+
+class CircuitBreaker:
+    """Fails calls to a backend fast after ``failure_threshold`` failures in a row.
+
+    The circuit stays open for ``reset_timeout`` seconds, then one trial call is let through:
+    its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 20, reset_timeout: float = 30.0) -> None:
+        self.name: Final[str] = name
+        self.failure_threshold: Final[int] = failure_threshold
+        self.reset_timeout: Final[float] = reset_timeout
+        self.failures: int = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight: bool = False
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> bool:
+        """Let a call through or raise ``CircuitOpenError``.
+
+        Returns:
+            whether the call is the trial of an open circuit.
+        """
+        if self.opened_at is None:
+            return False
+
+        retry_in: float = self.opened_at + self.reset_timeout - time.monotonic()
+
+        if retry_in > 0 or self._trial_in_flight:
+            raise CircuitOpenError(self.name, max(retry_in, 0.0))
+
+        self._trial_in_flight = True
+
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def abandon_trial(self) -> None:
+        """Let another call be the trial if this one was cancelled or failed without an answer to judge."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failed call.
+
+        Returns:
+            whether the circuit was opened by it.
+        """
+        self.failures += 1
+        reopened: bool = self._trial_in_flight
+        self._trial_in_flight = False
+
+        if reopened or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+
+            return True
+
+        return False
+
+
+class RetryPolicy:
+    """The only retry layer for HTTP calls to Markets Bridge and image hosts.
+
+    A call is attempted up to ``max_attempts`` times with full-jitter exponential delays, longer if the
+    answer has ``Retry-After``. Transport errors and 408, 429 and 5xx answers are retried while the shared
+    retry budget allows. Every backend has a circuit breaker, transport errors and overload answers count
+    as its failures.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        budget: RetryBudget | None = None,
+        failure_threshold: int = 20,
+        reset_timeout: float = 30.0,
+        metrics: IMetrics = NULL_METRICS,
+    ) -> None:
+        self.max_attempts: Final[int] = max_attempts
+        self.base_delay: Final[float] = base_delay
+        self.max_delay: Final[float] = max_delay
+        self.budget: Final[RetryBudget | None] = budget
+        self.failure_threshold: Final[int] = failure_threshold
+        self.reset_timeout: Final[float] = reset_timeout
+        self.metrics: Final[IMetrics] = metrics
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def get_breaker(self, backend: str) -> CircuitBreaker:
+        if backend not in self._breakers:
+            self._breakers[backend] = CircuitBreaker(backend, self.failure_threshold, self.reset_timeout)
+
+        return self._breakers[backend]
+
+    async def call(self, backend: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Make attempts of a call to a backend.
+
+        Raises:
+            CircuitOpenError: if the backend circuit is open.
+        """
+        breaker: CircuitBreaker = self.get_breaker(backend)
+
+        if self.budget is not None:
+            self.budget.deposit()
+
+        for attempt_number in range(1, self.max_attempts + 1):
+            is_trial: bool = breaker.check()
+
+            try:
+                result: T = await attempt()
+            except (TransportError, HTTPStatusError) as error:
+                if self._is_failure(error):
+                    if breaker.record_failure():
+                        self.metrics.increment("ozon_importer_circuit_opens_total", backend=backend)
+                else:
+                    breaker.record_success()
+
+                if not self._can_retry(error, attempt_number):
+                    raise
+
+                self.metrics.increment("ozon_importer_retries_total", backend=backend)
+                await asyncio.sleep(self._get_delay(error, attempt_number))
+            except BaseException:
+                if is_trial:
+                    breaker.abandon_trial()
+                raise
+            else:
+                breaker.record_success()
+
+                return result
+
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _is_failure(error: TransportError | HTTPStatusError) -> bool:
+        if isinstance(error, HTTPStatusError):
+            return is_overload_response(error.response)
+
+        return not is_permanent_error(error)
+
+    def _can_retry(self, error: TransportError | HTTPStatusError, attempt_number: int) -> bool:
+        if attempt_number >= self.max_attempts or is_permanent_error(error):
+            return False
+
+        return self.budget is None or self.budget.withdraw()
+
+    def _get_delay(self, error: TransportError | HTTPStatusError, attempt_number: int) -> float:
+        delay: float = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt_number - 1)))
+
+        if isinstance(error, HTTPStatusError) and (retry_after := get_retry_after(error.response)) is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+
+        return delay
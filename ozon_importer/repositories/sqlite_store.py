@@ -0,0 +1,78 @@
+import abc
+import asyncio
+import sqlite3
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Final, Self
+
+
+class SqliteStore(abc.ABC):
+    """Base of stores in a local SQLite database.
+
+    The database is opened in WAL mode with memory-mapped reads, so worker processes of one host can share it.
+    All queries run in a single dedicated thread, subclasses create their tables in ``_create_schema``.
+    """
+
+    def __init__(self, path: Path, mmap_size: int = 256 * 1024 * 1024) -> None:
+        self.path: Final[Path] = path
+        self.mmap_size: Final[int] = mmap_size
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=type(self).__name__)
+        self._connection: sqlite3.Connection | None = None
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def __aenter__(self) -> Self:
+        await self._run(self._open)
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self._run(self._close)
+        self._executor.shutdown()
+
+    async def _run(self, function: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    @abc.abstractmethod
+    def _create_schema(self, connection: sqlite3.Connection) -> None: ...
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        self._create_schema(self._connection)
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._open()
+
+        return self._connection  # type: ignore[return-value]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection: sqlite3.Connection = self._get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        connection.execute("COMMIT")
@@ -0,0 +1,53 @@
+import logging
+import random
+from collections.abc import Sequence
+from typing import Any, Final
+
+from ozon_importer.interfaces import ILogger
+
+
+class SampledLogger:
+    """Logger of one message passing ``rate`` of its debug records on.
+
+    Records are sampled evenly starting from a random offset, so even messages with a few records get
+    logged now and then. Nothing is passed on while debug is disabled, ``records`` counts all of them.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float = 1.0) -> None:
+        self.logger: Final[logging.Logger] = logger
+        self.rate: Final[float] = rate
+        self.records: int = 0
+        self._enabled: Final[bool] = rate > 0 and logger.isEnabledFor(logging.DEBUG)
+        self._credit: float = random.random()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def debug(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.records += 1
+
+        if not self._enabled:
+            return
+
+        self._credit += self.rate
+
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            self.logger.debug(msg, *args, **kwargs)
+
+
+class LoggerGroup:
+    """Logger of messages handled together, passing every record on to the logger of each of them.
+
+    So every message keeps its own sampling and counts the records of the work it took part in.
+    """
+
+    def __init__(self, loggers: Sequence[ILogger]) -> None:
+        self.loggers: Final[Sequence[ILogger]] = loggers
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    def debug(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        for logger in self.loggers:
+            logger.debug(msg, *args, **kwargs)
@@ -0,0 +1,183 @@
+import asyncio
+import gzip
+import itertools
+import json
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import IO, Final
+
+from pydantic import ValidationError
+
+from ozon_importer.interfaces import ILogger
+from ozon_importer.services.interfaces import IBatchProductSender
+from ozon_importer.sharding import get_shard
+from ozon_importer.types import Product
+
+
+GZIP_MAGIC: Final[bytes] = b"\x1f\x8b"
+READ_CHUNK_LINES: Final[int] = 1000
+
+Batch = list[tuple[int, Product]]
+
+
+class LineSet:
+    """Set of line numbers as a bitmap, a million lines take 125 KiB."""
+
+    def __init__(self) -> None:
+        self._bits: bytearray = bytearray()
+
+    def __contains__(self, line: int) -> bool:
+        index: int = line >> 3
+
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (line & 7)))
+
+    def add(self, line: int) -> None:
+        index: int = line >> 3
+
+        if index >= len(self._bits):
+            self._bits.extend(bytes(index + 1 - len(self._bits)))
+
+        self._bits[index] |= 1 << (line & 7)
+
+
+class BulkImporter:
+    """Imports products from a JSON lines dump, optionally gzip-compressed, without the broker.
+
+    The dump is read and decompressed in a worker thread by chunks of lines, at most three batches per lane
+    are held in memory. Batches are sent by ``concurrency`` lanes, a SKU always goes to one lane so its updates
+    keep their order, of several lines with one SKU in a batch only the last is sent and the others get its
+    outcome. Outcome of every line is appended to the results file, lines sent before are skipped when
+    the import is resumed with the same results file.
+    """
+
+    def __init__(self, product_sender: IBatchProductSender, concurrency: int = 8, batch_size: int = 50) -> None:
+        self.product_sender: Final[IBatchProductSender] = product_sender
+        self.concurrency: Final[int] = concurrency
+        self.batch_size: Final[int] = batch_size
+        self.lines: int = 0
+        self.sent: int = 0
+        self.failed: int = 0
+        self.resumed: int = 0
+        self.position: int = 0
+        self.size: int = 0
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    @property
+    def progress(self) -> float:
+        """Read part of the dump file."""
+        return self.position / self.size if self.size else 1.0
+
+    async def run(self, dump_path: Path, results_path: Path, logger: ILogger | None = None) -> None:
+        done: LineSet = await asyncio.to_thread(self._load_done, results_path)
+        lanes: list[asyncio.Queue[Batch | None]] = [asyncio.Queue(maxsize=1) for _ in range(self.concurrency)]
+        pending: list[Batch] = [[] for _ in range(self.concurrency)]
+        self.size = (await asyncio.to_thread(dump_path.stat)).st_size
+
+        if logger:
+            logger.debug("%s imports %s, %d lines were sent before", self, dump_path, self.resumed)
+
+        with dump_path.open("rb") as dump, results_path.open("a", encoding="utf-8") as results:
+            async with asyncio.TaskGroup() as task_group:
+                for lane in lanes:
+                    task_group.create_task(self._send_lane(lane, results, logger))
+
+                async for chunk in self._read_chunks(dump):
+                    for line, body in chunk:
+                        self.lines = line
+
+                        if line in done:
+                            continue
+
+                        try:
+                            product: Product = Product.model_validate_json(body)
+                        except ValidationError as error:
+                            self._write_results(results, [(line, None, error)])
+                            continue
+
+                        index: int = get_shard(product.sku, self.concurrency)
+                        pending[index].append((line, product))
+
+                        if len(pending[index]) >= self.batch_size:
+                            await lanes[index].put(pending[index])
+                            pending[index] = []
+
+                self.position = self.size
+
+                for lane, batch in zip(lanes, pending, strict=True):
+                    if batch:
+                        await lane.put(batch)
+
+                    await lane.put(None)
+
+    async def _send_lane(
+        self,
+        lane: asyncio.Queue[Batch | None],
+        results: IO[str],
+        logger: ILogger | None = None,
+    ) -> None:
+        while (batch := await lane.get()) is not None:
+            try:
+                errors: list[Exception | None] = await self.product_sender.send_many(
+                    [product for _, product in batch],
+                    logger,
+                )
+            except Exception as error:  # noqa: BLE001
+                errors = [error] * len(batch)
+
+            self._write_results(
+                results,
+                [(line, product.sku, error) for (line, product), error in zip(batch, errors, strict=True)],
+            )
+
+    def _write_results(self, results: IO[str], outcomes: list[tuple[int, str | None, Exception | None]]) -> None:
+        for line, sku, error in outcomes:
+            if error is None:
+                self.sent += 1
+                results.write(json.dumps({"line": line, "sku": sku, "status": "sent"}) + "\n")
+            else:
+                self.failed += 1
+                results.write(
+                    json.dumps({"line": line, "sku": sku, "status": "failed", "error": repr(error)}, ensure_ascii=False)
+                    + "\n",
+                )
+
+        results.flush()
+
+    def _load_done(self, results_path: Path) -> LineSet:
+        """Collect lines sent by previous runs, failed lines are sent again."""
+        done: LineSet = LineSet()
+
+        if not results_path.exists():
+            return done
+
+        with results_path.open(encoding="utf-8") as results:
+            for record in results:
+                try:
+                    outcome: dict = json.loads(record)
+                except json.JSONDecodeError:
+                    continue
+
+                if outcome.get("status") == "sent":
+                    done.add(outcome["line"])
+                    self.resumed += 1
+
+        return done
+
+    async def _read_chunks(self, dump: IO[bytes]) -> AsyncIterator[list[tuple[int, bytes]]]:
+        """Yield chunks of ``READ_CHUNK_LINES`` numbered lines, read and decompressed in a worker thread."""
+        lines: Iterator[tuple[int, bytes]] = self._read_lines(dump)
+
+        while chunk := await asyncio.to_thread(list, itertools.islice(lines, READ_CHUNK_LINES)):
+            self.position = dump.tell()
+            yield chunk
+
+    @staticmethod
+    def _read_lines(dump: IO[bytes]) -> Iterator[tuple[int, bytes]]:
+        """Yield numbered non-empty lines of a plain or gzip-compressed dump."""
+        lines: IO[bytes] = gzip.GzipFile(fileobj=dump) if dump.peek(2)[:2] == GZIP_MAGIC else dump  # type: ignore[attr-defined]
+
+        for line, body in enumerate(lines, start=1):
+            if body.strip():
+                yield line, body
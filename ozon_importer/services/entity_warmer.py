@@ -0,0 +1,40 @@
+from typing import Final
+
+from ozon_importer.interfaces import ILogger
+from ozon_importer.services.interfaces import IEntityLister
+
+
+class EntityWarmer:
+    """Fills entity id stores with entities Markets Bridge already knows.
+
+    Characteristic values are not listed: there are too many of them, they are remembered as they are sent.
+    """
+
+    ENTITY_TYPES: Final[tuple[str, ...]] = ("category", "brand", "characteristic")
+
+    def __init__(self, client: IEntityLister, marketplace_id: int) -> None:
+        self.client: Final[IEntityLister] = client
+        self.marketplace_id: Final[int] = marketplace_id
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def warm_up(self, logger: ILogger | None = None) -> dict[str, int]:
+        """Remember ids of all known entities of marketplace.
+
+        Returns:
+            number of remembered entities by entity type.
+        """
+        counts: dict[str, int] = {}
+
+        for entity_type in self.ENTITY_TYPES:
+            counts[entity_type] = 0
+
+            async for entities in self.client.iter_entities(entity_type, self.marketplace_id, logger):
+                await self.client.remember_entities(entity_type, entities, self.marketplace_id)
+                counts[entity_type] += len(entities)
+
+            if logger:
+                logger.debug("%s remembers %d %s entities", self, counts[entity_type], entity_type)
+
+        return counts
@@ -0,0 +1,140 @@
+import asyncio
+from collections import deque
+from collections.abc import Sequence
+from typing import Final
+
+from ozon_importer.exceptions import ImageTooLargeError
+from ozon_importer.interfaces import ILogger, IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
+from ozon_importer.services.interfaces import IClient, IImageFetcher, IImageTranscoder
+
+
+class ByteBudget:
+    """Limit of image bytes held in memory at once.
+
+    A body larger than the whole budget is accounted as the whole budget, so it is admitted alone.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit: Final[int] = limit
+        self.in_use: int = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def acquire(self, size: int) -> None:
+        cost: int = self._cost(size)
+
+        if not self._waiters and self.in_use + cost <= self.limit:
+            self.in_use += cost
+
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append((cost, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(size)
+            raise
+
+    def resize(self, old_size: int, new_size: int) -> None:
+        """Correct acquired size without waiting, e.g. when a body is longer than its ``Content-Length``."""
+        self.in_use += self._cost(new_size) - self._cost(old_size)
+        self._wake_up()
+
+    def release(self, size: int) -> None:
+        self.in_use -= self._cost(size)
+        self._wake_up()
+
+    def _cost(self, size: int) -> int:
+        return min(size, self.limit)
+
+    def _wake_up(self) -> None:
+        while self._waiters:
+            cost, future = self._waiters[0]
+
+            if future.cancelled():
+                self._waiters.popleft()
+                continue
+
+            if self.in_use + cost > self.limit:
+                break
+
+            self._waiters.popleft()
+            self.in_use += cost
+            future.set_result(None)
+
+
+class ImagePipeline:
+    """Fetches product images concurrently and uploads every image as soon as it is fetched.
+
+    Fetched but not yet uploaded bodies are limited by the byte budget shared by all products.
+    With a transcoder every image is downscaled and re-encoded between fetching and uploading.
+    An image larger than the fetcher allows is skipped, sending it again can't succeed.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: IClient,
+        image_fetcher: IImageFetcher,
+        budget: ByteBudget,
+        concurrency: int = 1,
+        transcoder: IImageTranscoder | None = None,
+        metrics: IMetrics = NULL_METRICS,
+    ) -> None:
+        self.client: Final[IClient] = client
+        self.image_fetcher: Final[IImageFetcher] = image_fetcher
+        self.budget: Final[ByteBudget] = budget
+        self.concurrency: Final[int] = concurrency
+        self.transcoder: Final[IImageTranscoder | None] = transcoder
+        self.metrics: Final[IMetrics] = metrics
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def send(self, product_id: int, urls: Sequence[str], logger: ILogger | None = None) -> None:
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with asyncio.TaskGroup() as task_group:
+            for url in urls:
+                task_group.create_task(self._send_image(semaphore, product_id, url, logger))
+
+    async def _send_image(
+        self,
+        semaphore: asyncio.Semaphore,
+        product_id: int,
+        url: str,
+        logger: ILogger | None = None,
+    ) -> None:
+        try:
+            async with semaphore:
+                body: bytes = await self.image_fetcher.fetch(url, logger, self.budget)
+        except ImageTooLargeError as error:
+            self.metrics.increment("ozon_importer_skipped_images_total", reason="too_large")
+
+            if logger:
+                logger.debug("%s skips image of product %s: %s", self, product_id, error)
+
+            return
+
+        if self.transcoder is not None:
+            try:
+                transcoded: bytes = await self.transcoder.transcode(body, logger)
+            except BaseException:
+                self.budget.release(len(body))
+                raise
+
+            self.budget.resize(len(body), len(transcoded))
+            body = transcoded
+
+        try:
+            with self.metrics.timer("ozon_importer_stage_seconds", stage="image_upload"):
+                await self.client.send_image({"body": body, "product_id": product_id}, logger)
+
+            self.metrics.increment("ozon_importer_uploaded_bytes_total", len(body))
+        finally:
+            self.budget.release(len(body))
@@ -0,0 +1,154 @@
+import asyncio
+import importlib.util
+import io
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+from typing import TYPE_CHECKING, Final, Self
+
+from ozon_importer.exceptions import ImageTranscodingUnavailableError
+from ozon_importer.image_formats import sniff_image_format
+from ozon_importer.interfaces import ILogger, IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
+
+
+if TYPE_CHECKING:
+    from PIL.Image import Image as PillowImage
+
+
+class ImageTranscoder:
+    """Downscales images to ``max_dimension`` and re-encodes them to ``target_format`` in a process pool.
+
+    The original body is kept when the result is not smaller, unless the image had to be downscaled.
+    Transcoding needs Pillow, it is checked on creation if transcoding is enabled, so a worker without it
+    fails on startup instead of on the first image.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        enabled: bool,
+        max_dimension: int,
+        target_format: str = "JPEG",
+        quality: int = 85,
+        workers: int | None = None,
+        metrics: IMetrics = NULL_METRICS,
+    ) -> None:
+        if enabled and importlib.util.find_spec("PIL") is None:
+            raise ImageTranscodingUnavailableError
+
+        self.enabled: Final[bool] = enabled
+        self.max_dimension: Final[int] = max_dimension
+        self.target_format: Final[str] = target_format.upper()
+        self.quality: Final[int] = quality
+        self.workers: Final[int | None] = workers
+        self.metrics: Final[IMetrics] = metrics
+        self.bytes_saved: int = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def __aenter__(self) -> Self:
+        if self.enabled:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def transcode(self, body: bytes, logger: ILogger | None = None) -> bytes:
+        """Transcode image body.
+
+        Returns:
+            transcoded body, or the original one if it is better kept or is not a known image.
+        """
+        source_format: str | None = sniff_image_format(body)
+
+        if self._executor is None or source_format is None:
+            return body
+
+        try:
+            with self.metrics.timer("ozon_importer_stage_seconds", stage="image_transcode"):
+                transcoded, resized = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    transcode_image,
+                    body,
+                    self.max_dimension,
+                    self.target_format,
+                    self.quality,
+                )
+        except Exception as error:  # noqa: BLE001
+            if logger:
+                logger.debug(
+                    "%s keeps %s image of %d bytes, can't transcode it: %r",
+                    self,
+                    source_format,
+                    len(body),
+                    error,
+                )
+
+            return body
+
+        if not resized and len(transcoded) >= len(body):
+            return body
+
+        saved_bytes: int = len(body) - len(transcoded)
+
+        if saved_bytes > 0:
+            self.bytes_saved += saved_bytes
+            self.metrics.increment("ozon_importer_image_transcode_saved_bytes_total", saved_bytes)
+
+        if logger:
+            logger.debug(
+                "%s transcodes %s image of %d bytes to %s of %d bytes, saves %d bytes",
+                self,
+                source_format,
+                len(body),
+                self.target_format,
+                len(transcoded),
+                saved_bytes,
+            )
+
+        return transcoded
+
+
+def transcode_image(body: bytes, max_dimension: int, target_format: str, quality: int) -> tuple[bytes, bool]:
+    """Downscale and re-encode image, runs in a worker process.
+
+    Returns:
+        encoded image, whether it was downscaled.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(body)) as opened:
+        opened.draft("RGB", (max_dimension, max_dimension))
+        image: PillowImage = ImageOps.exif_transpose(opened) or opened
+        resized: bool = max(image.size) > max_dimension
+
+        if resized:
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        if target_format == "JPEG" and image.mode not in {"RGB", "L"}:
+            image = _flatten(image)
+
+        output: io.BytesIO = io.BytesIO()
+        image.save(output, format=target_format, quality=quality, optimize=True)
+
+    return output.getvalue(), resized
+
+
+def _flatten(image: "PillowImage") -> "PillowImage":
+    """Put image with transparency on white background, formats like JPEG have no alpha channel."""
+    from PIL import Image
+
+    rgba: PillowImage = image.convert("RGBA")
+    background: PillowImage = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+
+    return Image.alpha_composite(background, rgba).convert("RGB")
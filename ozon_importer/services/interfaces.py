@@ -1,6 +1,9 @@
+from collections.abc import AsyncIterator, Mapping, Sequence
 from typing import Protocol, TypedDict
 
-from ozon_importer.interfaces import ILogger
+from ozon_importer.interfaces import IByteBudget, ILogger
+from ozon_importer.services.types import ImportCheckpoint, ProductSnapshot
+from ozon_importer.types import Product
 
 
 class IProductCharacteristic(TypedDict):
@@ -61,6 +64,18 @@ class IClient(Protocol):
         logger: ILogger | None = None,
     ) -> tuple[int, bool]: ...
 
+    async def send_characteristics_bulk(
+        self,
+        characteristics: Sequence[ICharacteristic],
+        logger: ILogger | None = None,
+    ) -> list[tuple[int, bool]]: ...
+
+    async def send_characteristic_values_bulk(
+        self,
+        characteristic_values: Sequence[ICharacteristicValue],
+        logger: ILogger | None = None,
+    ) -> list[tuple[int, bool]]: ...
+
     async def send_brand(self, brand: IBrand, logger: ILogger | None = None) -> tuple[int, bool]: ...
 
     async def send_category(self, brand: ICategory, logger: ILogger | None = None) -> tuple[int, bool]: ...
@@ -68,5 +83,42 @@ class IClient(Protocol):
     async def send_image(self, image: IImage, logger: ILogger | None = None) -> tuple[int, bool]: ...
 
 
+class IEntityLister(Protocol):
+    def iter_entities(
+        self,
+        entity_type: str,
+        marketplace_id: int,
+        logger: ILogger | None = None,
+    ) -> AsyncIterator[list[dict]]: ...
+
+    async def remember_entities(self, entity_type: str, entities: Sequence[dict], marketplace_id: int) -> None: ...
+
+
 class IImageFetcher(Protocol):
-    async def fetch(self, url: str, logger: ILogger | None = None) -> bytes: ...
+    async def fetch(self, url: str, logger: ILogger | None = None, budget: IByteBudget | None = None) -> bytes: ...
+
+
+class IImageTranscoder(Protocol):
+    async def transcode(self, body: bytes, logger: ILogger | None = None) -> bytes: ...
+
+
+class IImageSender(Protocol):
+    async def send(self, product_id: int, urls: Sequence[str], logger: ILogger | None = None) -> None: ...
+
+
+class IBatchProductSender(Protocol):
+    async def send_many(self, products: Sequence[Product], logger: ILogger | None = None) -> list[Exception | None]: ...
+
+
+class IProductSnapshotStore(Protocol):
+    async def get_many(self, marketplace_id: int, skus: Sequence[str]) -> dict[str, ProductSnapshot]: ...
+
+    async def set_many(self, marketplace_id: int, snapshots: Mapping[str, ProductSnapshot]) -> None: ...
+
+
+class IImportCheckpointStore(Protocol):
+    async def get_many(self, marketplace_id: int, skus: Sequence[str]) -> dict[str, ImportCheckpoint]: ...
+
+    async def set_many(self, marketplace_id: int, checkpoints: Mapping[str, ImportCheckpoint]) -> None: ...
+
+    async def delete_many(self, marketplace_id: int, skus: Sequence[str]) -> None: ...
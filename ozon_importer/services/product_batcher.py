@@ -0,0 +1,83 @@
+import asyncio
+from typing import Final
+
+from ozon_importer.interfaces import ILogger
+from ozon_importer.sampled_logger import LoggerGroup
+from ozon_importer.services.interfaces import IBatchProductSender
+from ozon_importer.types import Product
+
+
+class ProductBatcher:
+    """Collects concurrently sent products into micro-batches.
+
+    A batch is flushed when ``max_size`` products are collected or ``max_delay`` seconds passed since the
+    first one, whichever comes first. At most ``max_in_flight`` batches are sent at once, products collected
+    meanwhile make the next batches. Every ``send`` call waits for its own product only and raises its own
+    error, so messages are still acknowledged one by one. Records of a batch go to the loggers of all its products.
+    """
+
+    def __init__(
+        self,
+        product_sender: IBatchProductSender,
+        max_size: int,
+        max_delay: float,
+        max_in_flight: int = 1,
+    ) -> None:
+        self.product_sender: Final[IBatchProductSender] = product_sender
+        self.max_size: Final[int] = max_size
+        self.max_delay: Final[float] = max_delay
+        self._in_flight: Final[asyncio.Semaphore] = asyncio.Semaphore(max_in_flight)
+        self._pending: list[tuple[Product, ILogger | None, asyncio.Future[None]]] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def send(self, product: Product, logger: ILogger | None = None) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        self._pending.append((product, logger, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_delay, self._flush)
+
+        await future
+
+    def _flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch, self._pending = self._pending, []
+
+        task: asyncio.Task = asyncio.create_task(self._send_batch(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _send_batch(self, batch: list[tuple[Product, ILogger | None, asyncio.Future[None]]]) -> None:
+        loggers: list[ILogger] = [logger for _, logger, _ in batch if logger is not None]
+        logger: ILogger | None = LoggerGroup(loggers) if loggers else None
+
+        try:
+            async with self._in_flight:
+                if logger:
+                    logger.debug("%s sends batch of %d products", self, len(batch))
+
+                errors: list[Exception | None] = await self.product_sender.send_many(
+                    [product for product, _, _ in batch],
+                    logger,
+                )
+        except Exception as error:  # noqa: BLE001
+            errors = [error] * len(batch)
+
+        for (_, _, future), error in zip(batch, errors, strict=True):
+            if future.done():
+                continue
+
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
@@ -1,26 +1,186 @@
 import asyncio
+import hashlib
+import json
+from collections import defaultdict
+from collections.abc import Awaitable, Sequence
+from typing import NamedTuple
 
-from ozon_importer.exceptions import ProductTypeNotFoundError
-from ozon_importer.interfaces import ILogger
+from ozon_importer.exceptions import ProductTypeNotFoundError, StaleProductEntitiesError
+from ozon_importer.interfaces import ILogger, IMetrics
+from ozon_importer.metrics.registry import NULL_METRICS
 from ozon_importer.services.interfaces import (
+    IBrand,
+    ICategory,
+    ICharacteristic,
+    ICharacteristicValue,
     IClient,
-    IImageFetcher,
+    IImageSender,
+    IImportCheckpointStore,
+    IProductSnapshotStore,
 )
-from ozon_importer.services.types import Characteristic, Product
+from ozon_importer.services.types import ImportCheckpoint, ProductSnapshot
+from ozon_importer.types import Characteristic, Product
+
+
+class ProductUpdate(NamedTuple):
+    product: Product
+    product_type_name: str
+    fingerprint: str
+    previous: ProductSnapshot | None
+    checkpoint: ImportCheckpoint | None = None
+
+    @property
+    def resumed(self) -> bool:
+        return self.checkpoint is not None and self.checkpoint.fingerprint == self.fingerprint
+
+
+class EntityBatch(NamedTuple):
+    """Entities of products to send, without duplicates."""
+
+    categories: list[ICategory]
+    brands: list[IBrand]
+    characteristics: list[ICharacteristic]
+    characteristic_values: list[ICharacteristicValue]
 
 
 class ProductImporter:
-    def __init__(
+    """Sends products with their categories, brands, characteristics and images to Markets Bridge.
+
+    With a snapshot store the import is incremental: a product with the same fingerprint as last time is
+    skipped, a changed one sends only entities and images it didn't send before.
+
+    With a checkpoint store the import is resumable: progress of every product is checkpointed until its
+    snapshot is saved, so a redelivered message with the same content continues from the failed step and
+    sends images which were not sent yet.
+    """
+
+    def __init__(  # noqa: PLR0913
         self,
         client: IClient,
-        image_fetcher: IImageFetcher,
+        image_sender: IImageSender,
         marketplace_id: int,
+        concurrency: int = 1,
+        *,
+        bulk: bool = False,
+        snapshot_store: IProductSnapshotStore | None = None,
+        checkpoint_store: IImportCheckpointStore | None = None,
+        metrics: IMetrics = NULL_METRICS,
     ) -> None:
         self.client: IClient = client
-        self.image_fetcher: IImageFetcher = image_fetcher
+        self.image_sender: IImageSender = image_sender
         self.marketplace_id: int = marketplace_id
+        self.concurrency: int = concurrency
+        self.bulk: bool = bulk
+        self.snapshot_store: IProductSnapshotStore | None = snapshot_store
+        self.checkpoint_store: IImportCheckpointStore | None = checkpoint_store
+        self.metrics: IMetrics = metrics
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
 
     async def send(self, product: Product, logger: ILogger | None = None) -> None:
+        with self.metrics.timer("ozon_importer_stage_seconds", stage="product_import"):
+            try:
+                with self.metrics.timer("ozon_importer_stage_seconds", stage="product_prepare"):
+                    product_type_name: str = self._pop_product_type(product)
+                    update: ProductUpdate | None = (
+                        await self._prepare_updates([(product, product_type_name)], logger)
+                    )[0]
+
+                if update is None:
+                    return
+
+                with self.metrics.timer("ozon_importer_stage_seconds", stage="product_entities"):
+                    await self._send_entities([update], logger)
+
+                with self.metrics.timer("ozon_importer_stage_seconds", stage="product_send"):
+                    snapshot: ProductSnapshot = await self._send_product(update, logger)
+
+                with self.metrics.timer("ozon_importer_stage_seconds", stage="product_finish"):
+                    await self._finish([snapshot])
+            except Exception:
+                self.metrics.increment("ozon_importer_products_total", outcome="failed")
+                raise
+
+        self.metrics.increment("ozon_importer_products_total", outcome="sent")
+
+    async def send_many(self, products: Sequence[Product], logger: ILogger | None = None) -> list[Exception | None]:
+        """Send products upserting their shared entities once.
+
+        If the shared upsert fails, every product upserts its own entities, so only products
+        with broken entities fail. Of several products with one SKU only the last is sent,
+        the earlier ones share its outcome.
+
+        Returns:
+            exception raised while sending every product or None if it was sent.
+        """
+        with self.metrics.timer("ozon_importer_stage_seconds", stage="product_batch"):
+            results: list[Exception | None] = await self._send_many(products, logger)
+
+        self.metrics.increment(
+            "ozon_importer_products_total",
+            sum(result is not None for result in results),
+            outcome="failed",
+        )
+
+        return results
+
+    async def _send_many(self, products: Sequence[Product], logger: ILogger | None = None) -> list[Exception | None]:
+        results: list[Exception | None] = [None] * len(products)
+        latest: dict[str, int] = {product.sku: index for index, product in enumerate(products)}
+        prepared: dict[int, tuple[Product, str]] = {}
+
+        for index, product in enumerate(products):
+            if latest[product.sku] != index:
+                continue
+
+            try:
+                prepared[index] = (product, self._pop_product_type(product))
+            except ProductTypeNotFoundError as error:
+                results[index] = error
+
+        with self.metrics.timer("ozon_importer_stage_seconds", stage="product_prepare"):
+            prepared_updates: list[ProductUpdate | None] = await self._prepare_updates(
+                list(prepared.values()),
+                logger,
+            )
+
+        updates: dict[int, ProductUpdate] = {
+            index: update for index, update in zip(prepared, prepared_updates, strict=True) if update is not None
+        }
+
+        try:
+            with self.metrics.timer("ozon_importer_stage_seconds", stage="product_entities"):
+                await self._send_entities(list(updates.values()), logger)
+        except Exception:  # noqa: BLE001
+            entities_sent: bool = False
+        else:
+            entities_sent = True
+
+        with self.metrics.timer("ozon_importer_stage_seconds", stage="product_send"):
+            outcomes: list[ProductSnapshot | BaseException] = await asyncio.gather(
+                *[self._send_prepared(update, logger, entities_sent=entities_sent) for update in updates.values()],
+                return_exceptions=True,
+            )
+        snapshots: list[ProductSnapshot] = []
+
+        for index, outcome in zip(updates, outcomes, strict=True):
+            if isinstance(outcome, ProductSnapshot):
+                snapshots.append(outcome)
+            elif isinstance(outcome, Exception):
+                results[index] = outcome
+            else:
+                raise outcome
+
+        with self.metrics.timer("ozon_importer_stage_seconds", stage="product_finish"):
+            await self._finish(snapshots)
+
+        self.metrics.increment("ozon_importer_products_total", len(snapshots), outcome="sent")
+
+        return [results[latest[product.sku]] for product in products]
+
+    @staticmethod
+    def _pop_product_type(product: Product) -> str:
         product_type_characteristic: Characteristic
 
         for characteristic in product.characteristics:
@@ -31,54 +191,349 @@ class ProductImporter:
         else:
             raise ProductTypeNotFoundError(product.name)
 
-        await self.client.send_category(
-            {"name": product_type_characteristic.value, "marketplace_id": self.marketplace_id},
-            logger,
+        return product_type_characteristic.value
+
+    async def _prepare_updates(
+        self,
+        products: Sequence[tuple[Product, str]],
+        logger: ILogger | None = None,
+    ) -> list[ProductUpdate | None]:
+        """Compare products with their last sent snapshots.
+
+        Changed products get checkpoints of their interrupted imports.
+
+        Returns:
+            update for every changed product, None for unchanged ones.
+        """
+        skus: list[str] = list({product.sku: None for product, _ in products})
+        previous: dict[str, ProductSnapshot] = {}
+        checkpoints: dict[str, ImportCheckpoint] = {}
+
+        if self.snapshot_store is not None and skus:
+            previous = await self.snapshot_store.get_many(self.marketplace_id, skus)
+
+        if self.checkpoint_store is not None and skus:
+            checkpoints = await self.checkpoint_store.get_many(self.marketplace_id, skus)
+
+        updates: list[ProductUpdate | None] = []
+
+        for product, product_type_name in products:
+            fingerprint: str = self._get_fingerprint(product, product_type_name)
+            snapshot: ProductSnapshot | None = previous.get(product.sku)
+
+            if snapshot is not None and snapshot.fingerprint == fingerprint:
+                self.metrics.increment("ozon_importer_products_total", outcome="skipped")
+
+                if logger:
+                    logger.debug("%s skips unchanged '%s', sku=%s", self, product.name, product.sku)
+
+                updates.append(None)
+                continue
+
+            update: ProductUpdate = ProductUpdate(
+                product,
+                product_type_name,
+                fingerprint,
+                snapshot,
+                checkpoints.get(product.sku),
+            )
+
+            if update.checkpoint is not None and update.resumed:
+                step: str = "entities" if update.checkpoint.product_id is None else "images"
+                self.metrics.increment("ozon_importer_resumed_products_total", step=step)
+
+                if logger:
+                    logger.debug("%s resumes '%s', sku=%s, after %s", self, product.name, product.sku, step)
+
+            updates.append(update)
+
+        return updates
+
+    @staticmethod
+    def _get_fingerprint(product: Product, product_type_name: str) -> str:
+        content: str = json.dumps(
+            [
+                product.name,
+                product.brand,
+                product.description,
+                product.url,
+                product_type_name,
+                sorted([characteristic.name, characteristic.value] for characteristic in product.characteristics),
+                list(product.images),
+            ],
+            ensure_ascii=False,
+            separators=(",", ":"),
         )
-        await self.client.send_brand({"name": product.brand, "marketplace_id": self.marketplace_id}, logger)
 
-        sended_characteristic_names: set[str] = set()
+        return hashlib.sha256(content.encode()).hexdigest()
 
-        for characteristic in product.characteristics:
-            if characteristic.name not in sended_characteristic_names:
-                await self.client.send_characteristic(
-                    {
-                        "name": characteristic.name,
-                        "product_type_name": product_type_characteristic.value,
-                        "marketplace_id": self.marketplace_id,
-                    },
-                    logger,
-                )
+    async def _finish(self, snapshots: Sequence[ProductSnapshot]) -> None:
+        """Save snapshots of sent products and drop their checkpoints."""
+        if not snapshots:
+            return
+
+        if self.snapshot_store is not None:
+            await self.snapshot_store.set_many(
+                self.marketplace_id,
+                {snapshot.sku: snapshot for snapshot in snapshots},
+            )
+
+        if self.checkpoint_store is not None:
+            await self.checkpoint_store.delete_many(self.marketplace_id, [snapshot.sku for snapshot in snapshots])
+
+    async def _save_checkpoints(self, checkpoints: Sequence[ImportCheckpoint]) -> None:
+        if self.checkpoint_store is not None and checkpoints:
+            await self.checkpoint_store.set_many(
+                self.marketplace_id,
+                {checkpoint.sku: checkpoint for checkpoint in checkpoints},
+            )
+
+    async def _send_prepared(
+        self,
+        update: ProductUpdate,
+        logger: ILogger | None = None,
+        *,
+        entities_sent: bool,
+    ) -> ProductSnapshot:
+        if not entities_sent:
+            await self._send_entities([update], logger)
+
+        return await self._send_product(update, logger)
+
+    async def _send_product(self, update: ProductUpdate, logger: ILogger | None = None) -> ProductSnapshot:
+        """Send product and its images not sent before.
+
+        A product resumed after it was sent sends only its pending images.
+
+        Returns:
+            snapshot of sent product.
+        """
+        product: Product = update.product
+
+        if update.checkpoint is not None and update.resumed and update.checkpoint.product_id is not None:
+            product_id: int = update.checkpoint.product_id
+            pending_urls: list[str] = update.checkpoint.pending_images
+        else:
+            product_id, pending_urls = await self._send_product_data(update, logger)
+
+        if pending_urls:
+            await self.image_sender.send(product_id, pending_urls, logger)
+
+        return ProductSnapshot(
+            sku=product.sku,
+            product_id=product_id,
+            fingerprint=update.fingerprint,
+            brand=product.brand,
+            product_type_name=update.product_type_name,
+            characteristics=list(product.characteristics),
+            images=list(product.images),
+        )
+
+    async def _send_product_data(self, update: ProductUpdate, logger: ILogger | None = None) -> tuple[int, list[str]]:
+        """Send product without images and checkpoint its images to send.
 
-                sended_characteristic_names.add(characteristic.name)
+        Images still pending from an interrupted import of other content are sent too if the product has them.
+        If Markets Bridge lost entities of the product its checkpoint is dropped, so the redelivered message
+        sends them again instead of resuming.
 
-            await self.client.send_characteristic_value(
+        Returns:
+            product id and urls of images to send.
+        """
+        product: Product = update.product
+
+        try:
+            product_id, is_new = await self.client.send_product(
                 {
-                    "value": characteristic.value,
-                    "characteristic_name": characteristic.name,
+                    "brand_name": product.brand,
+                    "characteristics": [{"name": ch.name, "value": ch.value} for ch in product.characteristics],
+                    "description": product.description,
+                    "external_id": int(product.sku),
                     "marketplace_id": self.marketplace_id,
+                    "name": product.name,
+                    "url": product.url,
+                    "category_name": update.product_type_name,
                 },
                 logger,
             )
+        except StaleProductEntitiesError:
+            if self.checkpoint_store is not None:
+                await self.checkpoint_store.delete_many(self.marketplace_id, [product.sku])
+            raise
 
-        product_id, is_new = await self.client.send_product(
-            {
-                "brand_name": product.brand,
-                "characteristics": [{"name": ch.name, "value": ch.value} for ch in product.characteristics],
-                "description": product.description,
-                "external_id": int(product.sku),
-                "marketplace_id": self.marketplace_id,
-                "name": product.name,
-                "url": product.url.unicode_string(),
-                "category_name": product_type_characteristic.value,
-            },
-            logger,
-        )
+        pending_urls: list[str] = []
 
         if is_new:
-            images: list[bytes] = await asyncio.gather(
-                *[self.image_fetcher.fetch(url.unicode_string(), logger) for url in product.images],
+            pending_urls = list(product.images)
+        elif update.previous is not None:
+            sent_urls: set[str] = set(update.previous.images)
+            pending_urls = [url for url in product.images if url not in sent_urls]
+
+        if update.checkpoint is not None and not is_new:
+            unsent_urls: set[str] = set(update.checkpoint.pending_images).difference(pending_urls)
+            pending_urls.extend(url for url in product.images if url in unsent_urls)
+
+        if pending_urls:
+            await self._save_checkpoints(
+                [
+                    ImportCheckpoint(
+                        sku=product.sku,
+                        fingerprint=update.fingerprint,
+                        product_id=product_id,
+                        pending_images=pending_urls,
+                    ),
+                ],
             )
 
-            for image in images:
-                await self.client.send_image({"body": image, "product_id": product_id}, logger)
+        return product_id, pending_urls
+
+    async def _send_entities(self, updates: Sequence[ProductUpdate], logger: ILogger | None = None) -> None:
+        """Send categories, brands, characteristics and characteristic values of products without duplicates.
+
+        Entities already sent with the previous snapshot of a product are skipped, so are all entities of
+        resumed products. Products get checkpoints once their entities are sent.
+        """
+        updates = [update for update in updates if not update.resumed]
+        categories: dict[str, ICategory] = {}
+        brands: dict[str, IBrand] = {}
+        characteristics: dict[tuple[str, str], ICharacteristic] = {}
+        characteristic_values: dict[tuple[str, str], ICharacteristicValue] = {}
+
+        for product, product_type_name, _, previous, _ in updates:
+            same_type: bool = previous is not None and previous.product_type_name == product_type_name
+            sent_names: set[str] = set()
+            sent_pairs: set[tuple[str, str]] = set()
+
+            if previous is not None and same_type:
+                sent_names = {characteristic.name for characteristic in previous.characteristics}
+                sent_pairs = {
+                    (characteristic.name, characteristic.value) for characteristic in previous.characteristics
+                }
+
+            if not same_type:
+                categories.setdefault(
+                    product_type_name,
+                    {"name": product_type_name, "marketplace_id": self.marketplace_id},
+                )
+
+            if previous is None or previous.brand != product.brand:
+                brands.setdefault(product.brand, {"name": product.brand, "marketplace_id": self.marketplace_id})
+
+            for characteristic in product.characteristics:
+                if (characteristic.name, characteristic.value) in sent_pairs:
+                    continue
+
+                if characteristic.name not in sent_names:
+                    characteristics.setdefault(
+                        (characteristic.name, product_type_name),
+                        {
+                            "name": characteristic.name,
+                            "product_type_name": product_type_name,
+                            "marketplace_id": self.marketplace_id,
+                        },
+                    )
+
+                characteristic_values.setdefault(
+                    (characteristic.value, characteristic.name),
+                    {
+                        "value": characteristic.value,
+                        "characteristic_name": characteristic.name,
+                        "marketplace_id": self.marketplace_id,
+                    },
+                )
+
+        entities: EntityBatch = EntityBatch(
+            list(categories.values()),
+            list(brands.values()),
+            list(characteristics.values()),
+            list(characteristic_values.values()),
+        )
+
+        if self.bulk:
+            await self._send_entities_in_bulk(entities, logger)
+        else:
+            await self._send_entities_concurrently(entities, logger)
+
+        await self._save_checkpoints(
+            [ImportCheckpoint(sku=update.product.sku, fingerprint=update.fingerprint) for update in updates],
+        )
+
+    async def _send_entities_in_bulk(self, entities: EntityBatch, logger: ILogger | None = None) -> None:
+        await asyncio.gather(
+            *[self.client.send_category(category, logger) for category in entities.categories],
+            *[self.client.send_brand(brand, logger) for brand in entities.brands],
+        )
+
+        if entities.characteristics:
+            await self.client.send_characteristics_bulk(entities.characteristics, logger)
+
+        if entities.characteristic_values:
+            await self.client.send_characteristic_values_bulk(entities.characteristic_values, logger)
+
+    async def _send_entities_concurrently(self, entities: EntityBatch, logger: ILogger | None = None) -> None:
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with asyncio.TaskGroup() as task_group:
+            category_tasks: dict[str, asyncio.Task[tuple[int, bool]]] = {
+                category["name"]: task_group.create_task(
+                    self._send_limited(semaphore, self.client.send_category(category, logger)),
+                )
+                for category in entities.categories
+            }
+
+            for brand in entities.brands:
+                task_group.create_task(self._send_limited(semaphore, self.client.send_brand(brand, logger)))
+
+            characteristic_tasks: defaultdict[str, list[asyncio.Task[tuple[int, bool]]]] = defaultdict(list)
+
+            for characteristic in entities.characteristics:
+                characteristic_tasks[characteristic["name"]].append(
+                    task_group.create_task(
+                        self._send_characteristic(
+                            semaphore,
+                            category_tasks.get(characteristic["product_type_name"]),
+                            characteristic,
+                            logger,
+                        ),
+                    ),
+                )
+
+            for characteristic_value in entities.characteristic_values:
+                task_group.create_task(
+                    self._send_characteristic_value(
+                        semaphore,
+                        characteristic_tasks[characteristic_value["characteristic_name"]],
+                        characteristic_value,
+                        logger,
+                    ),
+                )
+
+    async def _send_characteristic(
+        self,
+        semaphore: asyncio.Semaphore,
+        category_task: Awaitable[tuple[int, bool]] | None,
+        characteristic: ICharacteristic,
+        logger: ILogger | None = None,
+    ) -> tuple[int, bool]:
+        if category_task is not None:
+            await category_task
+
+        return await self._send_limited(semaphore, self.client.send_characteristic(characteristic, logger))
+
+    async def _send_characteristic_value(
+        self,
+        semaphore: asyncio.Semaphore,
+        characteristic_tasks: Sequence[Awaitable[tuple[int, bool]]],
+        characteristic_value: ICharacteristicValue,
+        logger: ILogger | None = None,
+    ) -> tuple[int, bool]:
+        await asyncio.gather(*characteristic_tasks)
+
+        return await self._send_limited(
+            semaphore,
+            self.client.send_characteristic_value(characteristic_value, logger),
+        )
+
+    @staticmethod
+    async def _send_limited(semaphore: asyncio.Semaphore, request: Awaitable[tuple[int, bool]]) -> tuple[int, bool]:
+        async with semaphore:
+            return await request
@@ -1,16 +1,29 @@
-from pydantic import AnyHttpUrl, BaseModel
+from pydantic import BaseModel
 
+from ozon_importer.types import Characteristic
 
-class Characteristic(BaseModel):
-    name: str
-    value: str
 
+class ProductSnapshot(BaseModel):
+    """What was sent to Markets Bridge for a product last time."""
 
-class Product(BaseModel):
     sku: str
-    name: str
+    product_id: int
+    fingerprint: str
     brand: str
-    description: str
+    product_type_name: str
     characteristics: list[Characteristic]
-    images: list[AnyHttpUrl]
-    url: AnyHttpUrl
+    images: list[str]
+
+
+class ImportCheckpoint(BaseModel):
+    """Progress of a product import interrupted before its snapshot was saved.
+
+    A checkpoint belongs to the product content with ``fingerprint``, every checkpoint means its entities
+    were sent. ``product_id`` is set once the product itself was sent, ``pending_images`` are its images
+    which are not known to be sent yet.
+    """
+
+    sku: str
+    fingerprint: str
+    product_id: int | None = None
+    pending_images: list[str] = []
@@ -0,0 +1,34 @@
+"""Route parsed products to shard queues of workers, started by the supervisor.
+
+Usage: ``faststream run ozon_importer.shard_router:app``.
+"""
+
+from faststream import FastStream
+from faststream.rabbit import RabbitBroker
+
+from ozon_importer.config import Settings
+from ozon_importer.handlers.decoders import ModelDecoder, parse_with_stable_message_id
+from ozon_importer.handlers.shard_routing import ShardRouter
+from ozon_importer.handlers.types import ShardKey
+from ozon_importer.queues import get_dead_letter_queue, make_queue
+
+
+settings: Settings = Settings()  # type: ignore[call-arg]
+broker: RabbitBroker = RabbitBroker(settings.amqp_dsn_str, max_consumers=settings.parsed_loading_max_consumers)
+broker.subscriber(
+    make_queue(settings.parsed_loading_queue, get_dead_letter_queue(settings.parsed_loading_queue)),
+    parser=parse_with_stable_message_id,
+    decoder=ModelDecoder(ShardKey),
+    retry=settings.parsed_loading_max_attempts,
+)(ShardRouter(broker, settings.parsed_loading_shard_queues))
+app = FastStream(broker)
+
+
+@app.on_startup
+async def declare_queues() -> None:
+    """Declare shard queues and the dead letter queue of the router before it consumes."""
+    await broker.connect()
+    await broker.declare_queue(make_queue(get_dead_letter_queue(settings.parsed_loading_queue)))
+
+    for queue in settings.parsed_loading_shard_queues:
+        await broker.declare_queue(make_queue(queue, get_dead_letter_queue(queue)))
@@ -0,0 +1,6 @@
+import zlib
+
+
+def get_shard(sku: str, shards: int) -> int:
+    """Shard of a SKU, the same in every process unlike ``hash``."""
+    return zlib.crc32(sku.encode()) % shards
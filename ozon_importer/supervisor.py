@@ -0,0 +1,159 @@
+"""Run the importer in several worker processes on one host.
+
+Every worker is a separate FastStream app with its own container, it consumes its shard of parsed products
+and shares image tasks with other workers. With more than one worker a shard router republishes
+parsed products to shards by SKU. Arguments are passed to ``faststream run`` of every process.
+
+Usage: ``python -m ozon_importer.supervisor --log-level info``.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+from collections.abc import Awaitable, Mapping, Sequence
+from typing import Final
+
+from ozon_importer.config import Settings
+
+
+class Supervisor:
+    """Starts worker processes, restarts crashed ones and stops them one by one.
+
+    On SIGTERM or SIGINT the shard router is stopped first, then every worker gets SIGTERM and
+    ``shutdown_timeout`` seconds to finish its messages and close its container before it is killed.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        run_options: Sequence[str] = (),
+        shutdown_timeout: float = 60.0,
+        restart_delay: float = 5.0,
+    ) -> None:
+        self.workers: Final[int] = workers
+        self.run_options: Final[Sequence[str]] = run_options
+        self.shutdown_timeout: Final[float] = shutdown_timeout
+        self.restart_delay: Final[float] = restart_delay
+        self._processes: dict[str, asyncio.subprocess.Process] = {}
+        self._stopping: asyncio.Event = asyncio.Event()
+
+    def __str__(self) -> str:
+        return f"[{self.__class__.__name__}]"
+
+    async def run(self, logger: logging.Logger) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        for shutdown_signal in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(shutdown_signal, self._stopping.set)
+
+        names: list[str] = [f"worker-{index}" for index in range(self.workers)]
+        environments: list[Mapping[str, str]] = [
+            {"WORKERS": str(self.workers), "WORKER_INDEX": str(index)} for index in range(self.workers)
+        ]
+        apps: list[str] = ["ozon_importer.main:app"] * self.workers
+
+        if self.workers > 1:
+            names.insert(0, "shard-router")
+            environments.insert(0, {"WORKERS": str(self.workers)})
+            apps.insert(0, "ozon_importer.shard_router:app")
+
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for name, app, environment in zip(names, apps, environments, strict=True):
+                    task_group.create_task(self._supervise(name, app, environment, logger))
+        finally:
+            for name in names:
+                await self._stop(name, logger)
+
+    async def _supervise(
+        self,
+        name: str,
+        app: str,
+        environment: Mapping[str, str],
+        logger: logging.Logger,
+    ) -> None:
+        """Keep a process running until shutdown.
+
+        The process runs in its own session, so terminal signals reach it only through the supervisor.
+        """
+        while not self._stopping.is_set():
+            process: asyncio.subprocess.Process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "faststream",
+                "run",
+                app,
+                *self.run_options,
+                env={**os.environ, **environment},
+                start_new_session=True,
+            )
+            self._processes[name] = process
+
+            logger.info("%s started %s, pid=%d", self, name, process.pid)
+
+            if await self._wait_for_stopping(process.wait()):
+                return
+
+            logger.warning(
+                "%s %s exited with code %s, restarts in %ss",
+                self,
+                name,
+                process.returncode,
+                self.restart_delay,
+            )
+
+            await self._wait_for_stopping(asyncio.sleep(self.restart_delay))
+
+    async def _wait_for_stopping(self, awaitable: Awaitable) -> bool:
+        """Wait for an awaitable or shutdown.
+
+        Returns:
+            whether shutdown came first.
+        """
+        waiting: asyncio.Future = asyncio.ensure_future(awaitable)
+        stopping: asyncio.Task = asyncio.create_task(self._stopping.wait())
+        await asyncio.wait((waiting, stopping), return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+
+        if waiting.done():
+            return False
+
+        waiting.cancel()
+
+        return True
+
+    async def _stop(self, name: str, logger: logging.Logger) -> None:
+        process: asyncio.subprocess.Process | None = self._processes.get(name)
+
+        if process is None or process.returncode is not None:
+            return
+
+        logger.info("%s stops %s, pid=%d", self, name, process.pid)
+
+        process.terminate()
+
+        try:
+            await asyncio.wait_for(process.wait(), self.shutdown_timeout)
+        except TimeoutError:
+            logger.warning("%s kills %s, it didn't stop in %ss", self, name, self.shutdown_timeout)
+
+            process.kill()
+            await process.wait()
+
+
+async def supervise() -> None:
+    logging.basicConfig(level=logging.INFO)
+    settings: Settings = Settings()  # type: ignore[call-arg]
+    supervisor: Supervisor = Supervisor(
+        settings.workers,
+        sys.argv[1:],
+        shutdown_timeout=settings.worker_shutdown_timeout,
+        restart_delay=settings.worker_restart_delay,
+    )
+    await supervisor.run(logging.getLogger("ozon_importer.supervisor"))
+
+
+if __name__ == "__main__":
+    asyncio.run(supervise())
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import Annotated, Final
+from urllib.parse import SplitResult, urlsplit
+
+from pydantic import AfterValidator, BaseModel
+
+
+HTTP_SCHEMES: Final[frozenset[str]] = frozenset(("http", "https"))
+
+
+def check_http_url(url: str) -> str:
+    """Check that url is absolute with http or https scheme and a host, without building a url object."""
+    parts: SplitResult = urlsplit(url)
+
+    if parts.scheme not in HTTP_SCHEMES or not parts.hostname:
+        raise ValueError(f"'{url}' is not an absolute http or https url")
+
+    return url
+
+
+HttpUrlStr = Annotated[str, AfterValidator(check_http_url)]
+
+
+@dataclass(frozen=True, slots=True)
+class Characteristic:
+    name: str
+    value: str
+
+
+class Product(BaseModel):
+    """Parsed product, validated once straight from message bytes.
+
+    Urls are kept as strings, only their scheme and host are checked, so a message with a url nobody can
+    fetch is rejected on decoding.
+    """
+
+    sku: str
+    name: str
+    brand: str
+    description: str
+    characteristics: list[Characteristic]
+    images: list[HttpUrlStr]
+    url: HttpUrlStr
@@ -0,0 +1,25 @@
+"""Warm the entity id store up before the first import.
+
+Usage: ``python -m ozon_importer.warmup``.
+"""
+
+import asyncio
+import logging
+
+from ozon_importer.container import Container
+from ozon_importer.services.entity_warmer import EntityWarmer
+
+
+async def warm_up() -> None:
+    logging.basicConfig(level=logging.DEBUG)
+    await Container.aopen()
+
+    try:
+        entity_warmer: EntityWarmer = Container.entity_warmer()  # type: ignore[operator]
+        await entity_warmer.warm_up(logging.getLogger("ozon_importer.warmup"))
+    finally:
+        await Container.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(warm_up())
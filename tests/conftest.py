@@ -0,0 +1,60 @@
+from collections.abc import AsyncIterator, Sequence
+
+import pytest
+from httpx import AsyncClient, MockTransport
+
+from benchmarks.stand_in.markets_bridge import MarketsBridgeStandIn
+from ozon_importer.interfaces import ILogger
+from ozon_importer.repositories.entity_cache import EntityCache
+from ozon_importer.repositories.httpx_client import HttpxClient
+from ozon_importer.repositories.markets_bridge_client.client import MarketsBridgeClient
+from ozon_importer.types import Characteristic, Product
+
+
+MARKETS_BRIDGE_HOST = "http://markets-bridge.stand-in/"
+MARKETPLACE_ID = 1
+
+
+class RecordingImageSender:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, list[str]]] = []
+
+    async def send(self, product_id: int, urls: Sequence[str], logger: ILogger | None = None) -> None:  # noqa: ARG002
+        self.sent.append((product_id, list(urls)))
+
+
+def make_product(sku: str, **fields) -> Product:
+    return Product(
+        **{
+            "sku": sku,
+            "name": f"Product {sku}",
+            "brand": "Brand",
+            "description": "Description",
+            "characteristics": [Characteristic("Тип", "Кружка"), Characteristic("Цвет", "Белый")],
+            "images": [],
+            "url": f"https://www.ozon.ru/product/{sku}/",
+            **fields,
+        },
+    )
+
+
+@pytest.fixture()
+def markets_bridge() -> MarketsBridgeStandIn:
+    return MarketsBridgeStandIn()
+
+
+@pytest.fixture()
+async def client(markets_bridge: MarketsBridgeStandIn) -> AsyncIterator[MarketsBridgeClient]:
+    async with AsyncClient(transport=MockTransport(markets_bridge)) as session:
+        yield MarketsBridgeClient(
+            HttpxClient(session),
+            MARKETS_BRIDGE_HOST,
+            "login",
+            "password",
+            entity_cache=EntityCache(maxsize=1000, ttl=3600.0),
+        )
+
+
+@pytest.fixture()
+def image_sender() -> RecordingImageSender:
+    return RecordingImageSender()
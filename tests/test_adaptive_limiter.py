@@ -0,0 +1,59 @@
+import asyncio
+
+from ozon_importer.repositories.adaptive_limiter import AdaptiveLimiter, AdaptiveLimits
+
+
+async def test_requests_over_limit_wait_for_release() -> None:
+    limiter = AdaptiveLimiter(AdaptiveLimits(initial_limit=2, min_limit=1, max_limit=10, latency_target=1.0))
+    await limiter.acquire()
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    assert limiter.saturated
+    assert not waiter.done()
+
+    limiter.release(0.01, overloaded=False)
+    await waiter
+
+    assert limiter.in_flight == 2
+
+
+async def test_fast_successes_raise_limit_and_overload_halves_it() -> None:
+    limiter = AdaptiveLimiter(AdaptiveLimits(initial_limit=4, min_limit=1, max_limit=10, latency_target=1.0))
+
+    for _ in range(4):
+        await limiter.acquire()
+        limiter.release(0.01, overloaded=False)
+
+    assert 4.9 < limiter.limit < 5.0
+
+    await limiter.acquire()
+    limiter.release(0.01, overloaded=True)
+
+    assert limiter.limit < 2.5
+    assert limiter.decreases == 1
+
+
+async def test_burst_of_failures_decreases_limit_once() -> None:
+    limiter = AdaptiveLimiter(AdaptiveLimits(initial_limit=8, min_limit=1, max_limit=10, latency_target=1.0))
+
+    for _ in range(3):
+        await limiter.acquire()
+
+    for _ in range(3):
+        limiter.release(2.0, overloaded=False)
+
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+async def test_pause_holds_requests_back() -> None:
+    limiter = AdaptiveLimiter(AdaptiveLimits(initial_limit=4, min_limit=1, max_limit=10, latency_target=1.0))
+    limiter.pause(0.05)
+
+    assert limiter.saturated
+
+    await asyncio.wait_for(limiter.wait_until_available(), 1.0)
+
+    assert not limiter.saturated
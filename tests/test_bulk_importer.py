@@ -0,0 +1,43 @@
+import gzip
+import json
+from collections.abc import Sequence
+
+from ozon_importer.services.bulk_importer import READ_CHUNK_LINES, BulkImporter
+from ozon_importer.types import Product
+from tests.conftest import make_product
+
+
+class RecordingBatchSender:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def send_many(self, products: Sequence[Product], logger=None) -> list[Exception | None]:  # noqa: ARG002
+        self.sent.extend(product.sku for product in products)
+
+        return [None] * len(products)
+
+
+async def test_gzip_dump_is_imported_by_chunks(tmp_path) -> None:
+    skus = [str(sku) for sku in range(READ_CHUNK_LINES + 10)]
+    dump_path = tmp_path / "products.jsonl.gz"
+    dump_path.write_bytes(gzip.compress(b"".join(make_product(sku).model_dump_json().encode() + b"\n" for sku in skus)))
+    sender = RecordingBatchSender()
+    importer = BulkImporter(sender, concurrency=4, batch_size=10)
+
+    await importer.run(dump_path, tmp_path / "results.jsonl")
+
+    assert sorted(sender.sent) == sorted(skus)
+    assert importer.lines == len(skus)
+    assert importer.progress == 1.0
+
+
+async def test_resumed_import_skips_sent_lines(tmp_path) -> None:
+    dump_path = tmp_path / "products.jsonl"
+    dump_path.write_text("\n".join(make_product(sku).model_dump_json() for sku in "abc") + "\n", encoding="utf-8")
+    results_path = tmp_path / "results.jsonl"
+    results_path.write_text(json.dumps({"line": 2, "sku": "b", "status": "sent"}) + "\n", encoding="utf-8")
+    sender = RecordingBatchSender()
+
+    await BulkImporter(sender, concurrency=1).run(dump_path, results_path)
+
+    assert sender.sent == ["a", "c"]
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from ozon_importer.handlers.decoders import ModelDecoder, parse_with_stable_message_id
+from ozon_importer.types import Product
+from tests.conftest import make_product
+
+
+async def parse(message) -> SimpleNamespace:
+    return SimpleNamespace(message_id=message.message_id or "random")
+
+
+async def test_message_without_id_gets_id_of_its_body() -> None:
+    first = await parse_with_stable_message_id(SimpleNamespace(message_id=None, body=b'{"sku": "1"}'), parse)
+    second = await parse_with_stable_message_id(SimpleNamespace(message_id=None, body=b'{"sku": "1"}'), parse)
+    identified = await parse_with_stable_message_id(SimpleNamespace(message_id="id", body=b'{"sku": "1"}'), parse)
+
+    assert first.message_id == second.message_id != "random"
+    assert identified.message_id == "id"
+
+
+def encode(**fields) -> SimpleNamespace:
+    return SimpleNamespace(body=make_product("1", **fields).model_dump_json().encode())
+
+
+def test_model_decoder_validates_body() -> None:
+    product = ModelDecoder(Product)(encode(images=["https://cdn.stand-in/1.jpg"]), None)
+
+    assert product == make_product("1", images=["https://cdn.stand-in/1.jpg"])
+
+
+@pytest.mark.parametrize("url", ["", "/1.jpg", "ftp://cdn.stand-in/1.jpg", "https:///1.jpg"])
+def test_model_decoder_rejects_urls_nobody_can_fetch(url) -> None:
+    body = encode().body.replace(b'"images":[]', f'"images":["{url}"]'.encode())
+
+    with pytest.raises(ValidationError):
+        ModelDecoder(Product)(SimpleNamespace(body=body), None)
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, MockTransport
+
+from benchmarks.stand_in.image_cdn import ImageCdnStandIn
+from ozon_importer.exceptions import ImageTooLargeError
+from ozon_importer.repositories.download_scheduler import DownloadScheduler
+from ozon_importer.repositories.http_fetcher import HttpFetcher
+from ozon_importer.repositories.httpx_client import HttpxClient
+
+
+async def test_hosts_are_served_in_turn() -> None:
+    scheduler = DownloadScheduler(max_concurrency=1)
+    started: list[str] = []
+
+    async def download(host: str) -> None:
+        async with scheduler.slot(host):
+            started.append(host)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*[download("a") for _ in range(3)], *[download("b") for _ in range(2)])
+
+    assert started == ["a", "a", "b", "a", "b"]
+
+
+async def test_host_limit_is_halved_on_overload() -> None:
+    scheduler = DownloadScheduler(max_concurrency=10, max_per_host=4)
+    in_flight: list[int] = []
+
+    async def download() -> None:
+        async with scheduler.slot("a"):
+            in_flight.append(scheduler.in_flight)
+            await asyncio.sleep(0.01)
+
+    scheduler.record("a", overloaded=True)
+    await asyncio.gather(*[download() for _ in range(6)])
+
+    assert max(in_flight) == 2
+    assert scheduler.host_limit_decreases == 1
+    assert scheduler.in_flight == 0
+
+
+async def test_fetcher_downloads_in_scheduler_slots() -> None:
+    cdn = ImageCdnStandIn(image_size=1000, latency=0.01)
+    scheduler = DownloadScheduler(max_concurrency=10, max_per_host=2)
+
+    async with AsyncClient(transport=MockTransport(cdn)) as session:
+        fetcher = HttpFetcher(HttpxClient(session), scheduler)  # type: ignore[arg-type]
+        contents = await asyncio.gather(
+            *[fetcher.fetch(f"https://cdn-{index % 2}.stand-in/{index}.jpg") for index in range(6)],
+        )
+
+    assert [len(content) for content in contents] == [1000] * 6
+    assert cdn.requests == {"cdn-0.stand-in": 3, "cdn-1.stand-in": 3}
+
+
+async def test_fetcher_aborts_too_large_image() -> None:
+    async with AsyncClient(transport=MockTransport(ImageCdnStandIn(image_size=1000))) as session:
+        fetcher = HttpFetcher(HttpxClient(session), max_size=999)  # type: ignore[arg-type]
+
+        with pytest.raises(ImageTooLargeError):
+            await fetcher.fetch("https://cdn.stand-in/1.jpg")
@@ -0,0 +1,29 @@
+from ozon_importer.repositories.entity_cache import EntityCache
+
+
+def test_key_ignores_order_of_fields() -> None:
+    first = EntityCache.make_key("brand", {"name": "Brand", "marketplace_id": 1})
+    second = EntityCache.make_key("brand", {"marketplace_id": 1, "name": "Brand"})
+
+    assert first == second == ("brand", '{"name": "Brand"}', 1)
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = EntityCache(maxsize=2, ttl=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_expired_entry_is_missed() -> None:
+    cache = EntityCache(maxsize=2, ttl=0.0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,81 @@
+from httpx import AsyncClient, MockTransport
+
+from benchmarks.stand_in.image_cdn import ImageCdnStandIn
+from ozon_importer.repositories.http_fetcher import HttpFetcher
+from ozon_importer.repositories.httpx_client import HttpxClient
+from ozon_importer.repositories.image_cache import CachingImageFetcher, DiskImageCache
+
+
+async def test_content_is_stored_once_and_reloaded(tmp_path) -> None:
+    cache = DiskImageCache(tmp_path, max_bytes=1000)
+    await cache.put("https://cdn.stand-in/1.jpg", b"image", etag='"1"')
+    await cache.put("https://cdn.stand-in/copy.jpg", b"image")
+
+    assert cache.size == 5
+    assert await cache.get("https://cdn.stand-in/copy.jpg") == b"image"
+
+    reloaded = DiskImageCache(tmp_path, max_bytes=1000)
+
+    assert await reloaded.get("https://cdn.stand-in/1.jpg") == b"image"
+    assert reloaded.get_entry("https://cdn.stand-in/1.jpg").etag == '"1"'
+    assert reloaded.size == 5
+
+
+async def test_least_recently_used_content_is_evicted(tmp_path) -> None:
+    cache = DiskImageCache(tmp_path, max_bytes=10)
+    await cache.put("https://cdn.stand-in/1.jpg", b"first")
+    await cache.put("https://cdn.stand-in/2.jpg", b"secnd")
+    await cache.get("https://cdn.stand-in/1.jpg")
+    await cache.put("https://cdn.stand-in/3.jpg", b"third")
+
+    assert await cache.get("https://cdn.stand-in/1.jpg") == b"first"
+    assert await cache.get("https://cdn.stand-in/2.jpg") is None
+    assert cache.size == 10
+
+
+async def test_malformed_index_lines_are_skipped(tmp_path) -> None:
+    cache = DiskImageCache(tmp_path, max_bytes=1000)
+    await cache.put("https://cdn.stand-in/1.jpg", b"image")
+    content_hash = cache.get_entry("https://cdn.stand-in/1.jpg").content_hash
+
+    with (tmp_path / "urls.tsv").open("a", encoding="utf-8") as index:
+        index.write(f"https://cdn.stand-in/2.jpg\t{content_hash}\t\t\tnot-a-time\n")
+        index.write("garbage\n")
+        index.write(f"https://cdn.stand-in/3.jpg\t{content_hash}\t")
+
+    reloaded = DiskImageCache(tmp_path, max_bytes=1000)
+
+    assert await reloaded.get("https://cdn.stand-in/1.jpg") == b"image"
+    assert reloaded.get_entry("https://cdn.stand-in/2.jpg") is None
+    assert reloaded.malformed_index_lines == 3
+    assert DiskImageCache(tmp_path, max_bytes=1000).malformed_index_lines == 0
+
+
+async def test_entry_is_stale_after_max_age(tmp_path) -> None:
+    cache = DiskImageCache(tmp_path, max_bytes=1000, max_age=0.0)
+    await cache.put("https://cdn.stand-in/1.jpg", b"image")
+
+    assert cache.is_stale(cache.get_entry("https://cdn.stand-in/1.jpg"))
+
+
+async def test_disabled_cache_stores_nothing(tmp_path) -> None:
+    cache = DiskImageCache(tmp_path / "images", max_bytes=0)
+    await cache.put("https://cdn.stand-in/1.jpg", b"image")
+
+    assert await cache.get("https://cdn.stand-in/1.jpg") is None
+    assert not (tmp_path / "images").exists()
+
+
+async def test_caching_fetcher_downloads_url_once(tmp_path) -> None:
+    cdn = ImageCdnStandIn(image_size=100)
+
+    async with AsyncClient(transport=MockTransport(cdn)) as session:
+        fetcher = CachingImageFetcher(
+            HttpFetcher(HttpxClient(session)),  # type: ignore[arg-type]
+            DiskImageCache(tmp_path, max_bytes=1000),
+        )
+        first = await fetcher.fetch("https://cdn.stand-in/1.jpg")
+        second = await fetcher.fetch("https://cdn.stand-in/1.jpg")
+
+    assert first == second
+    assert cdn.requests == {"cdn.stand-in": 1}
@@ -0,0 +1,92 @@
+import logging
+import time
+from collections.abc import Sequence
+
+import pytest
+from faststream.exceptions import RejectMessage
+from httpx import ConnectError, HTTPStatusError, Request, Response, UnsupportedProtocol
+
+from ozon_importer.exceptions import CircuitOpenError
+from ozon_importer.handlers.image_loading import ImageLoadingHandler
+from ozon_importer.handlers.types import ImageTask
+from ozon_importer.interfaces import ILogger
+
+
+URL = "https://cdn.stand-in/1.jpg"
+
+
+class FailingImageSender:
+    def __init__(self, error: Exception) -> None:
+        self.error: Exception = error
+
+    async def send(self, product_id: int, urls: Sequence[str], logger: ILogger | None = None) -> None:  # noqa: ARG002
+        raise self.error
+
+
+class RecordingTaskPublisher:
+    def __init__(self) -> None:
+        self.published: list[tuple[ImageTask, float]] = []
+
+    async def publish(self, task: ImageTask, delay: float = 0.0) -> None:
+        self.published.append((task, delay))
+
+
+def make_group(*errors: Exception) -> ExceptionGroup:
+    return ExceptionGroup("images", list(errors))
+
+
+def make_status_error(status: int) -> HTTPStatusError:
+    request = Request("GET", URL)
+
+    return HTTPStatusError("error", request=request, response=Response(status, request=request))
+
+
+@pytest.mark.parametrize(
+    ("error", "attempt"),
+    [
+        (make_group(CircuitOpenError("cdn.stand-in", 10.0)), 2),
+        (make_group(ConnectError("refused"), make_status_error(503)), 2),
+        (make_group(make_status_error(400)), 3),
+        (make_group(UnsupportedProtocol("ftp")), 3),
+    ],
+)
+async def test_transient_failures_are_not_attempts(error, attempt) -> None:
+    publisher = RecordingTaskPublisher()
+    handler = ImageLoadingHandler(FailingImageSender(error), publisher, max_attempts=5, retry_delay=30.0)
+
+    await handler(ImageTask(product_id=1, url=URL, attempt=2, created_at=100.0), logging.getLogger())
+
+    assert publisher.published == [(ImageTask(product_id=1, url=URL, attempt=attempt, created_at=100.0), 30.0)]
+
+
+async def test_last_attempt_is_rejected() -> None:
+    publisher = RecordingTaskPublisher()
+    handler = ImageLoadingHandler(FailingImageSender(make_group(make_status_error(400))), publisher, max_attempts=3)
+
+    with pytest.raises(RejectMessage):
+        await handler(ImageTask(product_id=1, url=URL, attempt=2), logging.getLogger())
+
+    assert publisher.published == []
+
+
+async def test_transient_failures_of_old_task_are_rejected() -> None:
+    publisher = RecordingTaskPublisher()
+    error = make_group(CircuitOpenError("cdn.stand-in", 10.0))
+    handler = ImageLoadingHandler(FailingImageSender(error), publisher, max_attempts=5, max_age=3600.0)
+
+    await handler(ImageTask(product_id=1, url=URL, created_at=time.time() - 60), logging.getLogger())
+
+    with pytest.raises(RejectMessage):
+        await handler(ImageTask(product_id=1, url=URL, created_at=time.time() - 7200), logging.getLogger())
+
+    assert len(publisher.published) == 1
+
+
+async def test_unexpected_errors_are_not_retried() -> None:
+    publisher = RecordingTaskPublisher()
+    handler = ImageLoadingHandler(FailingImageSender(ValueError("bug")), publisher, max_attempts=5)
+
+    with pytest.raises(ValueError, match="bug"):
+        await handler(ImageTask(product_id=1, url=URL), logging.getLogger())
+
+    assert publisher.published == []
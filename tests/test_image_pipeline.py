@@ -0,0 +1,131 @@
+import asyncio
+
+from ozon_importer.exceptions import ImageTooLargeError
+from ozon_importer.interfaces import IByteBudget, ILogger
+from ozon_importer.services.image_pipeline import ByteBudget, ImagePipeline
+
+
+class DelayedImageFetcher:
+    """Fetcher answering every url with its own bytes after its delay, accounting them in the budget."""
+
+    def __init__(
+        self,
+        events: list[str],
+        delays: dict[str, float] | None = None,
+        too_large: frozenset[str] = frozenset(),
+    ) -> None:
+        self.events: list[str] = events
+        self.delays: dict[str, float] = delays or {}
+        self.too_large: frozenset[str] = too_large
+
+    async def fetch(self, url: str, logger: ILogger | None = None, budget: IByteBudget | None = None) -> bytes:  # noqa: ARG002
+        await asyncio.sleep(self.delays.get(url, 0.0))
+
+        if url in self.too_large:
+            raise ImageTooLargeError(url, 0)
+
+        if budget is not None:
+            await budget.acquire(len(url))
+
+        self.events.append(f"fetched {url}")
+
+        return url.encode()
+
+
+class RecordingImageClient:
+    def __init__(self, events: list[str], budget: ByteBudget, delay: float = 0.0) -> None:
+        self.events: list[str] = events
+        self.budget: ByteBudget = budget
+        self.delay: float = delay
+        self.max_in_use: int = 0
+
+    async def send_image(self, image, logger: ILogger | None = None) -> tuple[int, bool]:  # noqa: ARG002
+        self.max_in_use = max(self.max_in_use, self.budget.in_use)
+        await asyncio.sleep(self.delay)
+        self.events.append(f"uploaded {image['body'].decode()}")
+
+        return len(self.events), True
+
+
+async def test_budget_waits_for_release() -> None:
+    budget = ByteBudget(10)
+    await budget.acquire(6)
+    waiter = asyncio.create_task(budget.acquire(6))
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+
+    budget.release(6)
+    await waiter
+
+    assert budget.in_use == 6
+
+
+async def test_budget_admits_larger_body_alone() -> None:
+    budget = ByteBudget(10)
+    await budget.acquire(100)
+    waiter = asyncio.create_task(budget.acquire(1))
+    await asyncio.sleep(0)
+
+    assert budget.in_use == 10
+    assert not waiter.done()
+
+    budget.release(100)
+    await waiter
+
+    assert budget.in_use == 1
+
+
+async def test_budget_skips_cancelled_waiters_in_order() -> None:
+    budget = ByteBudget(10)
+    await budget.acquire(8)
+    cancelled = asyncio.create_task(budget.acquire(5))
+    waiter = asyncio.create_task(budget.acquire(2))
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    budget.release(8)
+    await waiter
+
+    assert budget.in_use == 2
+
+
+async def test_image_is_uploaded_as_soon_as_it_is_fetched() -> None:
+    events: list[str] = []
+    budget = ByteBudget(1000)
+    fetcher = DelayedImageFetcher(events, delays={"slow": 0.05})
+    pipeline = ImagePipeline(RecordingImageClient(events, budget), fetcher, budget, concurrency=2)
+
+    await pipeline.send(1, ["slow", "fast"])
+
+    assert events.index("uploaded fast") < events.index("fetched slow")
+    assert budget.in_use == 0
+
+
+async def test_bodies_in_memory_are_limited_by_budget() -> None:
+    events: list[str] = []
+    budget = ByteBudget(10)
+    client = RecordingImageClient(events, budget, delay=0.01)
+    pipeline = ImagePipeline(client, DelayedImageFetcher(events), budget, concurrency=5)
+
+    await pipeline.send(1, ["img1", "img2", "img3", "img4", "img5"])
+
+    assert sorted(event for event in events if event.startswith("uploaded")) == [
+        f"uploaded img{index}" for index in range(1, 6)
+    ]
+    assert client.max_in_use == 8
+    assert budget.in_use == 0
+
+
+async def test_too_large_image_is_skipped() -> None:
+    events: list[str] = []
+    budget = ByteBudget(1000)
+    fetcher = DelayedImageFetcher(events, too_large=frozenset({"huge"}))
+    pipeline = ImagePipeline(RecordingImageClient(events, budget), fetcher, budget, concurrency=2)
+
+    await pipeline.send(1, ["huge", "small"])
+
+    assert [event for event in events if event.startswith("uploaded")] == ["uploaded small"]
@@ -0,0 +1,68 @@
+import importlib.util
+import io
+import random
+
+import pytest
+from PIL import Image
+
+from ozon_importer.exceptions import ImageTranscodingUnavailableError
+from ozon_importer.metrics.registry import MetricsRegistry
+from ozon_importer.services.image_transcoder import ImageTranscoder
+
+
+def make_image(size: tuple[int, int], mode: str = "RGB", image_format: str = "PNG") -> bytes:
+    image = Image.frombytes(mode, size, random.Random(0).randbytes(len(Image.new(mode, size).tobytes())))
+    output = io.BytesIO()
+    image.save(output, format=image_format)
+
+    return output.getvalue()
+
+
+@pytest.fixture()
+def _without_pillow(monkeypatch) -> None:
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None if name == "PIL" else find_spec(name))
+
+
+@pytest.mark.usefixtures("_without_pillow")
+def test_enabled_transcoder_requires_pillow_on_creation() -> None:
+    with pytest.raises(ImageTranscodingUnavailableError):
+        ImageTranscoder(enabled=True, max_dimension=1000)
+
+
+@pytest.mark.usefixtures("_without_pillow")
+async def test_disabled_transcoder_keeps_bodies_without_pillow() -> None:
+    async with ImageTranscoder(enabled=False, max_dimension=1000) as transcoder:
+        assert await transcoder.transcode(b"\xff\xd8\xff body") == b"\xff\xd8\xff body"
+
+
+async def test_image_is_reencoded_when_it_gets_smaller() -> None:
+    body = make_image((300, 200))
+
+    async with ImageTranscoder(enabled=True, max_dimension=1000, workers=1) as transcoder:
+        transcoded = await transcoder.transcode(body)
+
+    with Image.open(io.BytesIO(transcoded)) as image:
+        assert (image.format, image.size) == ("JPEG", (300, 200))
+
+    assert transcoder.bytes_saved == len(body) - len(transcoded) > 0
+
+
+async def test_large_image_is_downscaled() -> None:
+    async with ImageTranscoder(enabled=True, max_dimension=100, workers=1) as transcoder:
+        transcoded = await transcoder.transcode(make_image((400, 200), "RGBA"))
+
+    with Image.open(io.BytesIO(transcoded)) as image:
+        assert (image.format, image.size) == ("JPEG", (100, 50))
+
+
+async def test_original_is_kept_when_result_is_not_smaller() -> None:
+    body = make_image((64, 64), "1")
+    metrics = MetricsRegistry()
+
+    async with ImageTranscoder(enabled=True, max_dimension=1000, workers=1, metrics=metrics) as transcoder:
+        assert await transcoder.transcode(body) == body
+        assert await transcoder.transcode(b"not an image") == b"not an image"
+
+    assert transcoder.bytes_saved == 0
+    assert "ozon_importer_image_transcode_saved_bytes_total" not in metrics.render()
@@ -0,0 +1,29 @@
+import asyncio
+
+from ozon_importer.handlers.keyed_lock import KeyedLock
+
+
+async def test_holders_of_key_are_served_in_order() -> None:
+    lock = KeyedLock()
+    order: list[str] = []
+
+    async def hold(key: str, name: str) -> None:
+        async with lock.hold(key):
+            order.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} out")
+
+    await asyncio.gather(hold("1", "a"), hold("1", "b"), hold("2", "c"))
+
+    assert order.index("a out") < order.index("b in")
+    assert order.index("c in") < order.index("a out")
+
+
+async def test_lock_is_dropped_when_released() -> None:
+    lock = KeyedLock()
+
+    async with lock.hold("1"):
+        pass
+
+    assert not lock._locks  # noqa: SLF001
+    assert not lock._holders  # noqa: SLF001
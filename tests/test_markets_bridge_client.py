@@ -0,0 +1,67 @@
+import asyncio
+
+from httpx import AsyncClient, MockTransport
+
+from benchmarks.stand_in.markets_bridge import MarketsBridgeStandIn
+from ozon_importer.repositories.httpx_client import HttpxClient
+from ozon_importer.repositories.markets_bridge_client.client import MarketsBridgeClient
+from tests.conftest import MARKETPLACE_ID, MARKETS_BRIDGE_HOST
+
+
+async def test_bulk_characteristics_are_upserted_once(client, markets_bridge) -> None:
+    characteristics = [
+        {"name": name, "product_type_name": "Кружка", "marketplace_id": MARKETPLACE_ID} for name in ("Цвет", "Объем")
+    ]
+
+    first = await client.send_characteristics_bulk(characteristics)
+    second = await client.send_characteristics_bulk(characteristics)
+
+    assert [is_new for _, is_new in first] == [True, True]
+    assert [entity_id for entity_id, _ in second] == [entity_id for entity_id, _ in first]
+    assert markets_bridge.requests["/api/v1/provider/characteristics/bulk/"] == 1
+
+
+async def test_bulk_values_send_only_unknown_values(client, markets_bridge) -> None:
+    value = {"value": "Белый", "characteristic_name": "Цвет", "marketplace_id": MARKETPLACE_ID}
+    await client.send_characteristic_values_bulk([value])
+
+    results = await client.send_characteristic_values_bulk([value, {**value, "value": "Черный"}])
+
+    assert [is_new for _, is_new in results] == [False, True]
+    assert markets_bridge.requests["/api/v1/provider/characteristic_values/bulk/"] == 2
+    assert len(markets_bridge.entities["characteristic_values"]) == 2
+
+
+async def test_concurrent_identical_sends_make_one_request(client, markets_bridge) -> None:
+    brand = {"name": "Brand", "marketplace_id": MARKETPLACE_ID}
+
+    results = await asyncio.gather(*[client.send_brand(brand) for _ in range(5)])
+
+    assert len({entity_id for entity_id, _ in results}) == 1
+    assert markets_bridge.requests["/api/v1/provider/brands/"] == 1
+
+
+async def test_known_entities_are_listed_and_remembered(client, markets_bridge) -> None:
+    markets_bridge.entities["brands"][("Brand", MARKETPLACE_ID)] = 42
+    pages = [page async for page in client.iter_entities("brand", MARKETPLACE_ID)]
+    await client.remember_entities("brand", pages[0], MARKETPLACE_ID)
+
+    assert await client.send_brand({"name": "Brand", "marketplace_id": MARKETPLACE_ID}) == (42, False)
+    assert markets_bridge.requests["/api/v1/provider/brands/"] == 1
+
+
+async def test_concurrent_unauthorized_requests_refresh_token_once() -> None:
+    markets_bridge = MarketsBridgeStandIn(latency=0.01)
+
+    async with AsyncClient(transport=MockTransport(markets_bridge)) as session:
+        client = MarketsBridgeClient(HttpxClient(session), MARKETS_BRIDGE_HOST, "login", "password")
+        await client.send_brand({"name": "Brand", "marketplace_id": MARKETPLACE_ID})
+        client.accessor._access_token = "revoked"  # noqa: S105, SLF001
+
+        await asyncio.gather(
+            *[client.send_brand({"name": f"Brand {index}", "marketplace_id": MARKETPLACE_ID}) for index in range(5)],
+        )
+
+    assert markets_bridge.requests["/api/v1/provider/brands/"] == 11
+    assert markets_bridge.requests["/api/token/refresh/"] == 1
+    assert markets_bridge.requests["/api/token/"] == 1
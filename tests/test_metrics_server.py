@@ -0,0 +1,44 @@
+import socket
+
+import pytest
+from httpx import AsyncClient
+
+from ozon_importer.metrics.registry import NULL_METRICS, MetricsRegistry
+from ozon_importer.metrics.server import MetricsServer
+
+
+@pytest.fixture()
+def port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+
+        return probe.getsockname()[1]
+
+
+async def test_metrics_are_scraped(port) -> None:
+    metrics = MetricsRegistry()
+    metrics.increment("ozon_importer_products_total", outcome="sent")
+    server = MetricsServer(metrics, "127.0.0.1", port)
+    await server.start()
+
+    try:
+        async with AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=5.0) as http_client:
+            response = await http_client.get("/metrics")
+            missing = await http_client.get("/")
+    finally:
+        await server.stop()
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == MetricsServer.CONTENT_TYPE
+    assert 'ozon_importer_products_total{outcome="sent"} 1' in response.text
+    assert missing.status_code == 404
+
+
+async def test_nothing_is_served_without_metrics(port) -> None:
+    server = MetricsServer(NULL_METRICS, "127.0.0.1", port)
+    await server.start()
+
+    with socket.socket() as probe:
+        assert probe.connect_ex(("127.0.0.1", port)) != 0
+
+    await server.stop()
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+
+from ozon_importer.interfaces import ILogger
+from ozon_importer.sampled_logger import SampledLogger
+from ozon_importer.services.product_batcher import ProductBatcher
+from ozon_importer.types import Product
+from tests.conftest import make_product
+
+
+class SlowBatchSender:
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay: float = delay
+        self.batches: list[list[str]] = []
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+
+    async def send_many(self, products: Sequence[Product], logger: ILogger | None = None) -> list[Exception | None]:  # noqa: ARG002
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.batches.append([product.sku for product in products])
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        return [None] * len(products)
+
+
+async def test_batches_are_full_while_sends_are_limited() -> None:
+    sender = SlowBatchSender()
+    batcher = ProductBatcher(sender, max_size=4, max_delay=10.0, max_in_flight=1)
+
+    await asyncio.gather(*[batcher.send(make_product(str(sku))) for sku in range(8)])
+
+    assert [len(batch) for batch in sender.batches] == [4, 4]
+    assert sender.max_in_flight == 1
+
+
+async def test_every_product_keeps_its_logger() -> None:
+    batcher = ProductBatcher(SlowBatchSender(), max_size=2, max_delay=10.0)
+    loggers = [SampledLogger(logging.getLogger("test")) for _ in range(2)]
+
+    await asyncio.gather(*[batcher.send(make_product(str(sku)), logger) for sku, logger in enumerate(loggers)])
+
+    assert [logger.records for logger in loggers] == [1, 1]
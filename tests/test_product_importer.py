@@ -0,0 +1,154 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from httpx import AsyncClient, MockTransport
+
+from benchmarks.stand_in.markets_bridge import MarketsBridgeStandIn
+from ozon_importer.exceptions import StaleProductEntitiesError
+from ozon_importer.interfaces import ILogger
+from ozon_importer.repositories.httpx_client import HttpxClient
+from ozon_importer.repositories.import_checkpoint_store import SqliteImportCheckpointStore
+from ozon_importer.repositories.markets_bridge_client.client import MarketsBridgeClient
+from ozon_importer.repositories.product_snapshot_store import SqliteProductSnapshotStore
+from ozon_importer.services.product_importer import ProductImporter
+from ozon_importer.types import Characteristic
+from tests.conftest import MARKETPLACE_ID, MARKETS_BRIDGE_HOST, make_product
+
+
+class OrderingClient:
+    """Client recording when upserts of entities start and end, upserts of ``slow`` entities take longer."""
+
+    def __init__(self, slow: frozenset[str] = frozenset(), delay: float = 0.01) -> None:
+        self.slow: frozenset[str] = slow
+        self.delay: float = delay
+        self.events: list[str] = []
+
+    async def send_category(self, category, logger: ILogger | None = None) -> tuple[int, bool]:  # noqa: ARG002
+        return await self._upsert(f"category {category['name']}")
+
+    async def send_brand(self, brand, logger: ILogger | None = None) -> tuple[int, bool]:  # noqa: ARG002
+        return await self._upsert(f"brand {brand['name']}")
+
+    async def send_characteristic(self, characteristic, logger: ILogger | None = None) -> tuple[int, bool]:  # noqa: ARG002
+        return await self._upsert(f"characteristic {characteristic['name']}")
+
+    async def send_characteristic_value(self, value, logger: ILogger | None = None) -> tuple[int, bool]:  # noqa: ARG002
+        return await self._upsert(f"value {value['characteristic_name']}={value['value']}")
+
+    async def send_product(self, product, logger: ILogger | None = None) -> tuple[int, bool]:  # noqa: ARG002
+        return await self._upsert("product")
+
+    async def _upsert(self, entity: str) -> tuple[int, bool]:
+        self.events.append(f"start {entity}")
+        await asyncio.sleep(self.delay * 3 if entity in self.slow else self.delay)
+        self.events.append(f"end {entity}")
+
+        return len(self.events), True
+
+
+@pytest.fixture()
+async def uncached_client(markets_bridge: MarketsBridgeStandIn) -> AsyncIterator[MarketsBridgeClient]:
+    """Client sending every entity it is given, so only the importer decides what is skipped."""
+    async with AsyncClient(transport=MockTransport(markets_bridge)) as session:
+        yield MarketsBridgeClient(HttpxClient(session), MARKETS_BRIDGE_HOST, "login", "password")
+
+
+async def test_redelivery_after_lost_entities_sends_them_again(client, markets_bridge, image_sender, tmp_path) -> None:
+    async with SqliteImportCheckpointStore(tmp_path / "checkpoints.sqlite3") as checkpoint_store:
+        importer = ProductImporter(client, image_sender, MARKETPLACE_ID, checkpoint_store=checkpoint_store)
+        await importer.send(make_product("1"))
+        markets_bridge.entities.clear()
+
+        with pytest.raises(StaleProductEntitiesError):
+            await importer.send(make_product("2"))
+
+        assert await checkpoint_store.get_many(MARKETPLACE_ID, ["2"]) == {}
+
+        await importer.send(make_product("2"))
+
+    assert (2, MARKETPLACE_ID) in markets_bridge.entities["products"]
+    assert ("Кружка", MARKETPLACE_ID) in markets_bridge.entities["categories"]
+
+
+async def test_send_many_sends_last_product_of_sku(client, markets_bridge, image_sender) -> None:
+    importer = ProductImporter(client, image_sender, MARKETPLACE_ID)
+
+    results = await importer.send_many(
+        [
+            make_product("1", images=["https://cdn.stand-in/first.jpg"]),
+            make_product("2"),
+            make_product("1", images=["https://cdn.stand-in/last.jpg"]),
+        ],
+    )
+
+    assert results == [None, None, None]
+    assert markets_bridge.requests["/api/v1/provider/products/"] == 2
+    assert [urls for _, urls in image_sender.sent] == [["https://cdn.stand-in/last.jpg"]]
+
+
+async def test_unchanged_product_skips_every_request(uncached_client, markets_bridge, image_sender, tmp_path) -> None:
+    async with SqliteProductSnapshotStore(tmp_path / "snapshots.sqlite3") as snapshot_store:
+        importer = ProductImporter(uncached_client, image_sender, MARKETPLACE_ID, snapshot_store=snapshot_store)
+        await importer.send(make_product("1", images=["https://cdn.stand-in/1.jpg"]))
+        markets_bridge.requests.clear()
+        image_sender.sent.clear()
+
+        await importer.send(make_product("1", images=["https://cdn.stand-in/1.jpg"]))
+
+    assert markets_bridge.requests == {}
+    assert image_sender.sent == []
+
+
+async def test_changed_product_sends_only_differing_entities(
+    uncached_client,
+    markets_bridge,
+    image_sender,
+    tmp_path,
+) -> None:
+    async with SqliteProductSnapshotStore(tmp_path / "snapshots.sqlite3") as snapshot_store:
+        importer = ProductImporter(uncached_client, image_sender, MARKETPLACE_ID, snapshot_store=snapshot_store)
+        await importer.send(make_product("1"))
+        markets_bridge.requests.clear()
+
+        await importer.send(
+            make_product(
+                "1",
+                characteristics=[
+                    Characteristic("Тип", "Кружка"),
+                    Characteristic("Цвет", "Белый"),
+                    Characteristic("Материал", "Керамика"),
+                ],
+            ),
+        )
+
+    assert markets_bridge.requests == {
+        "/api/v1/provider/characteristics/": 1,
+        "/api/v1/provider/characteristic_values/": 1,
+        "/api/v1/provider/products/": 1,
+    }
+    assert ("Керамика", "Материал", MARKETPLACE_ID) in markets_bridge.entities["characteristic_values"]
+
+
+async def test_entities_wait_only_for_entities_they_refer_to(image_sender) -> None:
+    client = OrderingClient(slow=frozenset({"characteristic Материал"}))
+    importer = ProductImporter(client, image_sender, MARKETPLACE_ID, concurrency=8)
+
+    await importer.send(
+        make_product(
+            "1",
+            characteristics=[
+                Characteristic("Тип", "Кружка"),
+                Characteristic("Цвет", "Белый"),
+                Characteristic("Материал", "Керамика"),
+            ],
+        ),
+    )
+
+    event = client.events.index
+    assert event("start brand Brand") < event("end category Кружка")
+    assert event("end category Кружка") < event("start characteristic Цвет")
+    assert event("end category Кружка") < event("start characteristic Материал")
+    assert event("end characteristic Цвет") < event("start value Цвет=Белый") < event("end characteristic Материал")
+    assert event("end characteristic Материал") < event("start value Материал=Керамика")
+    assert client.events[-2:] == ["start product", "end product"]
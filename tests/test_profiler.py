@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+
+from ozon_importer.metrics.profiler import STAGE_METRIC, Profiler, ProfilingMetrics
+from ozon_importer.metrics.registry import MetricsRegistry
+
+
+async def test_report_counts_stages_and_slow_callbacks(tmp_path) -> None:
+    profiler = Profiler(tmp_path / "profile.txt", sample_interval=0.001, slow_callback_duration=0.02)
+    registry = MetricsRegistry()
+    metrics = ProfilingMetrics(registry, profiler)
+    profiler.start()
+
+    with metrics.timer(STAGE_METRIC, stage="product_send"):
+        time.sleep(0.1)  # noqa: ASYNC101
+
+    await asyncio.sleep(0.01)
+    await profiler.stop()
+    lines = (tmp_path / "profile.txt").read_text(encoding="utf-8").splitlines()
+    slow_callbacks = next(line for line in lines if line.startswith("slow callbacks over 20 ms: "))
+
+    assert lines[0].startswith("=== ")
+    assert int(slow_callbacks.rpartition(" ")[2]) >= 1
+    assert ["product_send", "1"] in [line.split()[:2] for line in lines]
+    assert 'ozon_importer_stage_seconds_count{stage="product_send"} 1' in registry.render()
+
+
+async def test_inactive_profiler_only_passes_records_on(tmp_path) -> None:
+    profiler = Profiler(tmp_path / "profile.txt")
+    registry = MetricsRegistry()
+    metrics = ProfilingMetrics(registry, profiler)
+
+    with metrics.timer(STAGE_METRIC, stage="product_send"):
+        pass
+
+    await profiler.stop()
+
+    assert 'ozon_importer_stage_seconds_count{stage="product_send"} 1' in registry.render()
+    assert not (tmp_path / "profile.txt").exists()
+
+
+async def test_signal_switches_profiling(tmp_path) -> None:
+    profiler = Profiler(tmp_path / "profile.txt", sample_interval=0.001)
+    profiler.attach()
+
+    try:
+        os.kill(os.getpid(), signal.SIGUSR2)
+        await asyncio.sleep(0.01)
+
+        assert profiler.active
+
+        os.kill(os.getpid(), signal.SIGUSR2)
+        await asyncio.sleep(0.05)
+
+        assert not profiler.active
+        assert (tmp_path / "profile.txt").exists()
+    finally:
+        await profiler.detach()
+
+
+async def test_unwritable_report_is_logged(tmp_path, caplog) -> None:
+    (tmp_path / "file").touch()
+    profiler = Profiler(tmp_path / "file" / "profile.txt", sample_interval=0.001)
+    profiler.start()
+
+    with caplog.at_level(logging.WARNING):
+        await profiler.stop()
+
+    assert "can't write report" in caplog.text
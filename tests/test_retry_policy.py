@@ -0,0 +1,134 @@
+import pytest
+from httpx import ConnectError, HTTPStatusError, Request, Response, UnsupportedProtocol
+
+from ozon_importer.exceptions import CircuitOpenError
+from ozon_importer.repositories.retry_policy import CircuitBreaker, RetryBudget, RetryPolicy
+
+
+def make_status_error(status: int) -> HTTPStatusError:
+    request = Request("GET", "http://markets-bridge.stand-in/")
+
+    return HTTPStatusError("error", request=request, response=Response(status, request=request))
+
+
+class FlakyCall:
+    def __init__(self, *errors: Exception) -> None:
+        self.errors: list[Exception] = list(errors)
+        self.calls: int = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+
+        if self.errors:
+            raise self.errors.pop(0)
+
+        return "ok"
+
+
+def test_budget_allows_retries_for_part_of_calls() -> None:
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=1.0)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+
+    assert budget.withdraw()
+    assert budget.exhausted == 1
+
+
+def test_breaker_opens_after_failures_in_a_row() -> None:
+    breaker = CircuitBreaker("markets_bridge", failure_threshold=2, reset_timeout=60.0)
+
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.is_open
+
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_breaker_trial_closes_circuit() -> None:
+    breaker = CircuitBreaker("markets_bridge", failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+
+    assert breaker.check()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    breaker.record_success()
+
+    assert not breaker.is_open
+    assert not breaker.check()
+
+
+async def test_policy_retries_transport_errors_and_overload() -> None:
+    call = FlakyCall(ConnectError("refused"), make_status_error(503))
+
+    assert await RetryPolicy(max_attempts=3, base_delay=0.0).call("markets_bridge", call) == "ok"
+    assert call.calls == 3
+
+
+async def test_policy_does_not_retry_client_errors() -> None:
+    call = FlakyCall(make_status_error(400))
+
+    with pytest.raises(HTTPStatusError):
+        await RetryPolicy(max_attempts=3, base_delay=0.0).call("markets_bridge", call)
+
+    assert call.calls == 1
+
+
+async def test_policy_stops_retrying_when_budget_is_exhausted() -> None:
+    call = FlakyCall(ConnectError("refused"), ConnectError("refused"))
+    policy = RetryPolicy(
+        max_attempts=3,
+        base_delay=0.0,
+        budget=RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0),
+    )
+
+    with pytest.raises(ConnectError):
+        await policy.call("markets_bridge", call)
+
+    assert call.calls == 2
+
+
+async def test_policy_fails_fast_on_open_circuit() -> None:
+    policy = RetryPolicy(max_attempts=1, failure_threshold=1, reset_timeout=60.0)
+
+    with pytest.raises(ConnectError):
+        await policy.call("markets_bridge", FlakyCall(ConnectError("refused")))
+
+    call = FlakyCall()
+
+    with pytest.raises(CircuitOpenError):
+        await policy.call("markets_bridge", call)
+
+    assert call.calls == 0
+    assert await policy.call("image_host", call) == "ok"
+
+
+async def test_policy_passes_other_errors_on_and_frees_the_trial() -> None:
+    policy = RetryPolicy(max_attempts=1, failure_threshold=1, reset_timeout=0.0)
+
+    with pytest.raises(ConnectError):
+        await policy.call("image_host", FlakyCall(ConnectError("refused")))
+
+    call = FlakyCall(ValueError("broken body"))
+
+    with pytest.raises(ValueError, match="broken body"):
+        await policy.call("image_host", call)
+
+    assert call.calls == 1
+    assert policy.get_breaker("image_host").is_open
+    assert await policy.call("image_host", call) == "ok"
+
+
+async def test_policy_does_not_retry_unsupported_urls() -> None:
+    call = FlakyCall(UnsupportedProtocol("ftp"))
+
+    with pytest.raises(UnsupportedProtocol):
+        await RetryPolicy(max_attempts=3, base_delay=0.0).call("image_host", call)
+
+    assert call.calls == 1
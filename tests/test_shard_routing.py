@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from ozon_importer.handlers.shard_routing import ShardRouter
+from ozon_importer.handlers.types import ShardKey
+from ozon_importer.sharding import get_shard
+
+
+QUEUES = [f"parsed_loading.ozon.{index}" for index in range(4)]
+
+
+class RecordingBroker:
+    """Broker recording publications, publishing a body listed in ``slow`` takes longer."""
+
+    def __init__(self, slow: frozenset[bytes] = frozenset()) -> None:
+        self.slow: frozenset[bytes] = slow
+        self.published: list[tuple[bytes, str, dict]] = []
+
+    async def publish(self, body: bytes, queue: str, **options) -> None:
+        await asyncio.sleep(0.02 if body in self.slow else 0.0)
+        self.published.append((body, queue, options))
+
+
+def make_message(body: bytes, message_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        body=body,
+        content_type="application/json",
+        headers={"x-source": "parser"},
+        message_id=message_id,
+    )
+
+
+async def test_sku_is_routed_to_its_shard_with_message_properties() -> None:
+    broker = RecordingBroker()
+    router = ShardRouter(broker, QUEUES)
+    skus = [str(sku) for sku in range(100)]
+
+    for sku in [*skus, *skus]:
+        await router(ShardKey(sku=sku), logging.getLogger("test"), make_message(sku.encode(), f"id-{sku}"))
+
+    routes = {body.decode(): queue for body, queue, _ in broker.published}
+    _, _, options = broker.published[0]
+
+    assert len(broker.published) == 200
+    assert all(routes[body.decode()] == queue for body, queue, _ in broker.published)
+    assert routes == {sku: QUEUES[get_shard(sku, len(QUEUES))] for sku in skus}
+    assert set(routes.values()) == set(QUEUES)
+    assert options == {
+        "persist": True,
+        "content_type": "application/json",
+        "headers": {"x-source": "parser"},
+        "message_id": "id-0",
+    }
+
+
+async def test_updates_of_sku_are_republished_in_order() -> None:
+    broker = RecordingBroker(slow=frozenset({b"first"}))
+    router = ShardRouter(broker, QUEUES)
+    logger = logging.getLogger("test")
+
+    await asyncio.gather(
+        router(ShardKey(sku="1"), logger, make_message(b"first", "1")),
+        router(ShardKey(sku="1"), logger, make_message(b"second", "2")),
+    )
+
+    assert [body for body, _, _ in broker.published] == [b"first", b"second"]
@@ -0,0 +1,52 @@
+from ozon_importer.repositories.entity_cache import EntityCache
+from ozon_importer.repositories.entity_id_store import SqliteEntityIdStore
+from ozon_importer.repositories.import_checkpoint_store import SqliteImportCheckpointStore
+from ozon_importer.repositories.product_snapshot_store import SqliteProductSnapshotStore
+from ozon_importer.services.types import ImportCheckpoint, ProductSnapshot
+from ozon_importer.types import Characteristic
+
+
+async def test_entity_ids_persist_across_stores(tmp_path) -> None:
+    keys = [EntityCache.make_key("brand", {"name": f"Brand {index}", "marketplace_id": 1}) for index in range(400)]
+
+    async with SqliteEntityIdStore(tmp_path / "entity_ids.sqlite3") as store:
+        await store.set_many({key: index for index, key in enumerate(keys)})
+        await store.delete_many(keys[:1])
+
+    async with SqliteEntityIdStore(tmp_path / "entity_ids.sqlite3") as store:
+        entity_ids = await store.get_many(keys)
+
+    assert len(entity_ids) == 399
+    assert entity_ids[keys[-1]] == 399
+
+
+async def test_snapshots_are_kept_per_marketplace(tmp_path) -> None:
+    snapshot = ProductSnapshot(
+        sku="1",
+        product_id=10,
+        fingerprint="fingerprint",
+        brand="Brand",
+        product_type_name="Кружка",
+        characteristics=[Characteristic("Цвет", "Белый")],
+        images=["https://cdn.stand-in/1.jpg"],
+    )
+
+    async with SqliteProductSnapshotStore(tmp_path / "snapshots.sqlite3") as store:
+        await store.set_many(1, {"1": snapshot})
+
+        assert await store.get_many(1, ["1", "2"]) == {"1": snapshot}
+        assert await store.get_many(2, ["1"]) == {}
+
+
+async def test_checkpoints_are_replaced_and_deleted(tmp_path) -> None:
+    async with SqliteImportCheckpointStore(tmp_path / "checkpoints.sqlite3") as store:
+        await store.set_many(1, {"1": ImportCheckpoint(sku="1", fingerprint="old")})
+        await store.set_many(1, {"1": ImportCheckpoint(sku="1", fingerprint="new", product_id=10)})
+
+        assert await store.get_many(1, ["1"]) == {
+            "1": ImportCheckpoint(sku="1", fingerprint="new", product_id=10),
+        }
+
+        await store.delete_many(1, ["1"])
+
+        assert await store.get_many(1, ["1"]) == {}
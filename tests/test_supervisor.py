@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import signal
+import sys
+from asyncio import create_subprocess_exec
+from collections.abc import Mapping
+
+from ozon_importer.supervisor import Supervisor
+
+
+SLEEP = "import time; time.sleep(60)"
+CRASH = "raise SystemExit(1)"
+IGNORE_TERM = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)"
+
+
+class FakeLauncher:
+    """Runs the nth script instead of the nth started app, the last script for every later one."""
+
+    def __init__(self, *scripts: str) -> None:
+        self.scripts: tuple[str, ...] = scripts
+        self.launched: list[tuple[str, dict[str, str]]] = []
+        self.processes: list[asyncio.subprocess.Process] = []
+
+    async def __call__(
+        self,
+        *command: str,
+        env: Mapping[str, str],
+        start_new_session: bool,
+    ) -> asyncio.subprocess.Process:
+        self.launched.append((command[4], {name: env[name] for name in ("WORKERS", "WORKER_INDEX") if name in env}))
+        script = self.scripts[min(len(self.launched), len(self.scripts)) - 1]
+        process = await create_subprocess_exec(sys.executable, "-c", script, start_new_session=start_new_session)
+        self.processes.append(process)
+
+        return process
+
+
+async def run_for(supervisor: Supervisor, seconds: float) -> None:
+    running = asyncio.create_task(supervisor.run(logging.getLogger("test")))
+    await asyncio.sleep(seconds)
+    supervisor._stopping.set()  # noqa: SLF001
+    await running
+
+
+async def test_router_and_workers_are_started_and_stopped(mocker) -> None:
+    launcher = FakeLauncher(SLEEP)
+    mocker.patch("ozon_importer.supervisor.asyncio.create_subprocess_exec", launcher)
+
+    await run_for(Supervisor(2), 0.3)
+
+    assert launcher.launched == [
+        ("ozon_importer.shard_router:app", {"WORKERS": "2"}),
+        ("ozon_importer.main:app", {"WORKERS": "2", "WORKER_INDEX": "0"}),
+        ("ozon_importer.main:app", {"WORKERS": "2", "WORKER_INDEX": "1"}),
+    ]
+    assert [process.returncode for process in launcher.processes] == [-signal.SIGTERM] * 3
+
+
+async def test_crashed_worker_is_restarted(mocker) -> None:
+    launcher = FakeLauncher(CRASH, SLEEP)
+    mocker.patch("ozon_importer.supervisor.asyncio.create_subprocess_exec", launcher)
+
+    await run_for(Supervisor(1, restart_delay=0.01), 0.5)
+
+    assert [app for app, _ in launcher.launched] == ["ozon_importer.main:app"] * 2
+    assert [process.returncode for process in launcher.processes] == [1, -signal.SIGTERM]
+
+
+async def test_worker_is_killed_after_shutdown_timeout(mocker) -> None:
+    launcher = FakeLauncher(IGNORE_TERM)
+    mocker.patch("ozon_importer.supervisor.asyncio.create_subprocess_exec", launcher)
+
+    await run_for(Supervisor(1, shutdown_timeout=0.1), 0.5)
+
+    assert [process.returncode for process in launcher.processes] == [-signal.SIGKILL]